@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for DocMint
+
+Runs fresh interpreters with ``-X importtime`` and fails (exit status 1) when
+
+* ``import docmint``, ``import docmint.launcher`` (the console script) or
+  ``import docmint.cli`` takes longer than its budget
+  (best of several runs, so a busy machine does not cause false alarms), or
+* importing the CLI, or running ``docmint --help`` through the console
+  script's entry point, loads the HTTP stack
+  (``requests``, ``urllib3``, ...), which should only be imported once a
+  network call is made.
+
+    python benchmarks/importtime.py
+    python benchmarks/importtime.py --cli-budget 40 --runs 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must stay unloaded until the backend is contacted
+NETWORK_MODULES = ['requests', 'urllib3', 'charset_normalizer', 'idna', 'certifi']
+
+HELP_PROBE = """
+import json, sys
+sys.argv = ['docmint', '--help']
+from docmint.launcher import main
+try:
+    main()
+except SystemExit:
+    pass
+sys.stdout.flush()
+sys.stderr.write('\\n' + json.dumps(sorted(m for m in sys.modules if m.split('.')[0] in %r)) + '\\n')
+"""
+
+
+def import_time(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every module loaded by ``import module``
+
+    Includes what the interpreter loads at startup (``site`` and any ``.pth``
+    hooks); pass ``sys`` to measure just that.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=str(ROOT), capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def best_import_time(module: str, runs: int) -> float:
+    """Fastest of ``runs`` cold imports of ``module``, in milliseconds"""
+    return min(import_time(module).get(module, 0) for _ in range(runs)) / 1000
+
+
+def network_packages(modules) -> List[str]:
+    """Top-level network packages among ``modules``, ignoring any loaded at interpreter startup"""
+    startup = {name.split('.')[0] for name in import_time('sys')}
+    return sorted({name.split('.')[0] for name in modules} & set(NETWORK_MODULES) - startup)
+
+
+def help_modules() -> List[str]:
+    # Run in this process, as when no daemon is listening
+    env = dict(os.environ, DOCMINT_NO_DAEMON='1')
+    result = subprocess.run([sys.executable, '-c', HELP_PROBE % (NETWORK_MODULES,)],
+                            cwd=str(ROOT), env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check DocMint import times against a budget")
+    parser.add_argument('--package-budget', type=float, default=5.0,
+                        help='Milliseconds allowed for "import docmint" (default: 5)')
+    parser.add_argument('--launcher-budget', type=float, default=30.0,
+                        help='Milliseconds allowed for "import docmint.launcher" (default: 30)')
+    parser.add_argument('--cli-budget', type=float, default=60.0,
+                        help='Milliseconds allowed for "import docmint.cli" (default: 60)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per measurement (default: 5)')
+    args = parser.parse_args()
+
+    failures = []
+
+    for module, budget in (('docmint', args.package_budget), ('docmint.launcher', args.launcher_budget),
+                           ('docmint.cli', args.cli_budget)):
+        elapsed = best_import_time(module, args.runs)
+        status = 'ok' if elapsed <= budget else 'OVER BUDGET'
+        print(f"import {module:<16} {elapsed:8.2f} ms  (budget {budget:g} ms)  {status}")
+        if elapsed > budget:
+            failures.append(f"import {module} took {elapsed:.2f} ms, budget is {budget:g} ms")
+
+    loaded = network_packages(import_time('docmint.cli'))
+    print(f"network modules loaded by import docmint.cli: {', '.join(loaded) or 'none'}")
+    if loaded:
+        failures.append(f"import docmint.cli loads {', '.join(loaded)}")
+
+    loaded = network_packages(help_modules())
+    print(f"network modules loaded by docmint --help:    {', '.join(loaded) or 'none'}")
+    if loaded:
+        failures.append(f"docmint --help loads {', '.join(loaded)}")
+
+    if failures:
+        print()
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+DocMint benchmark suite
+
+Builds a synthetic project (see ``synthetic.py``) and times:
+
+* microbenchmarks: exclusion matching, the directory walk,
+  ``detect_project_type`` and building the upload payload
+* an end-to-end run (health check, scan, upload, answer) against the local
+  stand-in backend from ``tests/stub_backend.py`` with injected latency, and
+  repeat runs against a backend that accepts delta uploads
+
+Results are written as JSON so runs on different commits can be compared:
+
+    python benchmarks/run.py -o before.json
+    git checkout my-branch
+    python benchmarks/run.py -o after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+sys.path.insert(0, str(HERE.parent / 'tests'))
+
+from synthetic import generate_tree  # noqa: E402
+
+from docmint.cache import ScanCache  # noqa: E402
+from docmint.cli import DocMintCLI  # noqa: E402
+from docmint.compression import CompressedBody  # noqa: E402
+from docmint.config import DEFAULT_CONFIG  # noqa: E402
+from docmint.filetable import FileRecord  # noqa: E402
+from docmint.gitindex import parse_index  # noqa: E402
+from docmint.metadata import build_digest, summarize  # noqa: E402
+from docmint.multipart import FilePart, MultipartEncoder  # noqa: E402
+from docmint.packing import compact_text  # noqa: E402
+from docmint.prepare import FilePreparer, default_processes  # noqa: E402
+from docmint.ranking import RankedSelector  # noqa: E402
+from docmint.walker import ProjectWalker  # noqa: E402
+from stub_backend import StubBackend  # noqa: E402
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, number: int = 1) -> Dict[str, Any]:
+    """Time ``fn``; figures are seconds per call over ``repeat`` rounds of ``number`` calls"""
+    fn()  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'repeat': repeat,
+        'number': number,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(HERE.parent),
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def quiet_cli(**config: Any) -> DocMintCLI:
+    """A DocMintCLI with default settings, no persistent caches and no streaming"""
+    cli = DocMintCLI()
+    cli.config = dict(DEFAULT_CONFIG, scan_cache=False, response_cache=False, **config)
+    cli.use_response_cache = False
+    cli.stream_output = False
+    cli.health_check = False
+    return cli
+
+
+class Suite:
+    """Benchmarks over one synthetic project"""
+
+    def __init__(self, root: str, repeat: int, latency: float, e2e_runs: int):
+        self.root = root
+        self.repeat = repeat
+        self.latency = latency
+        self.e2e_runs = e2e_runs
+        self.cli = quiet_cli()
+        self.exclude_dirs = set(DEFAULT_CONFIG['excluded_dirs'])
+        self.exclude_files = set(DEFAULT_CONFIG['excluded_files'])
+        self.matcher = self.cli.build_exclusion_matcher(self.exclude_dirs, self.exclude_files)
+
+        # Every file and directory in the tree, excluded or not
+        self.paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel = os.path.relpath(dirpath, root)
+            base = Path(root) if rel == '.' else Path(root, rel)
+            self.paths.extend(base / name for name in dirnames + filenames)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.files = self.get_files()
+        self.project_type = self.cli.detect_project_type(self.files)
+
+    def get_files(self) -> List[FileRecord]:
+        return self.cli.get_project_files(self.root, self.exclude_dirs, self.exclude_files)
+
+    def build_parts(self) -> List[FilePart]:
+        parts = []
+        with ScanCache(None, 0) as cache:
+            for path in self.files:
+                info = cache.inspect(path.path)
+                if info.is_text and not info.blank:
+                    parts.append(FilePart('files', path.name, path.path, info.length, encoding=info.encoding))
+        return parts
+
+    def encoder(self) -> MultipartEncoder:
+        fields = [('projectType', self.project_type), ('contribution', 'true')]
+        return MultipartEncoder(fields, self.build_parts())
+
+    # Microbenchmarks
+
+    def bench_exclusion_matcher(self):
+        matches = self.matcher.matches
+        paths = self.paths
+        return lambda: [matches(path) for path in paths], {'items': len(paths)}
+
+    def bench_exclusion_should_exclude_path(self):
+        cli, paths = self.cli, self.paths
+        dirs, files = self.exclude_dirs, self.exclude_files
+        return lambda: [cli.should_exclude_path(path, dirs, files) for path in paths], {'items': len(paths)}
+
+    def bench_walk_project_walker(self):
+        extensions = self.cli.supported_extensions
+        max_size = self.cli.config['max_file_size']
+
+        def walk():
+            return ProjectWalker(self.root, self.matcher, extensions, max_size).walk()
+        return walk, {'items': len(walk())}
+
+    def bench_walk_get_project_files(self):
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return self.get_files()
+        return run, {'items': len(self.files)}
+
+    def bench_walk_git_index(self):
+        # Index the tree into a separate git directory so the project itself
+        # stays a plain directory for the other benchmarks
+        git_dir = tempfile.mkdtemp(prefix='docmint-bench-git-')
+        subprocess.run(['git', f'--git-dir={git_dir}', f'--work-tree={self.root}', 'init', '-q'], check=True)
+        subprocess.run(['git', f'--git-dir={git_dir}', f'--work-tree={self.root}', 'add', '-A'],
+                       cwd=self.root, check=True)
+        with open(os.path.join(git_dir, 'index'), 'rb') as f:
+            index = f.read()
+        max_size = self.cli.config['max_file_size']
+
+        def enumerate_files():
+            selector = RankedSelector(self.cli.config['max_files'])
+            self.cli.select_tracked_files(self.root, parse_index(index), self.matcher, max_size, selector)
+            return selector.selected()
+
+        # Memory held by the parsed listing, for comparison with the index size
+        tracemalloc.start()
+        listing = parse_index(index)
+        listing_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return enumerate_files, {'items': len(listing), 'index_bytes': len(index), 'listing_bytes': listing_bytes,
+                                 'cleanup': lambda: shutil.rmtree(git_dir)}
+
+    def bench_detect_project_type(self):
+        return lambda: self.cli.detect_project_type(self.files), {'items': len(self.files), 'number': 1000}
+
+    def bench_payload_multipart(self):
+        def build():
+            body = self.encoder()
+            while body.read(64 * 1024):
+                pass
+            return len(body)
+        return build, {'bytes': build()}
+
+    def bench_payload_gzip(self):
+        def build():
+            body = CompressedBody(self.encoder(), 'gzip')
+            body.close()
+            return len(body), body.raw_length
+        wire, raw = build()
+        return build, {'bytes': raw, 'wire_bytes': wire}
+
+    def prepare(self, threads: int, processes: int):
+        """Read and compact the selected files the way packing does"""
+        transform = functools.partial(compact_text, strip_code_comments=True)
+
+        def run():
+            with ScanCache(None, 0) as cache:
+                preparer = FilePreparer(cache, load_text=True, transform=transform,
+                                        threads=threads, processes=processes)
+                return sum(record.original for record in preparer.prepare(self.files))
+        return run, {'items': len(self.files), 'bytes': run()}
+
+    def bench_prepare_serial(self):
+        return self.prepare(1, 0)
+
+    def bench_prepare_pool(self):
+        return self.prepare(DEFAULT_CONFIG['prepare_threads'], default_processes())
+
+    def bench_metadata_digest(self):
+        texts = []
+        with ScanCache(None, 0) as cache:
+            for record in self.files:
+                texts.append((record.name, cache.read(record.path)[1]))
+
+        def build():
+            summaries = [(name, summarize(name, text)) for name, text in texts]
+            return build_digest([(name, summary) for name, summary in summaries if summary is not None])
+        return build, {'items': len(texts), 'bytes': sum(len(text.encode('utf-8')) for _, text in texts),
+                       'digest_bytes': len(build())}
+
+    # End to end
+
+    def e2e_run(self, url: str):
+        """Scan the project and generate its README against the backend at ``url``"""
+        cli = quiet_cli()
+        cli.base_url = url
+        cli.health_check = True
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                cli.start_health_check()
+                files = cli.get_project_files(self.root, self.exclude_dirs, self.exclude_files)
+                answer = cli.generate_readme_from_files(files, cli.detect_project_type(files),
+                                                        root=Path(self.root))
+            if not answer:
+                raise RuntimeError("end-to-end run did not produce a README")
+        finally:
+            cli.close()
+
+    def bench_e2e_generate_from_files(self):
+        server = StubBackend(latency=self.latency)
+        url = server.start()
+        return lambda: self.e2e_run(url), {'repeat': self.e2e_runs, 'latency': self.latency,
+                                           'cleanup': server.stop}
+
+    def bench_e2e_delta_repeat(self):
+        server = StubBackend(latency=self.latency, delta=True)
+        url = server.start()
+        self.e2e_run(url)
+        first = [r for r in server.requests if r['path'] == '/api/generate-from-files'][-1]['wire_bytes']
+
+        def run():
+            self.e2e_run(url)
+            return [r for r in server.requests if r['path'] == '/api/generate-from-files'][-1]['wire_bytes']
+        return run, {'repeat': self.e2e_runs, 'latency': self.latency, 'first_upload_bytes': first,
+                     'repeat_upload_bytes': run(), 'cleanup': server.stop}
+
+    def benchmarks(self) -> List[str]:
+        return [name[len('bench_'):] for name in dir(self) if name.startswith('bench_')]
+
+    def run(self, name: str) -> Dict[str, Any]:
+        fn, info = getattr(self, f'bench_{name}')()
+        cleanup = info.pop('cleanup', None)
+        try:
+            result = measure(fn, info.pop('repeat', self.repeat), info.pop('number', 1))
+        finally:
+            if cleanup is not None:
+                cleanup()
+        result.update(info)
+        return result
+
+
+def print_table(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None):
+    header = f"{'benchmark':<36} {'median':>12} {'min':>12}"
+    if baseline:
+        header += f" {'baseline':>12} {'change':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        line = f"{name:<36} {result['median'] * 1000:>10.3f}ms {result['min'] * 1000:>10.3f}ms"
+        old = (baseline or {}).get(name)
+        if old:
+            line += f" {old['median'] * 1000:>10.3f}ms {result['median'] / old['median']:>7.2f}x"
+        elif baseline:
+            line += f" {'-':>12} {'-':>8}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DocMint on a synthetic project")
+    parser.add_argument('-o', '--output', default='benchmark-results.json',
+                        help='JSON results file (default: benchmark-results.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--only', action='append', default=[],
+                        help='Run only benchmarks whose name starts with this (repeatable)')
+    parser.add_argument('--files', type=int, default=5000, help='Files in the synthetic project (default: 5000)')
+    parser.add_argument('--depth', type=int, default=6, help='Maximum directory depth (default: 6)')
+    parser.add_argument('--excluded-share', type=float, default=0.4,
+                        help='Share of files inside excluded directories (default: 0.4)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the project (default: 0)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed rounds per microbenchmark (default: 5)')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Seconds of latency added by the stand-in backend (default: 0.05)')
+    parser.add_argument('--e2e-runs', type=int, default=3, help='Timed end-to-end runs (default: 3)')
+    parser.add_argument('--keep', help='Generate the project here and keep it instead of a temporary directory')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='docmint-bench-') as tmp:
+        root = args.keep or os.path.join(tmp, 'project')
+
+        print(f"Generating {args.files} files in {root}...")
+        tree = generate_tree(root, args.files, args.depth, excluded_share=args.excluded_share, seed=args.seed)
+
+        suite = Suite(root, args.repeat, args.latency, args.e2e_runs)
+        names = [name for name in suite.benchmarks()
+                 if not args.only or any(name.startswith(prefix) for prefix in args.only)]
+
+        results = {}
+        for name in names:
+            print(f"  {name}...", flush=True)
+            results[name] = suite.run(name)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'tree': tree,
+        'benchmarks': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('benchmarks', {})
+
+    print()
+    print_table(results, baseline)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
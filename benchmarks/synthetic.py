@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Synthetic project trees for DocMint benchmarks
+
+Generates a deterministic project of a given size: source, config and doc
+files spread over nested packages, plus a configurable share of files inside
+directories DocMint excludes by default (``node_modules``, ``.git``, ...).
+
+    python benchmarks/synthetic.py /tmp/synthetic --files 5000 --depth 6
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Any, Dict
+
+EXCLUDED_DIRS = ['node_modules', '.git', 'dist', 'build', '__pycache__', 'venv', 'target']
+
+# (suffix, weight) of files outside excluded directories
+FILE_KINDS = [
+    ('.py', 30), ('.js', 20), ('.ts', 10), ('.md', 8), ('.json', 8), ('.yaml', 5),
+    ('.html', 4), ('.css', 4), ('.txt', 3), ('.log', 3), ('.png', 3), ('.pyc', 2),
+]
+
+ROOT_FILES = {
+    'package.json': '{\n  "name": "synthetic",\n  "version": "1.0.0",\n  "main": "index.js"\n}\n',
+    'requirements.txt': 'requests>=2.32.0\n',
+    'README.md': '# Synthetic project\n\nGenerated for benchmarking.\n',
+    'main.py': 'def main():\n    return 0\n\n\nif __name__ == "__main__":\n    main()\n',
+}
+
+LINE = "value_{n} = compute({n}, factor={f})  # synthetic line of source text\n"
+
+
+def _content(rng: random.Random, size: int) -> bytes:
+    parts = []
+    total = 0
+    while total < size:
+        line = LINE.format(n=total, f=rng.randint(0, 99))
+        parts.append(line)
+        total += len(line)
+    return ''.join(parts).encode('utf-8')[:size]
+
+
+def _subpath(rng: random.Random, depth: int, fanout: int) -> str:
+    return os.path.join(*[f"pkg{rng.randrange(fanout)}" for _ in range(depth)]) if depth else ''
+
+
+def generate_tree(root: str, files: int = 2000, depth: int = 5, fanout: int = 4,
+                  excluded_share: float = 0.3, min_size: int = 200, max_size: int = 8192,
+                  seed: int = 0) -> Dict[str, Any]:
+    """Create a synthetic project under ``root`` and describe what was made"""
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+
+    suffixes = [suffix for suffix, _ in FILE_KINDS]
+    weights = [weight for _, weight in FILE_KINDS]
+
+    total_bytes = 0
+    excluded = 0
+    for name, text in ROOT_FILES.items():
+        with open(os.path.join(root, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+        total_bytes += len(text)
+
+    for i in range(max(0, files - len(ROOT_FILES))):
+        if rng.random() < excluded_share:
+            excluded += 1
+            directory = os.path.join(rng.choice(EXCLUDED_DIRS), _subpath(rng, rng.randint(0, depth), fanout))
+        else:
+            directory = _subpath(rng, rng.randint(0, depth), fanout)
+        suffix = rng.choices(suffixes, weights)[0]
+        path = os.path.join(root, directory, f"file{i}{suffix}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = _content(rng, rng.randint(min_size, max_size))
+        with open(path, 'wb') as f:
+            f.write(data)
+        total_bytes += len(data)
+
+    return {
+        'root': os.path.abspath(root),
+        'files': max(files, len(ROOT_FILES)),
+        'excluded_files': excluded,
+        'depth': depth,
+        'fanout': fanout,
+        'excluded_share': excluded_share,
+        'bytes': total_bytes,
+        'seed': seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic project tree for benchmarks")
+    parser.add_argument('root', help='Directory to create the project in')
+    parser.add_argument('--files', type=int, default=2000, help='Number of files (default: 2000)')
+    parser.add_argument('--depth', type=int, default=5, help='Maximum directory depth (default: 5)')
+    parser.add_argument('--fanout', type=int, default=4, help='Subdirectories per directory (default: 4)')
+    parser.add_argument('--excluded-share', type=float, default=0.3,
+                        help='Share of files inside excluded directories (default: 0.3)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    info = generate_tree(args.root, args.files, args.depth, args.fanout, args.excluded_share, seed=args.seed)
+    print(json.dumps(info, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,8 +38,29 @@ __keywords__ = ["readme", "documentation", "generator", "markdown", "cli", "ai-p
 # Version info tuple for programmatic access
 VERSION_INFO = tuple(map(int, __version__.split('.')))
 
-# Export main components for programmatic access
-from .cli import DocMintCLI, main
+# Export main components for programmatic access. They are loaded on first
+# use so that ``import docmint`` stays cheap.
+_LAZY_EXPORTS = {
+    "DocMintCLI": ".cli",
+    "main": ".cli",
+    "DocMintClient": ".client",
+    "AsyncDocMintClient": ".client",
+    "DocMintError": ".errors",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 __all__ = [
     "__version__",
@@ -49,6 +70,9 @@ __all__ = [
     "__description__",
     "__url__",
     "DocMintCLI",
+    "DocMintClient",
+    "AsyncDocMintClient",
+    "DocMintError",
     "main",
     "VERSION_INFO"
 ]
@@ -0,0 +1,407 @@
+"""
+Batch mode for DocMint CLI
+
+``docmint batch`` generates READMEs for many repositories in one process.
+Repositories are scanned in parallel on a thread pool while generate requests
+go through an asyncio pipeline: at most ``--concurrency`` requests are in
+flight and a token bucket spaces them out to ``--rate`` per second. All
+requests share one health check and one pooled HTTP session.
+
+Scanning, project type detection and uploads reuse :class:`DocMintCLI`; each
+repository gets a :class:`RepoCLI` that records its messages instead of
+printing them, so results can be reported per repository.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .cli import Colors, DocMintCLI
+from .filetable import FileRecord
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` acquisitions per second on an event loop"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class BatchResult:
+    """Outcome of generating the README for one repository"""
+
+    def __init__(self, directory: Path, output: Path):
+        self.directory = directory
+        self.output = output
+        self.status = 'pending'
+        self.project_type = None
+        self.file_count = 0
+        self.cached = False
+        self.error = None
+        self.scan_seconds = 0.0
+        self.generate_seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+    def fail(self, error: str):
+        self.status = 'failed'
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'directory': str(self.directory),
+            'output': str(self.output),
+            'status': self.status,
+            'project_type': self.project_type,
+            'files': self.file_count,
+            'cached': self.cached,
+            'error': self.error,
+            'scan_seconds': round(self.scan_seconds, 3),
+            'generate_seconds': round(self.generate_seconds, 3),
+        }
+
+
+class RepoCLI(DocMintCLI):
+    """DocMintCLI for one repository of a batch
+
+    Shares configuration, the HTTP session and the tracer with the batch's
+    CLI, so ``--timings`` and ``--trace`` cover every repository, and keeps
+    its messages in ``messages`` rather than printing them.
+    """
+
+    def __init__(self, parent: DocMintCLI, before_request=None):
+        super().__init__(parent.base_url)
+        self.config = parent.config
+        self.supported_extensions = parent.supported_extensions
+        self.use_response_cache = parent.use_response_cache
+        self.refresh_response_cache = parent.refresh_response_cache
+        self.upload_encoding = parent.upload_encoding
+        self.accepted_encodings = parent.accepted_encodings
+        self.backend_features = parent.backend_features
+        self.session = parent.session
+        self.tracer = parent.tracer
+        self.health_check = False
+        self.stream_output = False
+        self.before_request = before_request
+        self.messages = []
+        self.last_error = None
+        self.cache_hit = False
+
+    def _record(self, level: str, message: str):
+        self.messages.append((level, Colors.strip(message)))
+
+    def print_success(self, message: str):
+        self._record('success', message)
+
+    def print_error(self, message: str):
+        self._record('error', message)
+        self.last_error = Colors.strip(message)
+
+    def print_warning(self, message: str):
+        self._record('warning', message)
+
+    def print_info(self, message: str):
+        self._record('info', message)
+
+    def print_progress(self, message: str):
+        self._record('progress', message)
+
+    def print_upload_progress(self, sent: int, total: int, elapsed: float):
+        pass
+
+    def finish_upload_progress(self, body):
+        pass
+
+    def print_file_summary(self, file_parts):
+        pass
+
+    def get_cached_answer(self, cache_key: str) -> Optional[str]:
+        answer = super().get_cached_answer(cache_key)
+        self.cache_hit = answer is not None
+        return answer
+
+    def post_generate(self, url: str, headers: Dict[str, str], **kwargs):
+        if self.before_request is not None:
+            self.before_request()
+        return super().post_generate(url, headers, **kwargs)
+
+    def close(self):
+        # The session belongs to the batch
+        self.session = None
+
+
+def read_manifest(path: str) -> List[str]:
+    """Read repository directories from a manifest, one per line
+
+    Blank lines and ``#`` comments are skipped; relative paths are taken
+    relative to the manifest itself.
+    """
+    manifest = Path(path)
+    base = manifest.resolve().parent
+    directories = []
+    with open(manifest, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                directories.append(str(base / os.path.expanduser(line)))
+    return directories
+
+
+class BatchRunner:
+    """Scan and generate READMEs for a list of repositories"""
+
+    def __init__(self, cli: DocMintCLI, directories: List[str], output: str = "README.md",
+                 project_type: Optional[str] = None, include_contributing: bool = True,
+                 exclude_dirs: Optional[Set[str]] = None, exclude_files: Optional[Set[str]] = None,
+                 workers: Optional[int] = None, concurrency: int = 4, rate: float = 2.0,
+                 scan_jobs: int = 4, on_result=None):
+        self.cli = cli
+        self.output = output
+        self.project_type = project_type
+        self.include_contributing = include_contributing
+        self.exclude_dirs = exclude_dirs
+        self.exclude_files = exclude_files
+        self.workers = workers
+        self.concurrency = max(1, int(concurrency))
+        self.rate = rate
+        self.scan_jobs = max(1, int(scan_jobs))
+        self.on_result = on_result
+
+        self.results = []
+        seen = set()
+        for directory in directories:
+            path = Path(directory).resolve()
+            if path in seen:
+                continue
+            seen.add(path)
+            self.results.append(BatchResult(path, path / output))
+
+    def scan(self, result: BatchResult, repo: RepoCLI) -> List[FileRecord]:
+        """Find and rank the files of one repository (runs on the scan pool)"""
+        started = time.monotonic()
+        try:
+            if not result.directory.is_dir():
+                result.fail(f"Directory not found: {result.directory}")
+                return []
+            files = repo.get_project_files(str(result.directory), self.exclude_dirs,
+                                           self.exclude_files, self.workers)
+            if not files:
+                result.fail("No supported code files found")
+                return []
+            result.file_count = len(files)
+            result.project_type = self.project_type or repo.detect_project_type(files)
+            return files
+        except Exception as e:
+            result.fail(f"Scan failed: {str(e)}")
+            return []
+        finally:
+            result.scan_seconds = time.monotonic() - started
+
+    def generate(self, result: BatchResult, repo: RepoCLI, files: List[FileRecord]):
+        """Upload one repository and save its README (runs on the request pool)"""
+        started = time.monotonic()
+        try:
+            content = repo.generate_readme_from_files(files, result.project_type,
+                                                      self.include_contributing, root=result.directory)
+            if not content:
+                result.fail(repo.last_error or "Failed to generate README")
+            elif repo.save_readme(content, str(result.output)):
+                result.status = 'ok'
+                result.cached = repo.cache_hit
+            else:
+                result.fail(repo.last_error or "Could not save README")
+        except Exception as e:
+            result.fail(f"Unexpected error: {str(e)}")
+        finally:
+            result.generate_seconds = time.monotonic() - started
+
+    async def process(self, result: BatchResult, backend_ready, limiter: RateLimiter,
+                      semaphore: asyncio.Semaphore, scan_pool, request_pool):
+        loop = asyncio.get_event_loop()
+
+        def before_request():
+            # Called on a request thread: wait for the event loop to grant a token
+            asyncio.run_coroutine_threadsafe(limiter.acquire(), loop).result()
+
+        repo = RepoCLI(self.cli, before_request)
+        try:
+            files = await loop.run_in_executor(scan_pool, self.scan, result, repo)
+            if files:
+                if not await backend_ready:
+                    result.fail(f"Cannot connect to DocMint backend at {self.cli.base_url}")
+                else:
+                    repo.accepted_encodings = self.cli.accepted_encodings
+                    repo.backend_features = self.cli.backend_features
+                    async with semaphore:
+                        await loop.run_in_executor(request_pool, self.generate, result, repo, files)
+        finally:
+            repo.close()
+        if self.on_result is not None:
+            self.on_result(result)
+
+    async def run_async(self) -> List[BatchResult]:
+        loop = asyncio.get_event_loop()
+        limiter = RateLimiter(self.rate)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        # One session for every repository, with a connection per request slot
+        self.cli.get_session(pool_size=self.concurrency + 1)
+        self.cli.start_health_check()
+
+        with ThreadPoolExecutor(self.scan_jobs, thread_name_prefix="docmint-scan") as scan_pool, \
+                ThreadPoolExecutor(self.concurrency, thread_name_prefix="docmint-request") as request_pool:
+            backend_ready = asyncio.ensure_future(loop.run_in_executor(None, self.cli.wait_for_backend))
+            await asyncio.gather(*(
+                self.process(result, backend_ready, limiter, semaphore, scan_pool, request_pool)
+                for result in self.results
+            ))
+            await backend_ready
+        return self.results
+
+    def run(self) -> List[BatchResult]:
+        """Process every repository and return their results in input order"""
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            return loop.run_until_complete(self.run_async())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+def print_result(cli: DocMintCLI, result: BatchResult):
+    """Report one finished repository"""
+    if result.ok:
+        details = f"{result.file_count} files, {result.project_type}, {result.generate_seconds:.1f}s"
+        if result.cached:
+            details += ", cached"
+        cli.print_success(f"{result.directory} → {result.output.name} ({details})")
+    else:
+        cli.print_error(f"{result.directory}: {result.error}")
+
+
+def run_batch(cli: DocMintCLI, argv: List[str]) -> int:
+    """Entry point for ``docmint batch``"""
+    parser = argparse.ArgumentParser(
+        prog="docmint batch",
+        description="Generate README files for many repositories in one run",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  {Colors.GREEN}docmint batch ~/src/api ~/src/web{Colors.END}          # Two repositories
+  {Colors.GREEN}docmint batch -m repos.txt --concurrency 8{Colors.END}  # Directories listed in a file
+  {Colors.GREEN}docmint batch -m repos.txt --report results.json{Colors.END}
+        """
+    )
+
+    parser.add_argument('directories', nargs='*',
+                        help='Repository directories to document')
+    parser.add_argument('-m', '--manifest', action='append', default=[],
+                        help='File listing one repository directory per line')
+    cli.add_run_arguments(parser)
+    parser.add_argument('--scan-jobs', type=int,
+                        help='Repositories scanned at the same time (default: from config)')
+    parser.add_argument('--concurrency', type=int,
+                        help='Generate requests in flight at the same time (default: from config)')
+    parser.add_argument('--rate', type=float,
+                        help='Maximum generate requests per second, 0 for no limit (default: from config)')
+    parser.add_argument('--report',
+                        help='Write per-repository results to this JSON file')
+
+    args = parser.parse_args(argv)
+
+    directories = list(args.directories)
+    for manifest in args.manifest:
+        try:
+            directories.extend(read_manifest(manifest))
+        except OSError as e:
+            cli.print_error(f"Could not read manifest {manifest}: {str(e)}")
+            return 1
+    if not directories:
+        parser.error("no repositories given (pass directories or --manifest)")
+
+    cli.apply_run_arguments(args)
+
+    if not args.no_banner:
+        cli.print_banner()
+
+    exclude_dirs = set(cli.config.get('excluded_dirs', []))
+    exclude_files = set(cli.config.get('excluded_files', []))
+    if args.exclude_dir:
+        exclude_dirs.update(cli.parse_exclude_patterns(args.exclude_dir))
+    if args.exclude_file:
+        exclude_files.update(cli.parse_exclude_patterns(args.exclude_file))
+
+    runner = BatchRunner(
+        cli, directories,
+        output=args.output,
+        project_type=args.type,
+        include_contributing=not args.no_contributing,
+        exclude_dirs=exclude_dirs,
+        exclude_files=exclude_files,
+        workers=args.workers,
+        concurrency=args.concurrency if args.concurrency is not None else cli.config.get('batch_concurrency', 4),
+        rate=args.rate if args.rate is not None else cli.config.get('batch_rate_limit', 2.0),
+        scan_jobs=args.scan_jobs if args.scan_jobs is not None else cli.config.get('batch_scan_jobs', 4),
+        on_result=lambda result: print_result(cli, result)
+    )
+
+    cli.print_info(f"Processing {len(runner.results)} repositories "
+                   f"({runner.concurrency} concurrent requests, "
+                   f"{f'{runner.rate:g}/s' if runner.rate > 0 else 'no rate limit'})")
+    try:
+        started = time.monotonic()
+        results = runner.run()
+        elapsed = time.monotonic() - started
+
+        succeeded = sum(1 for result in results if result.ok)
+        cached = sum(1 for result in results if result.ok and result.cached)
+        failed = len(results) - succeeded
+        summary = f"{succeeded} of {len(results)} READMEs generated in {elapsed:.1f}s"
+        if cached:
+            summary += f" ({cached} from cache)"
+        if failed:
+            cli.print_warning(f"{summary}, {failed} failed")
+        else:
+            cli.print_success(summary)
+
+        if args.report:
+            try:
+                with open(args.report, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'elapsed_seconds': round(elapsed, 3),
+                        'succeeded': succeeded,
+                        'failed': failed,
+                        'results': [result.to_dict() for result in results],
+                    }, f, indent=2)
+                cli.print_info(f"Report written to {args.report}")
+            except OSError as e:
+                cli.print_error(f"Could not write report: {str(e)}")
+
+        return 0 if failed == 0 else 1
+    finally:
+        cli.report_timings()
@@ -0,0 +1,322 @@
+"""
+Persistent caches for DocMint CLI
+
+The scan cache remembers the content hash, text length, sniffed kind and
+encoding and (for small files) decoded text of every file DocMint has read, keyed by path and validated
+against the file's size, modification time and inode. Repeat runs only read
+files that changed.
+
+The response cache remembers generated READMEs, keyed by a digest of
+everything that was sent to the backend, so an unchanged project does not
+have to be regenerated.
+
+Each cache is a SQLite database under ``~/.docmint/`` so that several DocMint
+processes can share it safely, and is evicted down to a byte budget in
+least-recently-used order.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .reader import SAMPLE_WINDOWS, FileInfo, hash_bytes, inspect_file
+from .sniff import KIND_TEXT
+
+# Seconds to wait for another process holding the database lock
+LOCK_TIMEOUT = 30.0
+
+# Rough per-row storage cost counted towards a cache's byte budget
+ROW_OVERHEAD = 128
+
+
+class SQLiteCache:
+    """Shared plumbing for the SQLite-backed caches
+
+    Subclasses provide ``SCHEMA`` with a ``TABLE`` that has ``key``,
+    ``nbytes`` and ``last_used`` columns, and bump ``SCHEMA_VERSION`` whenever
+    the table layout changes so stale databases are rebuilt. The connection
+    is shared by the preparation threads, so queries hold ``_lock``.
+    """
+
+    SCHEMA = ""
+    TABLE = ""
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_path: Optional[Path], max_bytes: int):
+        self.db_path = Path(db_path) if db_path is not None else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._touched = []
+        self._lock = threading.RLock()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use; a broken cache just disables caching"""
+        with self._lock:
+            return self._open()
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self.db_path is not None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), timeout=LOCK_TIMEOUT,
+                                       check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                if conn.execute('PRAGMA user_version').fetchone()[0] != self.SCHEMA_VERSION:
+                    conn.execute(f'DROP TABLE IF EXISTS {self.TABLE}')
+                    conn.execute(f'PRAGMA user_version = {int(self.SCHEMA_VERSION)}')
+                conn.executescript(self.SCHEMA)
+                self._conn = conn
+            except sqlite3.Error:
+                self.db_path = None
+        return self._conn
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits its byte budget"""
+        conn = self._connect()
+        if conn is None:
+            return
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                total = conn.execute(
+                    f'SELECT COALESCE(SUM(nbytes), 0) FROM {self.TABLE}'
+                ).fetchone()[0]
+                if total <= self.max_bytes:
+                    return
+                excess = total - self.max_bytes
+                freed = 0
+                stale = []
+                for key, nbytes in conn.execute(
+                        f'SELECT key, nbytes FROM {self.TABLE} ORDER BY last_used'):
+                    stale.append((key,))
+                    freed += nbytes
+                    if freed >= excess:
+                        break
+                conn.executemany(f'DELETE FROM {self.TABLE} WHERE key = ?', stale)
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        """Record cache hits for LRU ordering, evict, and close the database"""
+        conn = self._conn
+        if conn is None:
+            return
+        try:
+            if self._touched:
+                now = time.time()
+                with conn:
+                    conn.executemany(f'UPDATE {self.TABLE} SET last_used = ? WHERE key = ?',
+                                     [(now, key) for key in self._touched])
+                self._touched = []
+            self.evict()
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ScanCache(SQLiteCache):
+    """On-disk cache of file content hashes, text lengths and small file text"""
+
+    TABLE = 'files'
+    # Also bumped when sniffing rules change the stored file kinds
+    SCHEMA_VERSION = 5
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            key TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            length INTEGER NOT NULL,
+            blank INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            encoding TEXT,
+            sampling TEXT NOT NULL,
+            content TEXT,
+            nbytes INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used);
+    """
+
+    # Decoded text is only cached for files smaller than this
+    CONTENT_LIMIT = 256 * 1024
+
+    def __init__(self, db_path: Optional[Path], max_bytes: int, sample_budget: int = 0,
+                 sample_windows: int = SAMPLE_WINDOWS):
+        super().__init__(db_path, max_bytes)
+        self.sample_budget = sample_budget
+        self.sample_windows = sample_windows
+
+    def _sampling(self, size: int) -> str:
+        """How a file of ``size`` bytes is sampled under the current settings ('' if read whole)"""
+        if self.sample_budget > 0 and size > self.sample_budget:
+            return f"{self.sample_budget}/{self.sample_windows}"
+        return ''
+
+    def lookup(self, path: str, st: os.stat_result, count: bool = True) -> Optional[FileInfo]:
+        """Return the cached description of a file if it still matches the file
+
+        ``count`` adds the outcome to ``hits``/``misses``; reading a file
+        that was just inspected does not count it again.
+        """
+        conn = self._connect()
+        if conn is None:
+            return None
+        with self._lock:
+            try:
+                row = conn.execute(
+                    'SELECT size, mtime_ns, inode, digest, length, blank, kind, encoding, content, sampling '
+                    'FROM files WHERE key = ?',
+                    (path,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+
+            if row is None or tuple(row[:3]) != (st.st_size, st.st_mtime_ns, st.st_ino) \
+                    or (row[6] == KIND_TEXT and row[9] != self._sampling(st.st_size)):
+                if count:
+                    self.misses += 1
+                return None
+
+            if count:
+                self.hits += 1
+            self._touched.append(path)
+        return FileInfo(row[3], row[4], bool(row[5]), row[6], row[7], row[8], sampled=bool(row[9]))
+
+    def store(self, path: str, st: os.stat_result, info: FileInfo):
+        """Remember what is known about a file (including ``info.text``, if set)"""
+        conn = self._connect()
+        if conn is None:
+            return
+        content = info.text
+        nbytes = ROW_OVERHEAD + len(path) + (len(content.encode('utf-8')) if content is not None else 0)
+        try:
+            with self._lock, conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO files '
+                    '(key, size, mtime_ns, inode, digest, length, blank, kind, encoding, sampling, '
+                    'content, nbytes, last_used) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (path, st.st_size, st.st_mtime_ns, st.st_ino, info.digest, info.length,
+                     int(info.blank), info.kind, info.encoding,
+                     self._sampling(st.st_size) if info.sampled else '', content, nbytes, time.time())
+                )
+        except sqlite3.Error:
+            pass
+
+    def inspect(self, path: str) -> FileInfo:
+        """Describe a file, sniffing and streaming it only if it changed
+
+        ``length`` is the size in bytes of the file's text as it will be
+        uploaded. The file is never held in memory as a whole.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        cached = self.lookup(path, st)
+        if cached is not None:
+            return cached
+
+        keep_below = self.CONTENT_LIMIT if st.st_size < self.CONTENT_LIMIT or self._sampling(st.st_size) else 0
+        info = inspect_file(path, keep_below, sample_budget=self.sample_budget,
+                            sample_windows=self.sample_windows)
+        self.store(path, st, info)
+        return info
+
+    def read(self, path: str) -> Tuple[str, str]:
+        """Return ``(digest, content)`` for a file, reading it only if it changed
+
+        Files that are not text (see ``sniff.py``) read as empty.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        cached = self.lookup(path, st, count=False)
+        if cached is not None and (cached.text is not None or not cached.is_text):
+            return cached.digest, cached.text or ''
+
+        info = inspect_file(path, sys.maxsize, sample_budget=self.sample_budget,
+                            sample_windows=self.sample_windows)
+        text = info.text or ''
+        if info.text is not None and info.length >= self.CONTENT_LIMIT:
+            info.text = None
+        self.store(path, st, info)
+        return info.digest, text
+
+
+def payload_digest(payload: Dict[str, Any]) -> str:
+    """Return a stable digest of a generate request payload"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hash_bytes(encoded.encode('utf-8'))
+
+
+class ResponseCache(SQLiteCache):
+    """On-disk cache of generated READMEs keyed by request payload digest"""
+
+    TABLE = 'responses'
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            answer TEXT NOT NULL,
+            created REAL NOT NULL,
+            nbytes INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+    """
+
+    def __init__(self, db_path: Optional[Path], max_bytes: int, ttl: float):
+        super().__init__(db_path, max_bytes)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached answer for ``key`` unless it is missing or expired"""
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute('SELECT answer, created FROM responses WHERE key = ?',
+                               (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+
+        if row is None or (self.ttl > 0 and time.time() - row[1] > self.ttl):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched.append(key)
+        return row[0]
+
+    def put(self, key: str, answer: str):
+        """Store a generated answer"""
+        conn = self._connect()
+        if conn is None:
+            return
+        now = time.time()
+        try:
+            with conn:
+                if self.ttl > 0:
+                    conn.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl,))
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, answer, created, nbytes, last_used) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, answer, now, len(answer.encode('utf-8')), now)
+                )
+        except sqlite3.Error:
+            pass
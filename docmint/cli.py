@@ -6,13 +6,33 @@ Compatible with Windows, macOS, and Linux
 
 import os
 import sys
+import stat
 import json
 import argparse
-import requests
+import functools
+import threading
 import time
 from pathlib import Path
-from typing import List, Optional, Dict, Set
-import mimetypes
+from typing import Any, List, Optional, Dict, Set, Tuple
+
+from .cache import ResponseCache, ScanCache, payload_digest
+from .compression import CompressedBody, available_encodings, choose_encoding, server_encodings
+from .delta import DELTA_FEATURE, MANIFEST_FIELD, dedupe_parts, encode_manifest, missing_digests, server_features
+from .errors import (BackendUnavailableError, DocMintError, GenerationError, NetworkError, NoFilesError,
+                     RequestTimeoutError)
+from .exclude import ExclusionMatcher, compile_matcher
+from .filetable import FileRecord, FileTable
+from .gitindex import tracked_files
+from .ignore import IgnoreMatcher, load_ignore_files
+from .metadata import DIGEST_MODES, DIGEST_NAME, DIGEST_VERSION, MANIFEST_SUMMARIZERS, build_digest, summarize
+from .multipart import FilePart, MultipartEncoder
+from .packing import MIN_SHARE, TextSpool, compact_text, fit_bytes, fit_shares, packing_key
+from .prepare import FilePreparer, default_processes
+from .ranking import DEPTH_PENALTY, RankedSelector, score_file
+from .sniff import KIND_BINARY
+from .streaming import STREAM_ACCEPT, AtomicWriter, StreamError, is_streaming_response, iter_answer_chunks
+from .tracing import Tracer
+from .walker import DEFAULT_WORKERS, ProjectWalker
 
 # Color codes for terminal output
 class Colors:
@@ -50,23 +70,114 @@ class Colors:
 # Initialize colors for Windows
 Colors.init_windows()
 
+def format_bytes(size: float) -> str:
+    """Format a byte count for display"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:,.0f} {unit}" if unit == 'B' else f"{size:,.1f} {unit}"
+        size /= 1024
+
+class ConfigOption:
+    """Setting that follows a config key until it is assigned (e.g. from a flag)"""
+    
+    def __init__(self, key: str, default: Any):
+        self.key = key
+        self.default = default
+    
+    def __set_name__(self, owner, name: str):
+        self.attr = f"_{name}"
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.attr in obj.__dict__:
+            return obj.__dict__[self.attr]
+        return obj.config.get(self.key, self.default)
+    
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = value
+
 class DocMintCLI:
+    # Response cache switch (--no-cache)
+    use_response_cache = ConfigOption('response_cache', True)
+    # Request body compression (--compress), negotiated via /api/health/
+    upload_encoding = ConfigOption('upload_encoding', 'none')
+    # Backend preflight (--skip-health-check)
+    health_check = ConfigOption('health_check', True)
+    # Streamed generation (--no-stream disables it)
+    stream_output = ConfigOption('stream_output', True)
+    
     def __init__(self, base_url: str = "https://docmint.onrender.com"):
         self.base_url = base_url.rstrip('/')
-        self.supported_extensions = {
-            '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.cs',
-            '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.scala', '.html',
-            '.css', '.scss', '.sass', '.less', '.vue', '.svelte', '.md', '.txt',
-            '.json', '.xml', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf'
-        }
+        self._supported_extensions = None
+        
+        # Phase timings (--timings / --trace)
+        self.tracer = Tracer()
+        self.show_timings = False
+        self.trace_path = None
+        self._upload_finished = None
+        
+        # Configuration is read on first use, so --help never touches it
+        self._config = None
+        
+        self.refresh_response_cache = False
+        self.accepted_encodings = set()
+        self.backend_features = set()
         
-        # Load configuration
-        from .config import get_config
-        self.config = get_config()
+        # Shared HTTP client, created on first use
+        self.session = None
+        self.backend_available = None
+        self._health_thread = None
+        self._health_reported = False
         
-        # Update supported extensions from config
-        if 'supported_extensions' in self.config:
-            self.supported_extensions.update(self.config['supported_extensions'])
+        self.output_path = "README.md"
+        self.streamed_output = None
+        
+        self._last_progress = 0.0
+        self._progress_width = 0
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Configuration from ~/.docmint/config.json, loaded on first access"""
+        if self._config is None:
+            from .config import get_config
+            with self.tracer.span('config_load'):
+                self._config = get_config()
+        return self._config
+    
+    @config.setter
+    def config(self, value: Dict[str, Any]):
+        self._config = value
+    
+    @property
+    def supported_extensions(self) -> Set[str]:
+        """Built-in file extensions plus those from the configuration"""
+        if self._supported_extensions is None:
+            extensions = {
+                '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.cs',
+                '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.scala', '.html',
+                '.css', '.scss', '.sass', '.less', '.vue', '.svelte', '.md', '.txt',
+                '.json', '.xml', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf'
+            }
+            # Update supported extensions from config
+            if 'supported_extensions' in self.config:
+                extensions.update(self.config['supported_extensions'])
+            self._supported_extensions = extensions
+        return self._supported_extensions
+    
+    @supported_extensions.setter
+    def supported_extensions(self, value: Set[str]):
+        self._supported_extensions = value
+    
+    @property
+    def supported_names(self) -> Set[str]:
+        """Manifest names (lower case) analyzed whatever their extension, such as ``go.mod``"""
+        return set(MANIFEST_SUMMARIZERS)
+    
+    def is_supported(self, name: str) -> bool:
+        """Whether a file name has a supported extension or is a supported manifest"""
+        lower = name.lower()
+        return os.path.splitext(lower)[1] in self.supported_extensions or lower in self.supported_names
     
     def print_banner(self):
         """Print the DocMint CLI banner"""
@@ -104,6 +215,10 @@ class DocMintCLI:
     def print_progress(self, message: str):
         print(f"{Colors.MAGENTA}{Colors.BOLD}⟳{Colors.END} {Colors.MAGENTA}{message}{Colors.END}")
     
+    def echo(self, text: str = "", end: str = "\n", flush: bool = False):
+        """Write unstyled text to the terminal (messages go through the print_* helpers)"""
+        print(text, end=end, flush=flush)
+    
     def animate_loading(self, message: str, duration: float = 2.0):
         """Animate a loading spinner"""
         chars = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
@@ -111,25 +226,140 @@ class DocMintCLI:
         i = 0
         
         while time.time() - start_time < duration:
-            print(f"\r{Colors.CYAN}{chars[i % len(chars)]}{Colors.END} {message}", end="", flush=True)
+            self.echo(f"\r{Colors.CYAN}{chars[i % len(chars)]}{Colors.END} {message}", end="", flush=True)
             time.sleep(0.1)
             i += 1
         
-        print(f"\r{Colors.GREEN}✓{Colors.END} {message}")
+        self.echo(f"\r{Colors.GREEN}✓{Colors.END} {message}")
+    
+    def print_upload_progress(self, sent: int, total: int, elapsed: float):
+        """Show bytes sent and throughput while a request body is streamed"""
+        now = time.monotonic()
+        if sent < total and now - self._last_progress < 0.1:
+            return
+        self._last_progress = now
+        rate = sent / elapsed if elapsed > 0 else 0
+        line = (f"{Colors.MAGENTA}⟳{Colors.END} Uploading {format_bytes(sent)} of {format_bytes(total)} "
+                f"({format_bytes(rate)}/s)")
+        self._progress_width = len(Colors.strip(line))
+        self.echo(f"\r{line}", end="", flush=True)
+    
+    def on_upload_progress(self, sent: int, total: int, elapsed: float):
+        """Track when the last byte of the body went out, then show progress"""
+        if sent >= total:
+            self._upload_finished = time.perf_counter()
+        self.print_upload_progress(sent, total, elapsed)
+    
+    def finish_upload_progress(self, body):
+        """Replace the upload progress line with a summary"""
+        if body.started is None:
+            return
+        elapsed = time.monotonic() - body.started
+        rate = body.bytes_sent / elapsed if elapsed > 0 else 0
+        line = (f"{Colors.GREEN}✓{Colors.END} Uploaded {format_bytes(body.bytes_sent)} "
+                f"in {elapsed:.1f}s ({format_bytes(rate)}/s)")
+        padding = " " * max(0, self._progress_width - len(Colors.strip(line)))
+        self.echo(f"\r{line}{padding}")
+        self._progress_width = 0
+    
+    def get_session(self, pool_size: int = 4):
+        """Return the pooled, retrying HTTP client shared by all backend calls"""
+        if self.session is None:
+            # Imported here so that requests is only loaded when it is needed
+            from .transport import BackendSession
+            self.session = BackendSession(
+                retries=self.config.get('http_retries', 3),
+                backoff=self.config.get('http_backoff', 0.5),
+                connect_timeout=self.config.get('connect_timeout', 10),
+                read_timeout=self.config.get('read_timeout', 60),
+                pool_size=pool_size,
+                on_retry=self.print_retry
+            )
+        return self.session
+    
+    def print_retry(self, attempt: int, delay: float, reason: str):
+        """Report a retried backend request"""
+        if self._progress_width:
+            self.echo()
+            self._progress_width = 0
+        self.print_warning(f"Backend request {reason}, retrying in {delay:.1f}s (retry {attempt})")
+    
+    def close(self):
+        """Release pooled backend connections"""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
     
     def check_network_connection(self) -> bool:
         """Check if the backend is reachable"""
+        import requests
+        session = self.get_session()
         try:
-            response = requests.get(f"{self.base_url}/api/health/", timeout=5)
-            return response.status_code == 200
+            response = session.get(f"{self.base_url}/api/health/",
+                                   read_timeout=self.config.get('health_timeout', 5))
+            if response.status_code == 200:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = None
+                self.accepted_encodings = server_encodings(response.headers, body)
+                self.backend_features = server_features(body)
+                return True
+            return False
         except requests.exceptions.RequestException:
             try:
                 # Fallback: try to reach a known endpoint
-                response = requests.head(self.base_url, timeout=5)
+                response = session.head(self.base_url, read_timeout=5, retry=False)
                 return True
             except requests.exceptions.RequestException:
                 return False
     
+    def start_health_check(self):
+        """Check the backend on a background thread while the project is scanned"""
+        if not self.health_check or self._health_thread is not None or self.backend_available:
+            return
+        
+        def check():
+            with self.tracer.span('health_check') as span:
+                try:
+                    self.backend_available = self.check_network_connection()
+                except Exception:
+                    self.backend_available = False
+                span.count(available=bool(self.backend_available))
+        
+        self.print_progress("Checking connection to DocMint backend...")
+        self._health_thread = threading.Thread(target=check, name="docmint-health-check", daemon=True)
+        self._health_thread.start()
+    
+    def reset_health_check(self):
+        """Forget the last health check so the next one asks the backend again"""
+        self._health_thread = None
+        self._health_reported = False
+        self.backend_available = None
+    
+    @property
+    def health_checked(self) -> bool:
+        """Whether the backend was asked by this client rather than assumed available"""
+        return self._health_thread is not None
+    
+    def wait_for_backend(self) -> bool:
+        """Wait for the background health check and report its outcome"""
+        if self._health_thread is None:
+            return True
+        self._health_thread.join()
+        
+        if not self._health_reported:
+            self._health_reported = True
+            if self.backend_available:
+                self.print_success("Connected to DocMint backend!")
+            else:
+                self.print_error(f"Cannot connect to DocMint backend at {self.base_url}")
+                self.print_info("Please check:")
+                self.print_info("1. Your internet connection")
+                self.print_info("2. The backend URL is correct")
+                self.print_info("3. The DocMint backend is running")
+        return bool(self.backend_available)
+    
     def parse_exclude_patterns(self, exclude_args: List[str]) -> Set[str]:
         """Parse exclude arguments into a set of patterns"""
         exclude_patterns = set()
@@ -143,43 +373,24 @@ class DocMintCLI:
         
         return exclude_patterns
     
+    def build_exclusion_matcher(self, exclude_dirs: Set[str], exclude_files: Set[str]) -> ExclusionMatcher:
+        """Compile exclusion patterns into a reusable matcher"""
+        return compile_matcher(exclude_dirs, exclude_files)
+    
     def should_exclude_path(self, file_path: Path, exclude_dirs: Set[str], exclude_files: Set[str]) -> bool:
         """Check if a path should be excluded based on patterns"""
-        path_str = str(file_path)
-        path_parts = file_path.parts
-        
-        # Check directory exclusions
-        for exclude_dir in exclude_dirs:
-            # Exact directory name match
-            if exclude_dir in path_parts:
-                return True
-            # Pattern matching (simple wildcards)
-            if '*' in exclude_dir:
-                import fnmatch
-                if any(fnmatch.fnmatch(part, exclude_dir) for part in path_parts):
-                    return True
-        
-        # Check file exclusions
-        for exclude_file in exclude_files:
-            # Exact filename match
-            if file_path.name == exclude_file:
-                return True
-            # Pattern matching (simple wildcards)
-            if '*' in exclude_file:
-                import fnmatch
-                if fnmatch.fnmatch(file_path.name, exclude_file):
-                    return True
-            # Full path pattern matching
-            if '/' in exclude_file or '\\' in exclude_file:
-                import fnmatch
-                if fnmatch.fnmatch(path_str, exclude_file):
-                    return True
-        
-        return False
+        return self.build_exclusion_matcher(exclude_dirs, exclude_files).matches(file_path)
     
     def get_project_files(self, directory: str, exclude_dirs: Optional[Set[str]] = None, 
-                         exclude_files: Optional[Set[str]] = None) -> List[Path]:
-        """Get all supported project files from the directory"""
+                         exclude_files: Optional[Set[str]] = None,
+                         workers: Optional[int] = None) -> List[FileRecord]:
+        """Get the most informative supported project files from the directory"""
+        return self.select_project_files(directory, exclude_dirs, exclude_files, workers)
+    
+    def select_project_files(self, directory: str, exclude_dirs: Optional[Set[str]] = None,
+                             exclude_files: Optional[Set[str]] = None,
+                             workers: Optional[int] = None) -> List[FileRecord]:
+        """Rank the supported project files and return records for the best, best first"""
         if exclude_dirs is None:
             exclude_dirs = set(self.config.get('excluded_dirs', [
                 'node_modules', '.git', '__pycache__', '.pytest_cache',
@@ -190,36 +401,148 @@ class DocMintCLI:
         if exclude_files is None:
             exclude_files = set()
         
-        files = []
+        with self.tracer.span('exclusion', dir_patterns=len(exclude_dirs), file_patterns=len(exclude_files)):
+            matcher = self.build_exclusion_matcher(exclude_dirs, exclude_files)
+        # Oversized files are sampled rather than dropped when sampling is on
+        if self.config.get('sample_threshold', 0) > 0:
+            max_size = sys.maxsize
+        else:
+            max_size = self.config.get('max_file_size', 1024 * 1024)
+        
         directory_path = Path(directory)
-        excluded_count = 0
         
-        for file_path in directory_path.rglob('*'):
-            if file_path.is_file():
-                # Check if file should be excluded
-                if self.should_exclude_path(file_path, exclude_dirs, exclude_files):
-                    excluded_count += 1
-                    continue
-                
-                # Check if file extension is supported
-                if file_path.suffix.lower() in self.supported_extensions:
-                    # Skip very large files (>1MB by default)
-                    max_size = self.config.get('max_file_size', 1024 * 1024)
-                    if file_path.stat().st_size < max_size:
-                        files.append(file_path)
+        # Every path below an excluded directory is excluded, so there is
+        # nothing to walk when the project itself sits inside one
+        if matcher.excludes_any_part(directory_path.parts):
+            self.print_info("Project directory matches an excluded directory pattern")
+            return []
+        
+        selector = RankedSelector(self.config.get('max_files', 20))
+        
+        # In a git checkout the index already lists the tracked files, which
+        # leaves out whatever .gitignore excludes, so nothing is walked
+        tracked = None
+        if self.config.get('use_git_index', True):
+            tracked = tracked_files(str(directory_path), matcher.excludes_part)
+        if tracked is not None:
+            with self.tracer.span('walk', source='git-index') as span:
+                excluded = self.select_tracked_files(str(directory_path), tracked, matcher, max_size, selector)
+                selected = selector.ranked()
+                span.count(files_seen=len(tracked), excluded=excluded, selected=len(selected))
+            self.print_info(f"Listed {len(tracked):,} files in the git checkout")
+        else:
+            if workers is None:
+                workers = self.config.get('scan_workers', DEFAULT_WORKERS)
+            ignore = IgnoreMatcher() if self.config.get('use_ignore_files', True) else None
+            walker = ProjectWalker(str(directory_path), matcher, self.supported_extensions,
+                                   max_size, workers, ignore, self.supported_names)
+            
+            # Rank files as they are found and keep only the best max_files;
+            # stop walking once nothing deeper could make the cut
+            with self.tracer.span('walk', source='filesystem') as span:
+                levels = walker.iter_levels()
+                try:
+                    for depth, level_files in levels:
+                        for path, size in level_files:
+                            selector.offer(path, size, depth)
+                        if not selector.can_improve(depth + 1):
+                            break
+                finally:
+                    levels.close()
+                selected = selector.ranked()
+                span.count(dirs_scanned=walker.dirs_scanned, files_seen=walker.files_seen,
+                           excluded=walker.excluded_count, selected=len(selected))
+            excluded = walker.excluded_count
         
         # Show exclusion summary
-        if excluded_count > 0:
-            self.print_info(f"Excluded {excluded_count} files/directories based on patterns")
+        if excluded > 0:
+            self.print_info(f"Excluded {excluded} files/directories based on patterns")
         
-        # Limit files based on config
-        max_files = self.config.get('max_files', 20)
-        return files[:max_files]
+        root = str(directory_path)
+        return [FileRecord.from_path(root, path, size, score) for path, size, score in selected]
     
-    def detect_project_type(self, files: List[Path]) -> str:
-        """Detect the project type based on files"""
-        file_names = [f.name.lower() for f in files]
-        extensions = [f.suffix.lower() for f in files]
+    def select_tracked_files(self, root: str, tracked: FileTable, matcher: ExclusionMatcher,
+                             max_size: int, selector: RankedSelector) -> int:
+        """Offer the tracked files that pass the exclusion rules to the selector, returning the excluded count"""
+        directories, names = tracked.directories, tracked.names
+        # .docmintignore still applies to tracked files
+        ignore_ids = {name_id for name_id, name in enumerate(names) if name == '.docmintignore'}
+        ignore_dirs = [''] + sorted({directories[dir_id].replace(os.sep, '/')
+                                     for dir_id, name_id in zip(tracked.dir_ids, tracked.name_ids)
+                                     if name_id in ignore_ids and directories[dir_id]})
+        ignore = load_ignore_files(root, ignore_dirs, ('.docmintignore',))
+        extensions = self.supported_extensions
+        supported_names = self.supported_names
+        # Extensions and directory and name rules are checked once for each
+        # distinct directory and base name
+        wanted = [name[name.rfind('.'):].lower() in extensions or name.lower() in supported_names
+                  for name in names]
+        # The best score each name can get, at size 0 in the root
+        best_scores = [score_file(name, 0, 0) if want else 0.0 for name, want in zip(names, wanted)]
+        name_excluded = [matcher.excludes_part(name) for name in names]
+        dir_excluded = [bool(directory) and matcher.excludes_any_part(directory.split(os.sep))
+                        for directory in directories]
+        prefix = '' if root == '.' else os.path.join(root, '')
+        excluded = 0
+        for dir_id, name_id in zip(tracked.dir_ids, tracked.name_ids):
+            if not wanted[name_id]:
+                continue
+            if dir_excluded[dir_id] or name_excluded[name_id]:
+                excluded += 1
+                continue
+            directory, name = directories[dir_id], names[name_id]
+            path = directory + os.sep + name if directory else name
+            full_path = prefix + path
+            if matcher.excludes_file(name, full_path) or (ignore and ignore.excludes(path.replace(os.sep, '/'))):
+                excluded += 1
+                continue
+            depth = path.count(os.sep)
+            if not selector.can_keep(best_scores[name_id] - DEPTH_PENALTY * depth):
+                continue
+            # The index may list files deleted since, and sizes that changed
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode) and st.st_size < max_size:
+                selector.offer(full_path, st.st_size, depth)
+        return excluded
+    
+    def open_scan_cache(self) -> ScanCache:
+        """Open the persistent scan cache (disabled caches never touch disk)"""
+        from .config import SCAN_CACHE_FILE
+        db_path = SCAN_CACHE_FILE if self.config.get('scan_cache', True) else None
+        return ScanCache(db_path, self.config.get('scan_cache_max_bytes', 256 * 1024 * 1024),
+                         sample_budget=self.config.get('sample_threshold', 0),
+                         sample_windows=self.config.get('sample_windows', 3))
+    
+    def open_response_cache(self) -> ResponseCache:
+        """Open the persistent cache of generated READMEs"""
+        from .config import RESPONSE_CACHE_FILE
+        return ResponseCache(
+            RESPONSE_CACHE_FILE if self.use_response_cache else None,
+            self.config.get('response_cache_max_bytes', 64 * 1024 * 1024),
+            self.config.get('response_cache_ttl', 7 * 24 * 60 * 60)
+        )
+    
+    def get_cached_answer(self, cache_key: str) -> Optional[str]:
+        """Return a previously generated README for the same request, if any"""
+        if not self.use_response_cache or self.refresh_response_cache:
+            return None
+        with self.open_response_cache() as cache:
+            return cache.get(cache_key)
+    
+    def cache_answer(self, cache_key: str, answer: str):
+        """Remember a generated README for identical future requests"""
+        if not self.use_response_cache:
+            return
+        with self.open_response_cache() as cache:
+            cache.put(cache_key, answer)
+    
+    def detect_project_type(self, files: List[FileRecord]) -> str:
+        """Detect the project type based on files (records or paths)"""
+        file_names = [os.path.basename(f).lower() for f in files]
+        extensions = [os.path.splitext(name)[1] for name in file_names]
         
         # Check for specific files that indicate project type
         if 'package.json' in file_names:
@@ -252,123 +575,612 @@ class DocMintCLI:
             return 'General Software'
     
     def generate_readme_from_prompt(self, prompt: str) -> Optional[str]:
-        """Generate README from a text prompt"""
+        """Generate README from a text prompt (errors are printed, returning None)"""
+        return self.report_errors(self.request_readme_from_prompt, prompt)
+    
+    def request_readme_from_prompt(self, prompt: str) -> str:
+        """Generate README from a text prompt, raising a DocMintError if it fails"""
+        import requests
+        self.print_progress("Generating README from prompt...")
+        
+        payload = {"message": prompt}
+        
+        cache_key = payload_digest({
+            'endpoint': '/api/generate/',
+            'backend': self.base_url,
+            'message': prompt
+        })
+        cached = self.get_cached_answer(cache_key)
+        if cached is not None:
+            self.print_success("Using cached README (request unchanged since last run)")
+            return cached
+        
+        self.require_backend()
+        
         try:
-            self.print_progress("Generating README from prompt...")
-            
-            payload = {"message": prompt}
-            
-            response = requests.post(
+            response = self.post_generate(
                 f"{self.base_url}/api/generate/",
                 json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=30
+                headers={'Content-Type': 'application/json'}
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'answer' in result:
-                    return result['answer']
-                elif 'error' in result:
-                    self.print_error(f"API Error: {result['error']}")
-                    return None
-            else:
-                self.print_error(f"HTTP Error {response.status_code}: {response.text}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            self.print_error("Request timed out. Please try again.")
-            return None
+            return self.read_answer(response, cache_key, nested=False)
+        except requests.exceptions.Timeout as e:
+            raise RequestTimeoutError("Request timed out. Please try again.") from e
         except requests.exceptions.RequestException as e:
-            self.print_error(f"Network error: {str(e)}")
+            raise NetworkError(f"Network error: {str(e)}") from e
+    
+    def report_errors(self, request, *args, **kwargs) -> Optional[str]:
+        """Call a request_* method, printing its error and returning None if it fails"""
+        try:
+            return request(*args, **kwargs)
+        except BackendUnavailableError:
+            # wait_for_backend has already explained the problem
+            return None
+        except DocMintError as e:
+            self.print_error(str(e))
             return None
         except Exception as e:
             self.print_error(f"Unexpected error: {str(e)}")
             return None
     
-    def generate_readme_from_files(self, files: List[Path], project_type: str, include_contributing: bool = True) -> Optional[str]:
-        """Generate README from project files"""
-        try:
-            self.print_progress(f"Analyzing {len(files)} files...")
-            
-            # Prepare files for upload
-            files_data = []
-            file_contents = {}
+    def require_backend(self):
+        """Wait for the health check, raising BackendUnavailableError if it failed"""
+        if not self.wait_for_backend():
+            raise BackendUnavailableError(f"Cannot connect to DocMint backend at {self.base_url}")
+    
+    def read_answer(self, response, cache_key: str, nested: bool = True) -> str:
+        """Read the README from a generate response and cache it
+        
+        JSON answers are ``{"result": {"answer": ...}}``, or ``{"answer": ...}``
+        when ``nested`` is False.
+        """
+        if response.status_code != 200:
+            raise GenerationError(f"HTTP Error {response.status_code}: {response.text}", response.status_code)
+        if is_streaming_response(response):
+            answer = self.receive_streamed_answer(response)
+        else:
+            result = response.json()
+            answer = (result.get('result') or {}).get('answer') if nested else result.get('answer')
+            if answer is None and 'error' in result:
+                raise GenerationError(f"API Error: {result['error']}")
+            if not answer:
+                raise GenerationError("The backend returned an empty README")
+        self.cache_answer(cache_key, answer)
+        return answer
+    
+    def print_file_summary(self, file_parts: List[FilePart]):
+        """List the files about to be sent to the backend"""
+        self.print_info(f"Processing files:")
+        for part in file_parts[:10]:  # Show first 10 files
+            sampled = ", sampled" if part.sample is not None else ""
+            self.echo(f"  {Colors.CYAN}•{Colors.END} {part.filename} ({part.length:,} bytes{sampled})")
+        
+        if len(file_parts) > 10:
+            self.print_info(f"... and {len(file_parts) - 10} more files")
+    
+    def file_preparer(self, scan_cache: ScanCache) -> FilePreparer:
+        """Build the worker pool that reads files, compacts them when packing and summarizes them for the digest"""
+        compact = self.config.get('pack_payload', True)
+        transform = None
+        if compact:
+            transform = functools.partial(compact_text, strip_code_comments=self.config.get('strip_comments', True))
+        digest = self.config.get('metadata_digest', 'off') != 'off'
+        processes = self.config.get('prepare_processes', 0)
+        return FilePreparer(scan_cache,
+                            load_text=compact or digest or self.config.get('payload_budget', 0) > 0,
+                            transform=transform,
+                            threads=self.config.get('prepare_threads', 8),
+                            processes=processes if processes > 0 else default_processes(),
+                            max_in_flight=self.config.get('prepare_in_flight', 32),
+                            extract=summarize if digest else None)
+    
+    def summarize_file_parts(self, file_parts: List[FilePart],
+                             summaries: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[FilePart], Optional[FilePart]]:
+        """Build the metadata digest from the files' summaries
+        
+        Returns the files still to upload (in ``instead`` mode, those that
+        were not summarized) and the digest part, or None when it is off.
+        """
+        mode = self.config.get('metadata_digest', 'off')
+        if mode == 'off' or not summaries:
+            return file_parts, None
+        
+        with self.tracer.span('digest') as span:
+            data = build_digest(summaries)
+            summarized = {name for name, _ in summaries}
+            replaced = sum(part.length for part in file_parts if part.filename in summarized)
+            if mode == 'instead':
+                file_parts = [part for part in file_parts if part.filename not in summarized]
+            span.count(files=len(summaries), bytes_in=replaced, bytes_out=len(data))
+        
+        count = f"{len(summaries)} manifest and source file{'s' if len(summaries) != 1 else ''}"
+        if mode == 'instead':
+            self.print_info(f"Summarized {count} ({format_bytes(replaced)}) in a "
+                            f"{format_bytes(len(data))} digest sent in their place")
+        else:
+            self.print_info(f"Summarized {count} in a {format_bytes(len(data))} digest")
+        return file_parts, FilePart('files', DIGEST_NAME, '', len(data), content_type='application/json', content=data)
+    
+    def pack_file_parts(self, file_parts: List[FilePart], scan_cache: ScanCache, prepared: TextSpool,
+                        priorities: Dict[str, float], reserve: int = 0) -> List[FilePart]:
+        """Compact the files and fit them into the payload budget
+
+        ``prepared`` holds text the worker pool already compacted, with its
+        original size; other files are read, compacted and added to it here.
+        The budget is split by the files' ranking scores in ``priorities``.
+        Packed files are sent from memory, or streamed from the spool's file
+        when it spilled them. ``reserve`` bytes of the budget are already
+        taken (by the digest).
+        """
+        compact = self.config.get('pack_payload', True)
+        budget = self.config.get('payload_budget', 0)
+        if budget > 0 and reserve:
+            budget = max(budget - reserve, MIN_SHARE)
+        if not file_parts or (not compact and budget <= 0):
+            return file_parts
+        
+        strip = self.config.get('strip_comments', True)
+        with self.tracer.span('pack') as span:
+            for part in file_parts:
+                if part.filename not in prepared:
+                    text = scan_cache.read(part.path)[1]
+                    original = len(text.encode('utf-8'))
+                    if compact:
+                        text = compact_text(part.filename, text, strip)
+                    prepared.put(part.filename, text.encode('utf-8'), original)
+            names = [part.filename for part in file_parts]
+            sizes = [prepared.length(name) for name in names]
+            shares = fit_shares(sizes, [priorities.get(name, 0.0) for name in names], budget)
             
-            for file_path in files:
+            packed_parts = []
+            for i, share in shares.items():
+                part = file_parts[i]
+                location = prepared.location(part.filename) if share >= sizes[i] else None
+                if location is not None:
+                    packed_parts.append(FilePart(part.field, part.filename, prepared.path, sizes[i],
+                                                 offset=location[0]))
+                else:
+                    # Only texts cut to their share are loaded back from the spool
+                    data = fit_bytes(prepared.data(part.filename), share)
+                    packed_parts.append(FilePart(part.field, part.filename, part.path, len(data),
+                                                 sample=part.sample, content=data))
+            dropped = [names[i] for i in range(len(names)) if i not in shares]
+            before = sum(prepared.original(names[i]) for i in shares) + \
+                sum(file_parts[i].length for i in range(len(names)) if i not in shares)
+            after = sum(part.length for part in packed_parts)
+            trimmed = sum(1 for i, share in shares.items() if share < sizes[i])
+            span.count(files=len(packed_parts), bytes_in=before, bytes_out=after, trimmed=trimmed,
+                       dropped=len(dropped), spilled=prepared.spilled)
+        
+        limit = f" (budget {format_bytes(budget)})" if budget > 0 else ""
+        self.print_info(f"Packed {len(packed_parts)} files from {format_bytes(before)} to {format_bytes(after)}{limit}")
+        if trimmed:
+            self.print_info(f"Cut {trimmed} file{'s' if trimmed != 1 else ''} to their head and tail to fit the budget")
+        if dropped:
+            self.print_warning(f"Left out {len(dropped)} low-priority file{'s' if len(dropped) != 1 else ''} "
+                               f"to fit the budget: {', '.join(dropped[:5])}{' ...' if len(dropped) > 5 else ''}")
+        if prepared.spilled:
+            self.print_info(f"Spooled {format_bytes(prepared.spilled)} of packed text to a temporary file "
+                            f"(over pack_memory_limit)")
+        return packed_parts
+    
+    def generate_readme_from_files(self, files: List[FileRecord], project_type: str, include_contributing: bool = True,
+                                   root: Optional[Path] = None) -> Optional[str]:
+        """Generate README from project files (errors are printed, returning None)"""
+        return self.report_errors(self.request_readme_from_files, files, project_type, include_contributing, root)
+    
+    def request_readme_from_files(self, files: List[FileRecord], project_type: str, include_contributing: bool = True,
+                                  root: Optional[Path] = None) -> str:
+        """Generate README from project files
+        
+        Records are uploaded under their own names; plain paths are named
+        relative to root (default the working directory).
+        
+        Raises a DocMintError if no README could be generated.
+        """
+        # Packed text is kept in a spool until it has been uploaded
+        with TextSpool(self.config.get('pack_memory_limit', 32 * 1024 * 1024)) as spool:
+            file_parts, file_digests = self.prepare_file_parts(files, spool, root)
+            return self.send_file_parts(file_parts, file_digests, project_type, include_contributing)
+    
+    def prepare_file_parts(self, files: List[FileRecord], prepared: TextSpool,
+                           root: Optional[Path] = None) -> Tuple[List[FilePart], List[list]]:
+        """Read, summarize and pack files for upload
+        
+        Returns the parts to upload and the ``[name, digest]`` pairs that key
+        the request in the response cache. Packed text goes to ``prepared``,
+        which must stay open until the parts have been sent.
+        """
+        self.print_progress(f"Analyzing {len(files)} files...")
+        
+        # Inspect files for upload; contents are streamed from disk later
+        file_parts = []
+        file_digests = []
+        
+        base = os.fspath(root) if root is not None else os.getcwd()
+        skip_generated = self.config.get('skip_generated_files', True)
+        skipped = {}
+        sampled = 0
+        summaries = []
+        priorities = {}
+        
+        with self.open_scan_cache() as scan_cache, self.tracer.span('read') as span:
+            # Files are read, hashed and compacted on a worker pool and
+            # come back in order
+            preparer = self.file_preparer(scan_cache)
+            for file, record in zip(files, preparer.prepare(files)):
+                relative_path = file.name if isinstance(file, FileRecord) else os.path.relpath(file, base)
+                if record.error is not None:
+                    self.print_warning(f"Could not read {relative_path}: {str(record.error)}")
+                    continue
                 try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        if content.strip():  # Only include non-empty files
-                            relative_path = str(file_path.relative_to(Path.cwd()))
-                            files_data.append(('files', (relative_path, content, 'text/plain')))
-                            file_contents[relative_path] = len(content)
+                    # Binary, minified and generated files are recognised
+                    # from their first few KB and never read in full
+                    info = record.info
+                    if info.kind == KIND_BINARY or (not info.is_text and skip_generated):
+                        skipped[info.kind] = skipped.get(info.kind, 0) + 1
+                        continue
+                    if not info.blank:  # Only include non-empty files
+                        sample = None
+                        if info.sampled:
+                            sampled += 1
+                            sample = (scan_cache.sample_budget, scan_cache.sample_windows)
+                        file_parts.append(FilePart('files', relative_path, record.path, info.length,
+                                                   encoding=info.encoding, sample=sample))
+                        file_digests.append([relative_path, info.digest])
+                        if isinstance(file, FileRecord):
+                            priorities[relative_path] = file.priority
+                        else:
+                            priorities[relative_path] = score_file(os.path.basename(relative_path), info.length,
+                                                                   relative_path.count(os.sep))
+                        if record.text is not None:
+                            prepared.put(relative_path, record.text.encode('utf-8'), record.original)
+                        if record.summary is not None:
+                            summaries.append((relative_path, record.summary))
                 except Exception as e:
-                    self.print_warning(f"Could not read {file_path}: {str(e)}")
+                    self.print_warning(f"Could not read {relative_path}: {str(e)}")
                     continue
             
-            if not files_data:
-                self.print_error("No readable files found.")
-                return None
-            
-            # Show file summary
-            self.print_info(f"Processing files:")
-            for file_tuple in files_data[:10]:  # Show first 10 files
-                filename = file_tuple[1][0]
-                size = file_contents.get(filename, 0)
-                print(f"  {Colors.CYAN}•{Colors.END} {filename} ({size:,} chars)")
+            span.count(files=len(file_parts), bytes_read=sum(part.length for part in file_parts),
+                       cache_hits=scan_cache.hits, skipped=sum(skipped.values()), sampled=sampled)
+            if scan_cache.hits:
+                self.print_info(f"Reused {scan_cache.hits} unchanged files from the scan cache")
+            if skipped:
+                self.print_info("Skipped " + ", ".join(f"{count} {kind}" for kind, count in sorted(skipped.items()))
+                                + f" file{'s' if sum(skipped.values()) != 1 else ''}")
+            if sampled:
+                self.print_info(f"Sampled the head, middle and tail of {sampled} large "
+                                f"file{'s' if sampled != 1 else ''}")
             
-            if len(files_data) > 10:
-                self.print_info(f"... and {len(files_data) - 10} more files")
+            file_parts, digest = self.summarize_file_parts(file_parts, summaries)
+            file_parts = self.pack_file_parts(file_parts, scan_cache, prepared, priorities,
+                                              reserve=digest.length if digest is not None else 0)
+        
+        if digest is not None:
+            # Summaries follow from the files' contents, so the digest is
+            # keyed by its mode and format
+            file_parts.insert(0, digest)
+            file_digests.append([DIGEST_NAME, f"{self.config.get('metadata_digest')}/{DIGEST_VERSION}"])
+        
+        if not file_parts:
+            raise NoFilesError("No readable files found.")
+        return file_parts, file_digests
+    
+    def send_file_parts(self, file_parts: List[FilePart], file_digests: List[list], project_type: str,
+                        include_contributing: bool) -> str:
+        """Upload prepared files to the generate endpoint, or answer from the response cache"""
+        import requests
+        
+        # Show file summary
+        self.print_file_summary(file_parts)
+        
+        # Prepare the request
+        data = {
+            'projectType': project_type,
+            'contribution': str(include_contributing).lower()
+        }
+        
+        cache_key = payload_digest({
+            'endpoint': '/api/generate-from-files/',
+            'backend': self.base_url,
+            'files': file_digests,
+            'packing': packing_key(self.config),
+            **data
+        })
+        cached = self.get_cached_answer(cache_key)
+        if cached is not None:
+            self.print_success("Using cached README (no analyzed files changed since last run)")
+            return cached
+        
+        self.require_backend()
+        
+        try:
+            # Backends that read a manifest get each distinct body once and,
+            # as they keep them between requests, only the bodies they have
+            # not seen yet; any other backend gets every file
+            fields = list(data.items())
+            with self.tracer.span('manifest') as span:
+                manifests = DELTA_FEATURE in self.backend_features
+                if manifests:
+                    unique_parts, manifest = dedupe_parts(file_parts)
+                else:
+                    unique_parts, manifest = file_parts, []
+                upload_parts = unique_parts
+                delta = manifests and self.config.get('delta_upload', True)
+                if delta:
+                    missing = missing_digests(self.get_session(), self.base_url,
+                                              [part.content_digest() for part in unique_parts],
+                                              self.config.get('health_timeout', 5))
+                    delta = missing is not None
+                    if delta:
+                        upload_parts = [part for part in unique_parts if part.content_digest() in missing]
+                if manifests and (delta or len(unique_parts) < len(file_parts)):
+                    fields.append((MANIFEST_FIELD, encode_manifest(manifest)))
+                span.count(files=len(file_parts), unique=len(unique_parts), uploads=len(upload_parts))
             
-            # Prepare the request
-            data = {
-                'projectType': project_type,
-                'contribution': str(include_contributing).lower()
-            }
+            duplicates = len(file_parts) - len(unique_parts)
+            if duplicates:
+                self.print_info(f"Sending {duplicates} duplicate file{'s' if duplicates != 1 else ''} only once")
+            if delta:
+                self.print_info(f"Backend already has {len(unique_parts) - len(upload_parts)} "
+                                f"of {len(unique_parts)} files")
             
             self.print_progress("Generating README...")
+            response = self.upload_files(fields, upload_parts)
+            if response.status_code == 409 and len(upload_parts) < len(unique_parts):
+                # The backend dropped some bodies since it was asked
+                response.close()
+                self.print_warning("Backend no longer has every file, uploading all of them")
+                response = self.upload_files(fields, unique_parts)
+            
+            return self.read_answer(response, cache_key)
+        except requests.exceptions.Timeout as e:
+            raise RequestTimeoutError("Request timed out. The project might be too large. "
+                                      "Try with fewer files.") from e
+        except requests.exceptions.RequestException as e:
+            raise NetworkError(f"Network error: {str(e)}") from e
+    
+    def upload_files(self, fields: List[tuple], file_parts: List[FilePart]):
+        """POST form fields and files to the generate endpoint, compressed if possible"""
+        with self.tracer.span('payload') as span:
+            encoder = MultipartEncoder(fields, file_parts)
+            body = encoder
+            headers = {'Content-Type': encoder.content_type}
             
-            response = requests.post(
+            encoding = choose_encoding(self.accepted_encodings, self.upload_encoding)
+            if encoding:
+                body = CompressedBody(encoder, encoding)
+                headers.update(body.headers)
+            span.count(bytes=len(encoder), wire_bytes=len(body), encoding=encoding or 'identity')
+        
+        if encoding:
+            self.print_info(f"Compressed upload from {format_bytes(body.raw_length)} "
+                            f"to {format_bytes(len(body))} ({encoding})")
+        elif self.upload_encoding not in ('none', 'auto') and self.upload_encoding not in available_encodings():
+            self.print_warning(f"{self.upload_encoding} compression is not available "
+                               f"(install zstandard), sending plain text")
+        elif self.upload_encoding != 'none':
+            self.print_info("Backend does not accept compressed uploads, sending plain text")
+        if not encoding:
+            self.print_info(f"Upload size: {format_bytes(len(body))}")
+        
+        body.progress = self.on_upload_progress
+        try:
+            response = self.post_generate(
                 f"{self.base_url}/api/generate-from-files/",
-                files=files_data,
-                data=data,
-                timeout=60
+                data=body,
+                headers=headers
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'result' in result and 'answer' in result['result']:
-                    return result['result']['answer']
-                elif 'error' in result:
-                    self.print_error(f"API Error: {result['error']}")
-                    return None
-            else:
-                self.print_error(f"HTTP Error {response.status_code}: {response.text}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            self.print_error("Request timed out. The project might be too large. Try with fewer files.")
-            return None
-        except requests.exceptions.RequestException as e:
-            self.print_error(f"Network error: {str(e)}")
-            return None
-        except Exception as e:
-            self.print_error(f"Unexpected error: {str(e)}")
-            return None
+        finally:
+            if body is not encoder:
+                body.close()
+        self.finish_upload_progress(body)
+        return response
+    
+    def post_generate(self, url: str, headers: Dict[str, str], **kwargs):
+        """POST to a generate endpoint, asking for a streamed answer when enabled"""
+        if self.stream_output:
+            headers = dict(headers, Accept=STREAM_ACCEPT)
+            kwargs['stream'] = True
+        
+        # Split the request into the upload and the wait for the answer
+        body = kwargs.get('data')
+        self._upload_finished = None
+        started = time.perf_counter()
+        response = self.get_session().post(url, headers=headers, **kwargs)
+        answered = time.perf_counter()
+        sent = min(self._upload_finished or started, answered)
+        self.tracer.record('upload', started, sent, bytes_sent=getattr(body, 'bytes_sent', 0))
+        self.tracer.record('server_wait', sent, answered, status=response.status_code)
+        return response
+    
+    def receive_streamed_answer(self, response) -> str:
+        """Write a streamed README to the output file and terminal as it arrives"""
+        self.print_progress(f"Streaming README into {self.output_path}...")
+        try:
+            writer = AtomicWriter(self.output_path)
+        except OSError as e:
+            response.close()
+            raise DocMintError(f"Could not save README: {str(e)}") from e
+        
+        parts = []
+        try:
+            with self.tracer.span('receive') as span:
+                for text, replaces in iter_answer_chunks(response):
+                    if replaces:
+                        writer.reset()
+                        parts = []
+                    writer.write(text)
+                    parts.append(text)
+                    span.count(chunks=1, chars=len(text))
+                    self.echo(text, end="", flush=True)
+            self.echo()
+        except StreamError as e:
+            writer.abort()
+            self.echo()
+            raise GenerationError(f"API Error: {str(e)}") from e
+        except BaseException:
+            # Keep the previous README intact if the stream breaks off
+            writer.abort()
+            self.echo()
+            raise
+        finally:
+            response.close()
+        
+        content = ''.join(parts)
+        if not content.strip():
+            writer.abort()
+            raise GenerationError("The backend returned an empty README")
+        try:
+            with self.tracer.span('save', bytes=len(content.encode('utf-8'))):
+                writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+        
+        self.streamed_output = self.output_path
+        return content
     
     def save_readme(self, content: str, output_path: str = "README.md") -> bool:
         """Save the generated README content to a file"""
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Write to a temporary file first so a failed write never
+            # leaves a truncated README behind
+            with self.tracer.span('save', bytes=len(content.encode('utf-8'))), AtomicWriter(output_path) as writer:
+                writer.write(content)
             return True
         except Exception as e:
             self.print_error(f"Could not save README: {str(e)}")
             return False
     
-    def run(self):
-        """Main CLI execution"""
+    def add_run_arguments(self, parser: argparse.ArgumentParser):
+        """Add the options shared by ``docmint``, ``docmint watch`` and ``docmint batch``"""
+        parser.add_argument('-t', '--type', 
+                          help='Specify project type (auto-detected if not provided)')
+        
+        parser.add_argument('-o', '--output', 
+                          default='README.md', 
+                          help='Output file name (default: README.md)')
+        
+        parser.add_argument('--no-contributing', 
+                          action='store_true',
+                          help='Skip contributing section in README')
+        
+        parser.add_argument('--exclude-dir', 
+                          action='append',
+                          default=[],
+                          help='Exclude directories (can be used multiple times, supports wildcards)')
+        
+        parser.add_argument('--exclude-file', 
+                          action='append',
+                          default=[],
+                          help='Exclude files (can be used multiple times, supports wildcards)')
+        
+        parser.add_argument('--workers', 
+                          type=int,
+                          help='Number of threads used to scan directories (default: from config)')
+        
+        parser.add_argument('--no-git', 
+                          action='store_true',
+                          help='Walk the directory instead of listing the files tracked by git')
+        
+        parser.add_argument('--url', 
+                          default='https://docmint.onrender.com',
+                          help='Backend URL (default: https://docmint.onrender.com)')  
+        
+        parser.add_argument('--compress', 
+                          nargs='?',
+                          const='auto',
+                          choices=['auto', 'gzip', 'zstd', 'none'],
+                          help='Compress the upload if the backend accepts it (default encoding: auto)')
+        
+        parser.add_argument('--no-cache', 
+                          action='store_true',
+                          help='Always ask the backend and do not read or write the README cache')
+        
+        parser.add_argument('--refresh', 
+                          action='store_true',
+                          help='Ignore any cached README but cache the newly generated one')
+        
+        parser.add_argument('--retries', 
+                          type=int,
+                          help='Retries for failed backend requests (default: from config)')
+        
+        parser.add_argument('--skip-health-check', 
+                          action='store_true',
+                          help='Do not check the backend before generating (disables compression)')
+        
+        parser.add_argument('--budget', 
+                          type=int,
+                          metavar='BYTES',
+                          help='Total bytes of file content to upload, 0 for no limit (default: from config)')
+        
+        parser.add_argument('--no-pack', 
+                          action='store_true',
+                          help='Upload files as they are, without removing comments and blank lines')
+        
+        parser.add_argument('--digest', 
+                          nargs='?',
+                          const='alongside',
+                          choices=DIGEST_MODES,
+                          help='Upload a digest of manifests and signatures alongside the files, '
+                               'or instead of them (default: from config)')
+        
+        parser.add_argument('--no-stream', 
+                          action='store_true',
+                          help='Wait for the complete README instead of streaming it as it is generated')
+        
+        parser.add_argument('--timings', 
+                          action='store_true',
+                          help='Show how long each phase of the run took')
+        
+        parser.add_argument('--trace', 
+                          metavar='FILE',
+                          help='Write phase timings to FILE in Chrome trace-event format')
+        
+        parser.add_argument('--no-banner', 
+                          action='store_true',
+                          help='Skip the banner display')
+    
+    def apply_run_arguments(self, args):
+        """Apply the options added by add_run_arguments"""
+        self.base_url = args.url.rstrip('/')
+        
+        if args.compress:
+            self.upload_encoding = args.compress
+        
+        # HTTP client settings
+        if args.retries is not None:
+            self.config['http_retries'] = args.retries
+        if args.skip_health_check:
+            self.health_check = False
+        
+        if args.no_git:
+            self.config['use_git_index'] = False
+        
+        # Payload packing
+        if args.budget is not None:
+            self.config['payload_budget'] = args.budget
+        if args.no_pack:
+            self.config['pack_payload'] = False
+        if args.digest is not None:
+            self.config['metadata_digest'] = args.digest
+        
+        # Output file, written as the answer streams in
+        self.output_path = args.output
+        if args.no_stream:
+            self.stream_output = False
+        
+        # Response cache switches
+        if args.no_cache:
+            self.use_response_cache = False
+        self.refresh_response_cache = args.refresh
+        
+        self.show_timings = args.timings
+        self.trace_path = args.trace
+    
+    def run(self, argv: Optional[List[str]] = None):
+        """Main CLI execution (arguments default to the command line)"""
         parser = argparse.ArgumentParser(
             description="DocMint CLI - Generate professional README files",
             formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -382,6 +1194,10 @@ Examples:
   {Colors.GREEN}docmint --exclude-dir node_modules,dist{Colors.END}  # Exclude specific directories
   {Colors.GREEN}docmint --exclude-file "*.log,temp*"{Colors.END}     # Exclude specific files
   {Colors.GREEN}docmint --url http://localhost:8000{Colors.END}  # Use local backend
+  {Colors.GREEN}docmint --refresh{Colors.END}               # Regenerate even if nothing changed
+  {Colors.GREEN}docmint batch -m repos.txt{Colors.END}      # Document many repositories (see docmint batch -h)
+  {Colors.GREEN}docmint watch{Colors.END}                    # Regenerate as files change (see docmint watch -h)
+  {Colors.GREEN}docmint daemon{Colors.END}                   # Serve later runs from a warm process (see docmint daemon -h)
 
 Exclude Patterns:
   {Colors.CYAN}--exclude-dir{Colors.END}    Exclude directories (supports wildcards)
@@ -401,57 +1217,63 @@ Exclude Patterns:
         parser.add_argument('-p', '--prompt', 
                           help='Generate README from text prompt instead of files')
         
-        parser.add_argument('-t', '--type', 
-                          help='Specify project type (auto-detected if not provided)')
+        self.add_run_arguments(parser)
         
-        parser.add_argument('-o', '--output', 
-                          default='README.md', 
-                          help='Output file name (default: README.md)')
-        
-        parser.add_argument('--no-contributing', 
+        parser.add_argument('--show-config', 
                           action='store_true',
-                          help='Skip contributing section in README')
-        
-        parser.add_argument('--exclude-dir', 
-                          action='append',
-                          default=[],
-                          help='Exclude directories (can be used multiple times, supports wildcards)')
-        
-        parser.add_argument('--exclude-file', 
-                          action='append',
-                          default=[],
-                          help='Exclude files (can be used multiple times, supports wildcards)')
-        
-        parser.add_argument('--url', 
-                          default='https://docmint.onrender.com',
-                          help='Backend URL (default: https://docmint.onrender.com)')  
+                          help='Show current configuration and exit')
         
-        parser.add_argument('--no-banner', 
+        parser.add_argument('--no-daemon', 
                           action='store_true',
-                          help='Skip the banner display')
+                          help='Run in this process even if a docmint daemon is running')
         
-        parser.add_argument('--show-config', 
-                          action='store_true',
-                          help='Show current configuration and exit')
+        args = parser.parse_args(argv)
         
-        args = parser.parse_args()
+        self.apply_run_arguments(args)
+        try:
+            return self.execute(args)
+        finally:
+            self.report_timings()
+    
+    def report_timings(self):
+        """Print the --timings table and write the --trace file"""
+        if self.show_timings:
+            total = self.tracer.elapsed
+            print()
+            self.print_info(f"Timings ({total * 1000:,.1f} ms total):")
+            for phase in self.tracer.summary():
+                share = phase['duration'] / total * 100 if total > 0 else 0
+                details = ', '.join(f"{key}={value:,}" if isinstance(value, int) and not isinstance(value, bool)
+                                    else f"{key}={value}" for key, value in phase['counts'].items())
+                print(f"  {Colors.CYAN}{phase['name']:<13}{Colors.END} {phase['duration'] * 1000:>10,.1f} ms "
+                      f"{share:>5.1f}%  {details}")
         
+        if self.trace_path:
+            try:
+                self.tracer.write_chrome_trace(self.trace_path)
+                self.print_info(f"Trace written to {self.trace_path}")
+            except OSError as e:
+                self.print_error(f"Could not write trace: {str(e)}")
+    
+    def ask(self, question: str) -> str:
+        """Read the user's answer to a question"""
+        return input(question)
+    
+    def execute(self, args) -> int:
+        """Generate the README requested by parsed command line arguments"""
         # Show configuration if requested
         if args.show_config:
             self.print_info("Current DocMint Configuration:")
             print(json.dumps(self.config, indent=2))
             return 0
         
-        # Update base URL
-        self.base_url = args.url.rstrip('/')
-        
         # Show banner
         if not args.no_banner:
             self.print_banner()
         
         # Parse exclude patterns
         exclude_dirs = set(self.config.get('excluded_dirs', []))
-        exclude_files = set()
+        exclude_files = set(self.config.get('excluded_files', []))
         
         if args.exclude_dir:
             custom_exclude_dirs = self.parse_exclude_patterns(args.exclude_dir)
@@ -459,20 +1281,13 @@ Exclude Patterns:
             self.print_info(f"Custom excluded directories: {', '.join(custom_exclude_dirs)}")
         
         if args.exclude_file:
-            exclude_files = self.parse_exclude_patterns(args.exclude_file)
-            self.print_info(f"Custom excluded files: {', '.join(exclude_files)}")
+            custom_exclude_files = self.parse_exclude_patterns(args.exclude_file)
+            exclude_files.update(custom_exclude_files)
+            self.print_info(f"Custom excluded files: {', '.join(custom_exclude_files)}")
         
-        # Check network connection
-        self.print_progress("Checking connection to DocMint backend...")
-        if not self.check_network_connection():
-            self.print_error(f"Cannot connect to DocMint backend at {self.base_url}")
-            self.print_info("Please check:")
-            self.print_info("1. Your internet connection")
-            self.print_info("2. The backend URL is correct")
-            self.print_info("3. The DocMint backend is running")
-            return 1
-        
-        self.print_success("Connected to DocMint backend!")
+        # Check network connection in the background; it wakes a sleeping
+        # backend while the project is scanned and is awaited before upload
+        self.start_health_check()
         
         # Generate README
         readme_content = None
@@ -497,17 +1312,18 @@ Exclude Patterns:
                 self.print_info(f"Excluding files: {', '.join(sorted(exclude_files))}")
             
             # Get project files
-            files = self.get_project_files(str(directory), exclude_dirs, exclude_files)
+            files = self.get_project_files(str(directory), exclude_dirs, exclude_files, args.workers)
             
             if not files:
                 self.print_warning("No supported code files found in the directory.")
-                self.print_info("Supported file types: " + ", ".join(sorted(self.supported_extensions)))
+                self.print_info("Supported file types: " + ", ".join(sorted(self.supported_extensions)
+                                                                      + sorted(self.supported_names)))
                 
                 # Ask if user wants to proceed with a manual prompt
                 try:
-                    response = input(f"\n{Colors.YELLOW}Would you like to describe your project manually? (y/N): {Colors.END}")
+                    response = self.ask(f"\n{Colors.YELLOW}Would you like to describe your project manually? (y/N): {Colors.END}")
                     if response.lower().startswith('y'):
-                        prompt = input(f"{Colors.CYAN}Describe your project: {Colors.END}")
+                        prompt = self.ask(f"{Colors.CYAN}Describe your project: {Colors.END}")
                         if prompt.strip():
                             readme_content = self.generate_readme_from_prompt(prompt)
                     else:
@@ -517,7 +1333,8 @@ Exclude Patterns:
                     return 1
             else:
                 # Detect or use provided project type
-                project_type = args.type or self.detect_project_type(files)
+                with self.tracer.span('detect'):
+                    project_type = args.type or self.detect_project_type(files)
                 self.print_info(f"Detected project type: {Colors.BOLD}{project_type}{Colors.END}")
                 
                 # Generate README from files
@@ -527,44 +1344,65 @@ Exclude Patterns:
                     not args.no_contributing
                 )
         
-        # Save README
+        # Save README (a streamed answer has already been written in place)
         if readme_content:
-            self.print_progress("Saving README...")
+            streamed = self.streamed_output == args.output
+            if not streamed:
+                self.print_progress("Saving README...")
             
-            if self.save_readme(readme_content, args.output):
+            if streamed or self.save_readme(readme_content, args.output):
                 self.print_success(f"README generated successfully: {Colors.BOLD}{args.output}{Colors.END}")
                 
                 # Show file size
                 file_size = len(readme_content.encode('utf-8'))
                 self.print_info(f"File size: {file_size:,} bytes")
                 
-                # Show first few lines as preview
-                lines = readme_content.split('\n')[:5]
-                self.print_info("Preview:")
-                for line in lines:
-                    print(f"  {Colors.CYAN}│{Colors.END} {line}")
-                if len(readme_content.split('\n')) > 5:
-                    print(f"  {Colors.CYAN}│{Colors.END} ...")
+                # Show first few lines as preview (a stream was shown as it arrived)
+                if not streamed:
+                    lines = readme_content.split('\n')[:5]
+                    self.print_info("Preview:")
+                    for line in lines:
+                        print(f"  {Colors.CYAN}│{Colors.END} {line}")
+                    if len(readme_content.split('\n')) > 5:
+                        print(f"  {Colors.CYAN}│{Colors.END} ...")
                 
             else:
                 return 1
+        elif self.backend_available is False:
+            # The connection problem has already been reported
+            return 1
         else:
             self.print_error("Failed to generate README")
             return 1
         
         return 0
 
-def main():
-    """Entry point for the CLI"""
+def main(argv: Optional[List[str]] = None, cli: Optional[DocMintCLI] = None):
+    """Entry point for the CLI (arguments default to the command line)"""
+    if argv is None:
+        argv = sys.argv[1:]
     try:
-        cli = DocMintCLI()
-        return cli.run()
+        if cli is None:
+            cli = DocMintCLI()
+        if argv[:1] == ['batch']:
+            from .batch import run_batch
+            return run_batch(cli, argv[1:])
+        if argv[:1] == ['watch']:
+            from .watch import run_watch
+            return run_watch(cli, argv[1:])
+        if argv[:1] == ['daemon']:
+            from .daemon import run_daemon
+            return run_daemon(cli, argv[1:])
+        return cli.run(argv)
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}Operation cancelled by user.{Colors.END}")
         return 1
     except Exception as e:
         print(f"{Colors.RED}{Colors.BOLD}Unexpected error:{Colors.END} {Colors.RED}{str(e)}{Colors.END}")
         return 1
+    finally:
+        if cli is not None:
+            cli.close()
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,350 @@
+"""
+Programmatic access to DocMint
+
+:class:`DocMintClient` scans projects and generates READMEs for code that
+embeds DocMint, without parsing arguments, printing or prompting::
+
+    from docmint import DocMintClient
+
+    with DocMintClient(config={'max_files': 30}) as client:
+        for record in client.scan('path/to/project'):
+            print(record.name, record.size)
+        readme = client.generate('path/to/project')
+
+``generate`` returns the README text, or raises a :class:`DocMintError`
+subclass from :mod:`docmint.errors`, and never writes files. What the CLI
+would print is passed to an ``on_event`` callback as :class:`ProgressEvent`
+objects instead.
+
+Rather than the CLI being built on a separate library core, each call runs
+the CLI's own code through :class:`ClientCLI`, a :class:`DocMintCLI`
+subclass, so the two cannot drift apart. That holds only while every
+terminal write in ``DocMintCLI`` goes through its ``print_*`` helpers or
+``echo``, which ``ClientCLI`` turns into events or drops; the client tests
+check that ``generate`` writes nothing to stdout or stderr.
+
+Calls may run concurrently from several threads. They share the
+configuration, one pooled HTTP session and one backend health check, while
+each call gets its own :class:`ClientCLI` to do the work.
+:class:`AsyncDocMintClient` offers the same calls as coroutines, run on a
+thread pool.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from .cli import Colors, DocMintCLI
+from .errors import DocMintError, GenerationError, NoFilesError
+from .filetable import FileRecord
+from .ranking import score_file
+from .streaming import StreamError, iter_answer_chunks
+
+
+class ProgressEvent:
+    """Something that happened during a client call
+
+    ``kind`` is one of:
+
+    * ``info``, ``progress``, ``success``, ``warning`` or ``error``: a
+      message the CLI would have printed, in ``message``
+    * ``files``: the names about to be uploaded, in ``data['files']``
+    * ``upload``: ``data['sent']`` of ``data['total']`` bytes uploaded
+    * ``chunk``: a piece of a streamed README in ``message``;
+      ``data['replaces']`` is True when it supersedes the pieces before it
+    """
+
+    __slots__ = ('kind', 'message', 'data')
+
+    def __init__(self, kind: str, message: str = '', **data: Any):
+        self.kind = kind
+        self.message = message
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"ProgressEvent({self.kind!r}, {self.message!r}{''.join(f', {k}={v!r}' for k, v in self.data.items())})"
+
+
+EventCallback = Callable[[ProgressEvent], None]
+
+
+class ClientCLI(DocMintCLI):
+    """DocMintCLI for one client call
+
+    Shares configuration and the HTTP session with its client, reports
+    messages as events, and streams answers to events rather than a file.
+    """
+
+    def __init__(self, client: 'DocMintClient', on_event: Optional[EventCallback] = None):
+        super().__init__(client.base_url)
+        self.client = client
+        self.config = client.config
+        self.supported_extensions = client.supported_extensions
+        self.on_event = on_event
+        self.output_path = None
+
+    def emit(self, kind: str, message: str = '', **data: Any):
+        if self.on_event is not None:
+            self.on_event(ProgressEvent(kind, message, **data))
+
+    def print_banner(self):
+        pass
+
+    def echo(self, text: str = "", end: str = "\n", flush: bool = False):
+        pass
+
+    def print_success(self, message: str):
+        self.emit('success', Colors.strip(message))
+
+    def print_error(self, message: str):
+        self.emit('error', Colors.strip(message))
+
+    def print_warning(self, message: str):
+        self.emit('warning', Colors.strip(message))
+
+    def print_info(self, message: str):
+        self.emit('info', Colors.strip(message))
+
+    def print_progress(self, message: str):
+        self.emit('progress', Colors.strip(message))
+
+    def print_upload_progress(self, sent: int, total: int, elapsed: float):
+        self.emit('upload', sent=sent, total=total)
+
+    def finish_upload_progress(self, body):
+        pass
+
+    def print_file_summary(self, file_parts):
+        self.emit('files', files=[part.filename for part in file_parts])
+
+    def get_session(self, pool_size: int = 4):
+        self.session = self.client.get_session()
+        return self.session
+
+    def wait_for_backend(self) -> bool:
+        return self.client.backend_ready(self)
+
+    def receive_streamed_answer(self, response) -> str:
+        """Collect a streamed README, passing each piece on as a chunk event"""
+        parts = []
+        try:
+            with self.tracer.span('receive') as span:
+                for text, replaces in iter_answer_chunks(response):
+                    if replaces:
+                        parts = []
+                    parts.append(text)
+                    span.count(chunks=1, chars=len(text))
+                    self.emit('chunk', text, replaces=replaces)
+        except StreamError as e:
+            raise GenerationError(f"API Error: {str(e)}") from e
+        finally:
+            response.close()
+
+        content = ''.join(parts)
+        if not content.strip():
+            raise GenerationError("The backend returned an empty README")
+        return content
+
+    def close(self):
+        # The session belongs to the client
+        self.session = None
+
+
+class DocMintClient:
+    """Scan projects and generate READMEs from Python code
+
+    ``config`` overrides settings from ``~/.docmint/config.json`` (see
+    :data:`docmint.config.DEFAULT_CONFIG`); ``base_url`` defaults to its
+    ``backend_url``. ``on_event`` receives the progress events of every call
+    that does not pass its own. ``max_connections`` bounds the pooled
+    connections to the backend.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, config: Optional[Dict[str, Any]] = None,
+                 on_event: Optional[EventCallback] = None, max_connections: int = 8):
+        from .config import get_config
+        self.config = get_config()
+        self.config.update(config or {})
+        self.base_url = (base_url or self.config.get('backend_url') or "https://docmint.onrender.com").rstrip('/')
+        self.on_event = on_event
+        self.max_connections = max(1, int(max_connections))
+
+        template = DocMintCLI(self.base_url)
+        template.config = self.config
+        self.supported_extensions = template.supported_extensions
+
+        self.session = None
+        self.backend_available = None
+        self.accepted_encodings = set()  # type: Set[str]
+        self.backend_features = set()  # type: Set[str]
+        self._lock = threading.Lock()
+        self._health_lock = threading.Lock()
+        self._calls = threading.local()
+
+    def get_session(self):
+        """Return the pooled HTTP client shared by every call"""
+        with self._lock:
+            if self.session is None:
+                from .transport import BackendSession
+                self.session = BackendSession(
+                    retries=self.config.get('http_retries', 3),
+                    backoff=self.config.get('http_backoff', 0.5),
+                    connect_timeout=self.config.get('connect_timeout', 10),
+                    read_timeout=self.config.get('read_timeout', 60),
+                    pool_size=self.max_connections,
+                    on_retry=self._on_retry
+                )
+            return self.session
+
+    def _on_retry(self, attempt: int, delay: float, reason: str):
+        # Retries happen on the thread of the call that made the request
+        cli = getattr(self._calls, 'cli', None)
+        if cli is not None:
+            cli.print_retry(attempt, delay, reason)
+
+    def backend_ready(self, cli: ClientCLI) -> bool:
+        """Check the backend once for all calls, and again after a failure"""
+        if not cli.health_check:
+            return True
+        with self._health_lock:
+            if not self.backend_available:
+                cli.print_progress("Checking connection to DocMint backend...")
+                try:
+                    self.backend_available = cli.check_network_connection()
+                except Exception:
+                    self.backend_available = False
+                self.accepted_encodings = set(cli.accepted_encodings)
+                self.backend_features = set(cli.backend_features)
+        cli.accepted_encodings = self.accepted_encodings
+        cli.backend_features = self.backend_features
+        return bool(self.backend_available)
+
+    @contextmanager
+    def call(self, on_event: Optional[EventCallback] = None) -> Iterator[ClientCLI]:
+        """A ClientCLI for one call on this thread"""
+        cli = ClientCLI(self, on_event if on_event is not None else self.on_event)
+        previous = getattr(self._calls, 'cli', None)
+        self._calls.cli = cli
+        try:
+            yield cli
+        finally:
+            self._calls.cli = previous
+            cli.close()
+
+    def _root(self, directory: str) -> Path:
+        root = Path(directory).resolve()
+        if not root.is_dir():
+            raise DocMintError(f"Directory not found: {root}")
+        return root
+
+    def _select(self, cli: ClientCLI, root: Path, exclude_dirs: Optional[Iterable[str]],
+                exclude_files: Optional[Iterable[str]], workers: Optional[int]) -> List[FileRecord]:
+        dirs = set(self.config.get('excluded_dirs', [])) | set(exclude_dirs or ())
+        files = set(self.config.get('excluded_files', [])) | set(exclude_files or ())
+        return cli.select_project_files(str(root), dirs, files, workers)
+
+    def _record(self, root: Path, name: str) -> FileRecord:
+        """A record for a file given by name, scored as ranking would score it"""
+        record = FileRecord.from_path(str(root), os.path.join(str(root), name), 0)
+        record.priority = score_file(os.path.basename(record.name), 0, record.name.count(os.sep))
+        return record
+
+    def scan(self, directory: str = '.', exclude_dirs: Optional[Iterable[str]] = None,
+             exclude_files: Optional[Iterable[str]] = None, workers: Optional[int] = None,
+             on_event: Optional[EventCallback] = None) -> Iterator[FileRecord]:
+        """Yield the files a README would be generated from, most informative first
+
+        ``exclude_dirs`` and ``exclude_files`` add patterns to the configured ones.
+        """
+        with self.call(on_event) as cli:
+            selected = self._select(cli, self._root(directory), exclude_dirs, exclude_files, workers)
+        yield from selected
+
+    def generate(self, directory: str = '.', prompt: Optional[str] = None, project_type: Optional[str] = None,
+                 include_contributing: bool = True, files: Optional[Iterable[Any]] = None,
+                 exclude_dirs: Optional[Iterable[str]] = None, exclude_files: Optional[Iterable[str]] = None,
+                 workers: Optional[int] = None, on_event: Optional[EventCallback] = None) -> str:
+        """Generate a README for a project directory, or from ``prompt`` when given
+
+        ``files`` (records from :meth:`scan`, or paths relative to the
+        directory) are used instead of scanning it. Returns the README text;
+        raises :class:`NoFilesError` when there is nothing to analyze and
+        another :class:`DocMintError` when the backend cannot produce one.
+        """
+        with self.call(on_event) as cli:
+            if prompt is not None:
+                return cli.request_readme_from_prompt(prompt)
+
+            root = self._root(directory)
+            if files is None:
+                records = self._select(cli, root, exclude_dirs, exclude_files, workers)
+            else:
+                records = [file if isinstance(file, FileRecord) else self._record(root, file) for file in files]
+            if not records:
+                raise NoFilesError(f"No supported code files found in {root}")
+
+            with cli.tracer.span('detect'):
+                project_type = project_type or cli.detect_project_type(records)
+            cli.print_info(f"Detected project type: {project_type}")
+            return cli.request_readme_from_files(records, project_type, include_contributing, root=root)
+
+    def close(self):
+        """Release pooled backend connections"""
+        with self._lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AsyncDocMintClient:
+    """DocMintClient for asyncio code
+
+    Calls run on a pool of ``concurrency`` threads and progress events are
+    delivered on the event loop. A cancelled call stops waiting, but its
+    thread finishes the request.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, config: Optional[Dict[str, Any]] = None,
+                 on_event: Optional[EventCallback] = None, concurrency: int = 4):
+        self.concurrency = max(1, int(concurrency))
+        self.client = DocMintClient(base_url, config, max_connections=self.concurrency + 1)
+        self.on_event = on_event
+        self._pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix='docmint-client')
+
+    def _run(self, loop, method, *args, on_event: Optional[EventCallback] = None, **kwargs):
+        callback = on_event if on_event is not None else self.on_event
+        if callback is not None:
+            kwargs['on_event'] = lambda event: loop.call_soon_threadsafe(callback, event)
+        return loop.run_in_executor(self._pool, functools.partial(method, *args, **kwargs))
+
+    async def scan(self, *args, **kwargs) -> AsyncIterator[FileRecord]:
+        """Async version of :meth:`DocMintClient.scan` (files are ranked before any is yielded)"""
+        loop = asyncio.get_event_loop()
+        records = await self._run(loop, lambda *a, **kw: list(self.client.scan(*a, **kw)), *args, **kwargs)
+        for record in records:
+            yield record
+
+    async def generate(self, *args, **kwargs) -> str:
+        """Async version of :meth:`DocMintClient.generate`"""
+        return await self._run(asyncio.get_event_loop(), self.client.generate, *args, **kwargs)
+
+    async def close(self):
+        await asyncio.get_event_loop().run_in_executor(None, self._pool.shutdown)
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
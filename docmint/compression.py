@@ -0,0 +1,166 @@
+"""
+Request body compression for DocMint CLI
+
+Source code usually compresses several times over, so uploads can optionally
+be sent with ``Content-Encoding: gzip`` (or ``zstd`` when the ``zstandard``
+package is installed). The backend advertises what it accepts on
+``/api/health/``, either through an ``Accept-Encoding`` response header or an
+``accept_encoding`` field in the JSON body; anything else is sent as is.
+"""
+
+import base64
+import gzip
+import hashlib
+import tempfile
+import time
+import zlib
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Set
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .reader import CHUNK_SIZE
+
+# Uploads are compressed into memory up to this size before spilling to disk
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+def available_encodings() -> List[str]:
+    """Return the encodings this install can produce, most effective first"""
+    encodings = ['gzip']
+    if zstandard is not None:
+        encodings.insert(0, 'zstd')
+    return encodings
+
+
+def parse_accept_encoding(header: Optional[str]) -> Set[str]:
+    """Parse an ``Accept-Encoding`` value into the encodings it allows"""
+    accepted = set()
+    for item in (header or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = params.strip()
+        if quality.startswith('q=') and quality[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        accepted.add(coding)
+    return accepted
+
+
+def server_encodings(headers: Any, body: Any) -> Set[str]:
+    """Collect the request encodings a health check response advertises"""
+    accepted = parse_accept_encoding(headers.get('Accept-Encoding') if headers else None)
+    if isinstance(body, dict):
+        advertised = body.get('accept_encoding')
+        if isinstance(advertised, str):
+            accepted |= parse_accept_encoding(advertised)
+        elif isinstance(advertised, (list, tuple)):
+            accepted |= {str(coding).lower() for coding in advertised}
+    return accepted
+
+
+def choose_encoding(accepted: Iterable[str], preferred: str = 'auto') -> Optional[str]:
+    """Pick the encoding to use, or None to send the body uncompressed"""
+    accepted = set(accepted)
+    if preferred in ('none', 'identity'):
+        return None
+    candidates = available_encodings() if preferred == 'auto' else [preferred]
+    for coding in candidates:
+        if coding in accepted and coding in available_encodings():
+            return coding
+    return None
+
+
+def _compressor(encoding: str):
+    if encoding == 'gzip':
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    """Undo ``Content-Encoding`` on a request body"""
+    if not encoding or encoding == 'identity':
+        return data
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def repr_digest(hexdigest: str) -> str:
+    """Format a SHA-256 hex digest as an RFC 9530 ``Repr-Digest`` value"""
+    return 'sha-256=:' + base64.b64encode(bytes.fromhex(hexdigest)).decode('ascii') + ':'
+
+
+class CompressedBody:
+    """Compressed copy of a request body, ready to upload with a known length
+
+    The source is read and compressed chunk by chunk into a spooled temporary
+    file, so memory stays bounded. ``digest`` is the SHA-256 of the
+    uncompressed body, which lets the server confirm it decoded the same bytes.
+    """
+
+    def __init__(self, source: Any, encoding: str,
+                 progress: Optional[Callable[[int, int, float], None]] = None):
+        self.encoding = encoding
+        self.progress = progress
+        self.bytes_sent = 0
+        self.started = None
+        self.raw_length = 0
+
+        hasher = hashlib.sha256()
+        compressor = _compressor(encoding)
+        self._file = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            self.raw_length += len(chunk)
+            hasher.update(chunk)
+            self._file.write(compressor.compress(chunk))
+        self._file.write(compressor.flush())
+        self._length = self._file.tell()
+        self._file.seek(0)
+        self.digest = hasher.hexdigest()
+
+    @property
+    def headers(self) -> dict:
+        return {
+            'Content-Encoding': self.encoding,
+            'Repr-Digest': repr_digest(self.digest),
+        }
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if self.started is None:
+            self.started = time.monotonic()
+        data = self._file.read(size)
+        if data:
+            self.bytes_sent += len(data)
+            if self.progress is not None:
+                self.progress(self.bytes_sent, self._length, time.monotonic() - self.started)
+        return data
+
+    def rewind(self):
+        """Start the body over so the request can be sent again"""
+        self._file.seek(0)
+        self.bytes_sent = 0
+        self.started = None
+
+    def close(self):
+        self._file.close()
@@ -14,14 +14,53 @@ DEFAULT_BACKEND_URL = "https://docmint.onrender.com"
 # Configuration file path
 CONFIG_DIR = Path.home() / ".docmint"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+SCAN_CACHE_FILE = CONFIG_DIR / "scan_cache.db"
+RESPONSE_CACHE_FILE = CONFIG_DIR / "response_cache.db"
 
 # Default configuration
 DEFAULT_CONFIG = {
     "backend_url": DEFAULT_BACKEND_URL,
     "default_project_type": "auto",
     "include_contributing": True,
-    "max_file_size": 100 * 1024 * 1024,  # 100MB
+    "max_file_size": 100 * 1024 * 1024,  # 100MB, only applies when sampling is off
+    "sample_threshold": 128 * 1024,  # larger files are sampled, 0 to disable
+    "sample_windows": 3,
+    "pack_payload": True,  # drop license headers, comments and blank runs before upload
+    "strip_comments": True,
+    "payload_budget": 1024 * 1024,  # total bytes of file content, 0 for no limit
+    "pack_memory_limit": 32 * 1024 * 1024,  # packed text held in memory, the rest is spooled to a temporary file
+    "metadata_digest": "off",  # off, alongside or instead: upload summaries of manifests and signatures
     "max_files": 150,
+    "scan_workers": 8,
+    "prepare_threads": 8,  # threads reading and hashing files
+    "prepare_processes": 0,  # processes compacting large files, 0 for one per CPU
+    "prepare_in_flight": 32,  # files queued at each preparation stage
+    "use_git_index": True,  # list the files tracked by git instead of walking a checkout
+    "use_ignore_files": True,  # honour .gitignore and .docmintignore when walking
+    "scan_cache": True,
+    "scan_cache_max_bytes": 256 * 1024 * 1024,  # 256MB
+    "response_cache": True,
+    "response_cache_ttl": 7 * 24 * 60 * 60,  # 7 days
+    "response_cache_max_bytes": 64 * 1024 * 1024,  # 64MB
+    "upload_encoding": "none",  # none, auto, gzip or zstd
+    "health_check": True,
+    "health_timeout": 5,
+    "connect_timeout": 10,
+    "read_timeout": 60,
+    "http_retries": 3,
+    "http_backoff": 0.5,
+    "stream_output": True,
+    "delta_upload": True,  # only upload files the backend has not seen, if it supports that
+    "skip_generated_files": True,  # minified bundles and @generated files
+    "watch_debounce": 0.5,  # seconds without changes before docmint watch updates
+    "watch_max_delay": 5.0,  # longest wait after the first change
+    "watch_poll_interval": 1.0,  # seconds between checks when inotify is unavailable
+    "daemon_idle_timeout": 3600,  # seconds without a run before docmint daemon exits, 0 to never exit
+    "daemon_max_projects": 8,  # projects whose file selection the daemon keeps watched
+    "daemon_health_ttl": 60,  # seconds a successful health check is reused by the daemon
+    "batch_concurrency": 4,
+    "batch_rate_limit": 2.0,  # generate requests per second, 0 for no limit
+    "batch_scan_jobs": 4,
     "excluded_dirs": [
         "node_modules", ".git", "__pycache__", ".pytest_cache",
         "venv", "env", ".env", "dist", "build", ".next",
@@ -0,0 +1,467 @@
+"""
+Daemon mode for DocMint CLI
+
+``docmint daemon`` keeps one DocMint process running so that later
+``docmint`` runs (forwarded by ``launcher.py``) skip interpreter start-up and
+imports, and find these already in memory:
+
+* the parsed configuration, read again only when ``config.json`` changes
+* compiled exclusion matchers
+* the files selected for recently analyzed projects, kept valid by watching
+  their directories (see ``watch.py``), so an unchanged project is not
+  walked again
+* a pooled connection to the backend and the outcome of its last health check
+
+A run whose README is in the response cache then takes tens of milliseconds.
+
+Runs are served one at a time, in the caller's working directory and with
+its environment variables (proxies, CA bundles and what ``git`` reads), and
+the daemon exits after ``daemon_idle_timeout`` seconds without one. Messages
+are JSON lines over a Unix socket only the user can open:
+
+1. the client sends ``{"version", "argv", "cwd", "env", "command"}``
+2. the daemon answers ``{"daemon": version}``; a client of another version
+   hangs up and runs the CLI itself. A client with another ``HOME`` gets
+   ``{"daemon": null}`` and runs itself too, as the configuration and caches
+   the daemon holds are the ones under its own home
+3. the daemon sends ``{"out": text}`` and ``{"err": text}`` as the run
+   prints, ``{"ask": question}`` when it needs input (answered with
+   ``{"answer": text}``, or ``null`` at end of input), and finally
+   ``{"exit": status}``
+
+A client that hangs up (on Ctrl+C) cancels its run: the next message the
+daemon tries to send raises ``ClientDisconnected``, a ``KeyboardInterrupt``,
+so no README is written and the next client is served straight away.
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from . import __version__
+from .cli import Colors, DocMintCLI, main as run_cli
+from .filetable import FileRecord
+from .launcher import LOCAL_COMMANDS, connect, forward, socket_path
+from .watch import LISTING, RESCAN, WatchSession
+
+# Settings that change which files a project run selects
+SELECTION_SETTINGS = ('max_files', 'use_git_index', 'use_ignore_files', 'sample_threshold',
+                      'max_file_size', 'supported_extensions')
+
+
+@contextlib.contextmanager
+def client_environment(env: Optional[Dict[str, str]]) -> Iterator[None]:
+    """Replace the daemon's environment variables with the client's for one run"""
+    if env is None:
+        yield
+        return
+    saved = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def file_sizes(files: List[FileRecord]) -> List[int]:
+    """The current size of each file, -1 for one that is gone"""
+    sizes = []
+    for file in files:
+        try:
+            sizes.append(os.stat(file.path).st_size)
+        except OSError:
+            sizes.append(-1)
+    return sizes
+
+
+class ClientDisconnected(KeyboardInterrupt):
+    """The client hung up, usually on Ctrl+C; ends its run as Ctrl+C would"""
+
+
+class Channel:
+    """One client connection, as JSON line messages"""
+
+    def __init__(self, conn: socket.socket):
+        self.stream = conn.makefile('rwb')
+        self.closed = False
+
+    def send(self, **message: Any):
+        """Send a message, raising ClientDisconnected once the client has gone"""
+        if self.closed:
+            raise ClientDisconnected()
+        try:
+            self.stream.write(json.dumps(message).encode('utf-8') + b'\n')
+            self.stream.flush()
+        except OSError:
+            # Stop the run rather than write a README nobody asked for any
+            # more, and free the daemon for other clients
+            self.closed = True
+            raise ClientDisconnected() from None
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        try:
+            line = self.stream.readline()
+        except OSError:
+            return None
+        if not line:
+            return None
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return None
+        return message if isinstance(message, dict) else None
+
+    def ask(self, question: str) -> Optional[str]:
+        self.send(ask=question)
+        reply = self.receive()
+        return reply.get('answer') if reply is not None else None
+
+    def close(self):
+        try:
+            self.stream.close()
+        except OSError:
+            pass
+
+
+class ChannelWriter(io.TextIOBase):
+    """A text stream that sends what is written to the client"""
+
+    def __init__(self, channel: Channel, key: str):
+        self.channel = channel
+        self.key = key
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self.channel.send(**{self.key: text})
+        return len(text)
+
+
+class DaemonCLI(DocMintCLI):
+    """DocMintCLI for one forwarded run, using the daemon's warm state"""
+
+    def __init__(self, daemon: 'DocMintDaemon', channel: Channel):
+        super().__init__()
+        self.daemon = daemon
+        self.channel = channel
+        self.config = daemon.load_config()
+
+    def ask(self, question: str) -> str:
+        answer = self.channel.ask(question)
+        if answer is None:
+            raise EOFError("no input from the client")
+        return answer
+
+    def get_session(self, pool_size: int = 4):
+        self.session = self.daemon.session_for(self)
+        return self.session
+
+    def start_health_check(self):
+        self.daemon.reuse_health(self)
+        super().start_health_check()
+
+    def get_project_files(self, directory: str, exclude_dirs: Optional[Set[str]] = None,
+                          exclude_files: Optional[Set[str]] = None,
+                          workers: Optional[int] = None) -> List[FileRecord]:
+        return self.daemon.project_files(self, directory, exclude_dirs, exclude_files, workers)
+
+    def close(self):
+        # The session belongs to the daemon
+        self.session = None
+
+
+class DocMintDaemon:
+    """Serves forwarded DocMint runs from one long-lived process"""
+
+    def __init__(self, cli: DocMintCLI, path: Optional[str] = None, idle_timeout: float = 3600.0,
+                 max_projects: int = 8, health_ttl: float = 60.0):
+        self.cli = cli
+        self.path = path or socket_path()
+        self.idle_timeout = idle_timeout
+        self.max_projects = max(1, int(max_projects))
+        self.health_ttl = health_ttl
+        self.started = time.monotonic()
+        self.runs = 0
+        self.session = None
+        self.projects = OrderedDict()  # type: OrderedDict
+        self.health = {}  # type: Dict[str, tuple]
+        self._config = None
+        self._config_stamp = None
+        self._stopping = False
+
+    # Warm state
+
+    def load_config(self) -> Dict[str, Any]:
+        """A private copy of the configuration, parsed again only if the file changed"""
+        from .config import CONFIG_FILE, get_config
+        try:
+            st = os.stat(CONFIG_FILE)
+            stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            stamp = None
+        if self._config is None or stamp != self._config_stamp:
+            self._config = get_config()
+            self._config_stamp = stamp
+        return copy.deepcopy(self._config)
+
+    def session_for(self, cli: DocMintCLI):
+        """The daemon's pooled session, set up with this run's settings"""
+        if self.session is None:
+            cli.session = None
+            self.session = DocMintCLI.get_session(cli)
+        session = self.session
+        session.retries = max(0, int(cli.config.get('http_retries', 3)))
+        session.backoff = cli.config.get('http_backoff', 0.5)
+        session.connect_timeout = cli.config.get('connect_timeout', 10)
+        session.read_timeout = cli.config.get('read_timeout', 60)
+        session.on_retry = cli.print_retry
+        return session
+
+    def reuse_health(self, cli: DocMintCLI):
+        """Skip the health check if the backend answered one recently"""
+        known = self.health.get(cli.base_url)
+        if known is not None and time.monotonic() - known[0] < self.health_ttl:
+            cli.backend_available = True
+            cli.accepted_encodings = set(known[1])
+            cli.backend_features = set(known[2])
+
+    def remember_health(self, cli: DocMintCLI):
+        if cli.backend_available:
+            if cli.health_checked:
+                self.health[cli.base_url] = (time.monotonic(), set(cli.accepted_encodings),
+                                             set(cli.backend_features))
+        elif cli.backend_available is False:
+            self.health.pop(cli.base_url, None)
+
+    def project_files(self, cli: DocMintCLI, directory: str, exclude_dirs: Optional[Set[str]],
+                      exclude_files: Optional[Set[str]], workers: Optional[int]) -> List[FileRecord]:
+        """Select a project's files, or reuse the last selection if no files were added or removed
+
+        Sizes rank files and decide which are sampled, so the selection is
+        also made again when a selected file changed size, whether or not
+        the watcher reported it.
+        """
+        settings = json.dumps({name: cli.config.get(name) for name in SELECTION_SETTINGS},
+                              sort_keys=True, default=sorted)
+        key = (os.path.abspath(directory), frozenset(exclude_dirs or ()), frozenset(exclude_files or ()), settings)
+        state = self.projects.pop(key, None)
+        if state is not None:
+            state.cli = cli
+            kinds = {state.classify(event) for event in state.watcher.read(0)}
+            if not kinds & {LISTING, RESCAN} and file_sizes(state.files) == state.sizes:
+                self.projects[key] = state
+                cli.print_info(f"Reusing the {len(state.files)} files selected by the last run "
+                               f"(no files added or removed since)")
+                return list(state.files)
+        else:
+            state = WatchSession(cli, Path(directory), exclude_dirs=exclude_dirs, exclude_files=exclude_files,
+                                 workers=workers, poll_interval=cli.config.get('watch_poll_interval', 1.0),
+                                 skip_output=False)
+
+        # Watch first, so nothing that changes during the walk is missed
+        state.watch_tree()
+        state.files = DocMintCLI.get_project_files(cli, directory, exclude_dirs, exclude_files, workers)
+        state.selected = {os.path.abspath(path) for path in state.files}
+        state.sizes = file_sizes(state.files)
+        state.track_files()
+        self.projects[key] = state
+        while len(self.projects) > self.max_projects:
+            self.projects.popitem(last=False)[1].close()
+        return list(state.files)
+
+    # Serving
+
+    def status(self) -> str:
+        uptime = time.monotonic() - self.started
+        return (f"DocMint daemon {__version__} (pid {os.getpid()}) on {self.path}: up {uptime:.0f}s, "
+                f"{self.runs} run{'s' if self.runs != 1 else ''} served, "
+                f"{len(self.projects)} project{'s' if len(self.projects) != 1 else ''} watched\n")
+
+    def handle(self, conn: socket.socket):
+        """Serve one connection"""
+        channel = Channel(conn)
+        try:
+            request = channel.receive()
+            if request is None:
+                return
+            command = request.get('command')
+            env = request.get('env')
+            env = {str(name): str(value) for name, value in env.items()} if isinstance(env, dict) else None
+            if command is None and env is not None and env.get('HOME') != os.environ.get('HOME'):
+                channel.send(daemon=None)
+                return
+            channel.send(daemon=__version__)
+            if request.get('version') != __version__:
+                return
+
+            if command == 'stop':
+                self._stopping = True
+                channel.send(out="DocMint daemon stopped\n")
+                channel.send(exit=0)
+                return
+            if command == 'status':
+                channel.send(out=self.status())
+                channel.send(exit=0)
+                return
+
+            argv = [str(arg) for arg in request.get('argv') or []]
+            if argv[:1] and argv[0] in LOCAL_COMMANDS:
+                channel.send(err=f"docmint {argv[0]} cannot run in the daemon\n")
+                channel.send(exit=2)
+                return
+            self.run(channel, argv, str(request.get('cwd') or '.'), env)
+        except ClientDisconnected:
+            pass
+        finally:
+            channel.close()
+
+    def run(self, channel: Channel, argv: List[str], cwd: str, env: Optional[Dict[str, str]] = None):
+        """Run the CLI for a client, in its working directory, with its environment and its output"""
+        started = time.monotonic()
+        cli = DaemonCLI(self, channel)
+        home = os.getcwd()
+        status = 1
+        try:
+            os.chdir(cwd)
+            with client_environment(env), contextlib.redirect_stdout(ChannelWriter(channel, 'out')), \
+                    contextlib.redirect_stderr(ChannelWriter(channel, 'err')):
+                try:
+                    status = run_cli(argv, cli)
+                except SystemExit as e:
+                    # argparse errors and --help
+                    status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except ClientDisconnected:
+            status = 130
+        except OSError as e:
+            channel.send(err=f"docmint daemon cannot run in {cwd}: {str(e)}\n")
+        finally:
+            os.chdir(home)
+        status = status or 0
+        self.remember_health(cli)
+        self.runs += 1
+        if channel.closed:
+            self.cli.print_warning(f"{' '.join(['docmint'] + argv)} in {cwd}: cancelled by the client "
+                                   f"({(time.monotonic() - started) * 1000:,.0f} ms)")
+            return
+        channel.send(exit=status)
+        self.cli.print_info(f"{' '.join(['docmint'] + argv)} in {cwd}: exit {status} "
+                            f"({(time.monotonic() - started) * 1000:,.0f} ms)")
+
+    def serve(self) -> int:
+        """Accept runs until stopped or idle for ``idle_timeout`` seconds"""
+        if os.path.exists(self.path):
+            running = connect(self.path)
+            if running is not None:
+                running.close()
+                self.cli.print_error(f"A DocMint daemon is already running on {self.path}")
+                return 1
+            os.unlink(self.path)  # left behind by a daemon that did not exit cleanly
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(umask)
+        server.listen(16)
+        server.settimeout(self.idle_timeout if self.idle_timeout > 0 else None)
+        self.cli.print_success(f"DocMint daemon listening on {self.path} (pid {os.getpid()})")
+
+        try:
+            while not self._stopping:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    self.cli.print_info(f"No runs for {self.idle_timeout:g}s, stopping")
+                    break
+                conn.settimeout(None)
+                with conn:
+                    try:
+                        self.handle(conn)
+                    except Exception as e:
+                        self.cli.print_error(f"Run failed: {str(e)}")
+        finally:
+            server.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.close()
+        return 0
+
+    def close(self):
+        for state in self.projects.values():
+            state.close()
+        self.projects.clear()
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+
+def run_daemon(cli: DocMintCLI, argv: List[str]) -> int:
+    """Entry point for ``docmint daemon``"""
+    parser = argparse.ArgumentParser(
+        prog="docmint daemon",
+        description="Serve docmint runs from a long-lived process with warm caches",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  {Colors.GREEN}docmint daemon &{Colors.END}                 # Start it; later docmint runs use it
+  {Colors.GREEN}docmint daemon --status{Colors.END}          # Show whether it is running
+  {Colors.GREEN}docmint daemon --stop{Colors.END}            # Stop it
+  {Colors.GREEN}docmint --no-daemon{Colors.END}              # Run without it
+        """
+    )
+    parser.add_argument('--socket', metavar='PATH',
+                        help='Unix socket to listen on (default: $DOCMINT_SOCKET or ~/.docmint/daemon.sock)')
+    parser.add_argument('--idle-timeout', type=float, metavar='SECONDS',
+                        help='Stop after this long without a run, 0 to never stop (default: from config)')
+    parser.add_argument('--status', action='store_true',
+                        help='Report whether a daemon is running and exit')
+    parser.add_argument('--stop', action='store_true',
+                        help='Stop the running daemon and exit')
+
+    args = parser.parse_args(argv)
+    path = args.socket or socket_path()
+
+    if args.status or args.stop:
+        status = forward([], 'stop' if args.stop else 'status', path)
+        if status is None:
+            cli.print_info(f"No DocMint daemon is running on {path}")
+            return 1 if args.status else 0
+        return status
+
+    if not hasattr(socket, 'AF_UNIX'):
+        cli.print_error("docmint daemon needs Unix domain sockets, which this platform does not have")
+        return 1
+
+    daemon = DocMintDaemon(
+        cli, path,
+        idle_timeout=args.idle_timeout if args.idle_timeout is not None
+        else cli.config.get('daemon_idle_timeout', 3600),
+        max_projects=cli.config.get('daemon_max_projects', 8),
+        health_ttl=cli.config.get('daemon_health_ttl', 60)
+    )
+    # Stop cleanly (removing the socket) when terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        return daemon.serve()
+    except KeyboardInterrupt:
+        print()
+        cli.print_info("DocMint daemon stopped")
+        return 0
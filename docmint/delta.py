@@ -0,0 +1,71 @@
+"""
+Content-addressed uploads for DocMint CLI
+
+Backends that advertise the ``delta_upload`` feature in their health check
+understand a ``manifest`` form field listing every file name with the
+SHA-256 of its body. With them, files with identical content (vendored
+copies, generated twins, repeated config files) are uploaded once per
+request and the backend maps the single body back to each name. Other
+backends would ignore the manifest, so they get every file.
+
+Backends with the feature also support a manifest-first exchange, so
+unchanged files are not sent again on the next run:
+
+1. ``POST /api/files/missing/`` with ``{"digests": [...]}``; the backend
+   answers ``{"missing": [...]}`` with the digests it has no body for.
+2. ``POST /api/generate-from-files/`` with the ``manifest`` field and only
+   the missing bodies. If the backend has dropped a body in the meantime it
+   answers ``409`` with the digests it lacks and the client sends them all.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .multipart import FilePart
+
+DELTA_FEATURE = 'delta_upload'
+MANIFEST_FIELD = 'manifest'
+MISSING_ENDPOINT = '/api/files/missing/'
+
+
+def server_features(body: Any) -> Set[str]:
+    """Collect the optional protocol features a health check response advertises"""
+    if not isinstance(body, dict):
+        return set()
+    features = body.get('features')
+    if isinstance(features, str):
+        features = features.split(',')
+    if not isinstance(features, (list, tuple)):
+        return set()
+    return {str(feature).strip().lower() for feature in features}
+
+
+def dedupe_parts(parts: Iterable[FilePart]) -> Tuple[List[FilePart], List[Dict[str, Any]]]:
+    """Keep the first part for each distinct body and list every file in a manifest"""
+    unique = {}
+    manifest = []
+    for part in parts:
+        digest = part.content_digest()
+        unique.setdefault(digest, part)
+        manifest.append({'name': part.filename, 'digest': digest, 'length': part.length})
+    return list(unique.values()), manifest
+
+
+def encode_manifest(manifest: List[Dict[str, Any]]) -> str:
+    return json.dumps(manifest, separators=(',', ':'))
+
+
+def missing_digests(session, base_url: str, digests: List[str],
+                    read_timeout: Optional[float] = None) -> Optional[Set[str]]:
+    """Ask the backend which bodies it needs, or None if it cannot say"""
+    try:
+        response = session.post(f"{base_url}{MISSING_ENDPOINT}", json={'digests': digests},
+                                 read_timeout=read_timeout)
+        if response.status_code != 200:
+            return None
+        missing = response.json().get('missing')
+    except Exception:
+        return None
+    if not isinstance(missing, list):
+        return None
+    return set(missing) & set(digests)
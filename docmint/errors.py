@@ -0,0 +1,39 @@
+"""
+Errors raised by DocMint
+
+:class:`docmint.client.DocMintClient` raises these; the CLI prints their
+message instead.
+"""
+
+from typing import Optional
+
+
+class DocMintError(Exception):
+    """Base class for errors that stop a README from being generated"""
+
+
+class BackendUnavailableError(DocMintError):
+    """The backend could not be reached"""
+
+
+class NoFilesError(DocMintError):
+    """The project has no files that could be analyzed"""
+
+
+class NetworkError(DocMintError):
+    """A backend request failed before an answer came back"""
+
+
+class RequestTimeoutError(NetworkError):
+    """A backend request timed out"""
+
+
+class GenerationError(DocMintError):
+    """The backend answered but did not produce a README
+
+    ``status`` is the HTTP status code when the backend rejected the request.
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
@@ -0,0 +1,82 @@
+"""
+Exclusion matching for DocMint CLI
+
+Compiles the excluded directory and file patterns into a single matcher so
+that every path is tested against a handful of precompiled regexes instead of
+looping over each pattern with fnmatch.
+"""
+
+import os
+import re
+import fnmatch
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional, Pattern, Sequence
+
+
+def _compile_alternation(patterns: Iterable[str]) -> Optional[Pattern]:
+    """Join fnmatch patterns into one regex, or None if there are none"""
+    translated = [fnmatch.translate(os.path.normcase(p)) for p in sorted(set(patterns))]
+    if not translated:
+        return None
+    return re.compile('|'.join(f'(?:{t})' for t in translated))
+
+
+class ExclusionMatcher:
+    """Precompiled directory and file exclusion rules
+
+    Mirrors the semantics of ``DocMintCLI.should_exclude_path``:
+
+    * a directory pattern excludes a path when any of its parts equals the
+      pattern, or matches it as a wildcard when the pattern contains ``*``
+    * a file pattern excludes a path when the file name equals the pattern,
+      matches it as a wildcard when it contains ``*``, or when the full path
+      matches it as a wildcard when it contains a path separator
+    """
+
+    def __init__(self, exclude_dirs: Iterable[str], exclude_files: Iterable[str]):
+        exclude_dirs = set(exclude_dirs)
+        exclude_files = set(exclude_files)
+
+        self.dir_names = frozenset(exclude_dirs)
+        self.dir_regex = _compile_alternation(p for p in exclude_dirs if '*' in p)
+
+        self.file_names = frozenset(exclude_files)
+        self.file_regex = _compile_alternation(p for p in exclude_files if '*' in p)
+        self.path_regex = _compile_alternation(
+            p for p in exclude_files if '/' in p or '\\' in p
+        )
+
+    def excludes_part(self, name: str) -> bool:
+        """Check a single path component against the directory rules"""
+        if name in self.dir_names:
+            return True
+        return self.dir_regex is not None and self.dir_regex.match(os.path.normcase(name)) is not None
+
+    def excludes_any_part(self, parts: Sequence[str]) -> bool:
+        """Check whether any path component is excluded by the directory rules"""
+        return any(self.excludes_part(part) for part in parts)
+
+    def excludes_file(self, name: str, path_str: str) -> bool:
+        """Check a file name and its full path against the file rules"""
+        if name in self.file_names:
+            return True
+        if self.file_regex is not None and self.file_regex.match(os.path.normcase(name)):
+            return True
+        return self.path_regex is not None and self.path_regex.match(os.path.normcase(path_str)) is not None
+
+    def matches(self, file_path: Path) -> bool:
+        """Check if a path should be excluded (same result as should_exclude_path)"""
+        if self.excludes_any_part(file_path.parts):
+            return True
+        return self.excludes_file(file_path.name, str(file_path))
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(exclude_dirs: frozenset, exclude_files: frozenset) -> ExclusionMatcher:
+    return ExclusionMatcher(exclude_dirs, exclude_files)
+
+
+def compile_matcher(exclude_dirs: Iterable[str], exclude_files: Iterable[str]) -> ExclusionMatcher:
+    """Return a compiled matcher, reusing one built earlier for the same rules"""
+    return _cached_matcher(frozenset(exclude_dirs), frozenset(exclude_files))
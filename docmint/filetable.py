@@ -0,0 +1,141 @@
+"""
+Compact file tables for DocMint CLI
+
+Listing a large checkout yields hundreds of thousands of files before ranking
+keeps the best few. :class:`FileTable` holds such a listing in columns rather
+than as a ``(path, size)`` tuple per file. Each distinct directory and base
+name is stored once, interned, and a file is just the index of its
+directory, the index of its name and its size, in compact arrays.
+
+The files that ranking keeps become :class:`FileRecord`s. A record holds the
+file's path, its name relative to the project root, its size and its
+ranking score. It is passed unchanged from selection through reading to the
+upload, so relative names are never recomputed, least of all against the
+working directory.
+"""
+
+import os
+import sys
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+
+class FileTable:
+    """File listing stored as columns: directory, base name and size
+
+    Directories and base names each go in a table of distinct values (names
+    like ``__init__.py`` or ``index.js`` recur throughout a large tree), and
+    files refer to them by index. Paths are relative to the listing's root
+    and use ``os.sep``; files in the root itself have the directory ``''``.
+    """
+
+    __slots__ = ('directories', 'names', 'dir_ids', 'name_ids', 'sizes', '_dir_index', '_name_index')
+
+    def __init__(self):
+        self.directories = []  # type: List[str]
+        self.names = []  # type: List[str]
+        self.dir_ids = array('I')
+        self.name_ids = array('I')
+        self.sizes = array('q')
+        self._dir_index = {}  # type: Dict[str, int]
+        self._name_index = {}  # type: Dict[str, int]
+
+    def directory_id(self, directory: str) -> int:
+        """Index of a directory in the table, adding it if it is new"""
+        dir_id = self._dir_index.get(directory)
+        if dir_id is None:
+            dir_id = self._dir_index[directory] = len(self.directories)
+            self.directories.append(sys.intern(directory))
+        return dir_id
+
+    def name_id(self, name: str) -> int:
+        """Index of a base name in the table, adding it if it is new"""
+        name_id = self._name_index.get(name)
+        if name_id is None:
+            name_id = self._name_index[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return name_id
+
+    def append(self, dir_id: int, name_id: int, size: int):
+        self.dir_ids.append(dir_id)
+        self.name_ids.append(name_id)
+        self.sizes.append(size)
+
+    def add(self, path: str, size: int):
+        directory, _, name = path.rpartition(os.sep)
+        self.append(self.directory_id(directory), self.name_id(name), size)
+
+    def path(self, index: int) -> str:
+        directory = self.directories[self.dir_ids[index]]
+        name = self.names[self.name_ids[index]]
+        return directory + os.sep + name if directory else name
+
+    def subtree(self, prefix: str) -> 'FileTable':
+        """The files below directory ``prefix``, relative to it"""
+        table = FileTable()
+        table.names = self.names
+        table._name_index = self._name_index
+        start = prefix + os.sep
+        mapping = []
+        for directory in self.directories:
+            if directory == prefix:
+                mapping.append(table.directory_id(''))
+            elif directory.startswith(start):
+                mapping.append(table.directory_id(directory[len(start):]))
+            else:
+                mapping.append(-1)
+        for dir_id, name_id, size in zip(self.dir_ids, self.name_ids, self.sizes):
+            dir_id = mapping[dir_id]
+            if dir_id >= 0:
+                table.append(dir_id, name_id, size)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        """``(path, size)`` for each file, in table order"""
+        for index in range(len(self.sizes)):
+            yield self.path(index), self.sizes[index]
+
+
+class FileRecord:
+    """A selected project file, carried from selection to upload
+
+    ``path`` is where the file was found, ``name`` its path relative to the
+    project root and ``priority`` the ranking score. Like a ``Path``, a
+    record can be passed to ``open`` or ``os.stat`` and ``str()`` gives its
+    path.
+    """
+
+    __slots__ = ('path', 'name', 'size', 'priority')
+
+    def __init__(self, path: str, name: str, size: int, priority: float = 0.0):
+        self.path = path
+        self.name = name
+        self.size = size
+        self.priority = priority
+
+    @classmethod
+    def from_path(cls, root: str, path: str, size: int, priority: float = 0.0) -> 'FileRecord':
+        """Record for a path found below ``root`` (joined the way the walker joins them)"""
+        prefix = '' if root == '.' else os.path.join(root, '')
+        name = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, root)
+        return cls(path, sys.intern(name), size, priority)
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __str__(self) -> str:
+        return self.path
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, FileRecord):
+            return NotImplemented
+        return self.path == other.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+    def __repr__(self) -> str:
+        return f"FileRecord({self.name!r}, size={self.size})"
@@ -0,0 +1,264 @@
+"""
+Git index reader for DocMint CLI
+
+Lists the files tracked in a git checkout by parsing ``.git/index`` directly
+(index format versions 2 to 4), without running ``git``: the index already
+records each file's path, mode and size. In a checkout this replaces the
+directory walk, and whatever ``.gitignore`` excludes is never seen because
+it is not tracked.
+
+Files added since the index was written are not in it yet. Adding a file
+updates its directory's modification time, so, like git's untracked cache,
+only the directories modified since then are read for untracked files, and
+any untracked directory found in them is walked in full.
+
+See https://git-scm.com/docs/index-format for the format.
+"""
+
+import os
+import struct
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .filetable import FileTable
+from .ignore import IgnoreMatcher, parse_rules
+
+INDEX_SIGNATURE = b'DIRC'
+
+# Mode, size and flags of an entry; the timestamps, device, inode, owner and
+# object name around them are skipped
+_ENTRY = struct.Struct('>24xI8xI20xH')
+_EXTENDED_FLAG = 0x4000
+_SKIP_WORKTREE = 0x4000  # in the extended flags: not checked out (sparse)
+_NAME_MASK = 0x0FFF
+_STAGE_MASK = 0x3000
+
+# File modes of regular files and symlinks; gitlinks (submodules) and the
+# directory entries of a sparse index are left out
+_FILE_TYPES = (0o100000, 0o120000)
+
+# Extensions that mean the entries above are not the whole index
+_SPLIT_INDEX = b'link'
+
+
+class GitIndexError(Exception):
+    """Raised when an index file cannot be parsed"""
+
+
+def find_git_dir(path: str) -> Optional[Tuple[str, str]]:
+    """Return ``(git_dir, work_tree)`` for the checkout containing ``path``, if any
+
+    Follows ``.git`` files (``gitdir: ...``) used by worktrees and submodules.
+    """
+    current = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(current, '.git')
+        if os.path.isdir(dot_git):
+            return dot_git, current
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, 'r', encoding='utf-8') as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith('gitdir:'):
+                return None
+            git_dir = line[len('gitdir:'):].strip()
+            return os.path.normpath(os.path.join(current, git_dir)), current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Decode the offset encoding used for v4 path prefixes"""
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
+
+
+def parse_index(data: bytes) -> FileTable:
+    """Return the checked-out files in an index, in index order"""
+    if len(data) < 12 or data[:4] != INDEX_SIGNATURE:
+        raise GitIndexError("not a git index file")
+    version, count = struct.unpack_from('>II', data, 4)
+    if version not in (2, 3, 4):
+        raise GitIndexError(f"unsupported index version {version}")
+
+    unpack = _ENTRY.unpack_from
+    entry_size = _ENTRY.size
+    files = FileTable()
+    previous = b''
+    # Entries are sorted by path, so a file is usually in the same directory
+    # as the one before it; base names are decoded once each
+    last_directory = None
+    dir_id = 0
+    name_ids = {}
+    pos = 12
+    try:
+        for _ in range(count):
+            start = pos
+            mode, size, flags = unpack(data, pos)
+            pos += entry_size
+            extended = 0
+            if flags & _EXTENDED_FLAG and version >= 3:
+                extended = struct.unpack_from('>H', data, pos)[0]
+                pos += 2
+
+            if version == 4:
+                strip, pos = _read_varint(data, pos)
+                end = data.index(b'\0', pos)
+                name = previous[:len(previous) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                length = flags & _NAME_MASK
+                end = pos + length if length < _NAME_MASK else data.index(b'\0', pos)
+                name = data[pos:end]
+                # Entries are NUL padded to a multiple of eight bytes
+                pos = start + ((end - start) // 8 + 1) * 8
+            previous = name
+
+            if mode & 0o170000 not in _FILE_TYPES or flags & _STAGE_MASK or extended & _SKIP_WORKTREE:
+                continue
+            directory, _, base = name.rpartition(b'/')
+            if directory != last_directory:
+                last_directory = directory
+                directory = directory.decode('utf-8', 'surrogateescape')
+                dir_id = files.directory_id(directory if os.sep == '/' else directory.replace('/', os.sep))
+            name_id = name_ids.get(base)
+            if name_id is None:
+                name_id = name_ids[base] = files.name_id(base.decode('utf-8', 'surrogateescape'))
+            files.append(dir_id, name_id, size)
+    except (struct.error, ValueError, IndexError) as e:
+        raise GitIndexError(f"truncated index: {e}")
+
+    # Extensions follow the entries, ending 20 bytes before the checksum
+    while pos + 8 <= len(data) - 20:
+        signature, size = data[pos:pos + 4], struct.unpack_from('>I', data, pos + 4)[0]
+        if signature == _SPLIT_INDEX:
+            raise GitIndexError("split index is not supported")
+        pos += 8 + size
+    return files
+
+
+def tracked_files(root: str, skip_dir: Optional[Callable[[str], bool]] = None) -> Optional[FileTable]:
+    """List the tracked files below ``root``, and those new since the index was written
+
+    Paths are relative to ``root``. Untracked directories whose name
+    ``skip_dir`` accepts are not read. Returns None when ``root`` is not
+    inside a git checkout, nothing below it is tracked or the index cannot be
+    read, so the caller can walk the directory instead.
+    """
+    found = find_git_dir(root)
+    if found is None:
+        return None
+    git_dir, work_tree = found
+    try:
+        with open(os.path.join(git_dir, 'index'), 'rb') as f:
+            written = os.fstat(f.fileno()).st_mtime_ns
+            entries = parse_index(f.read())
+    except (OSError, GitIndexError):
+        return None
+
+    prefix = os.path.relpath(os.path.abspath(root), work_tree)
+    files = entries if prefix == os.curdir else entries.subtree(prefix)
+    if not len(files):
+        # An untracked project inside a checkout
+        return None
+    add_new_files(files, root, git_dir, work_tree, written, skip_dir)
+    return files
+
+
+def add_new_files(files: FileTable, root: str, git_dir: str, work_tree: str, since_ns: int,
+                  skip_dir: Optional[Callable[[str], bool]] = None) -> int:
+    """Add the untracked files that are not ignored, in directories modified since ``since_ns``
+
+    ``files`` lists the tracked files below ``root``, relative to it. Rules
+    from ``.gitignore`` files (up to the work tree) and ``info/exclude`` are
+    applied. Returns the number of files added.
+    """
+    directories = {''}  # type: Set[str]
+    for directory in files.directories:
+        while directory not in directories:
+            directories.add(directory)
+            directory = os.path.dirname(directory)
+
+    changed = []
+    for directory in directories:
+        try:
+            if os.stat(os.path.join(root, directory)).st_mtime_ns >= since_ns:
+                changed.append(directory)
+        except OSError:
+            continue
+    if not changed:
+        return 0
+
+    # Names already tracked in the modified directories
+    changed_ids = {dir_id: directory for dir_id, directory in enumerate(files.directories)
+                   if directory in changed}
+    tracked = {}  # type: Dict[str, Set[str]]
+    for dir_id, name_id in zip(files.dir_ids, files.name_ids):
+        directory = changed_ids.get(dir_id)
+        if directory is not None:
+            tracked.setdefault(directory, set()).add(files.names[name_id])
+
+    # Ignore rules are matched against paths relative to the work tree
+    base = os.path.relpath(os.path.abspath(root), work_tree)
+    base = '' if base == os.curdir else base.replace(os.sep, '/') + '/'
+    ignore = IgnoreMatcher(('.gitignore',))
+    loaded = set()  # type: Set[str]
+
+    def load(path: str):
+        parts = path.split('/') if path else []
+        for end in range(len(parts) + 1):
+            directory = '/'.join(parts[:end])
+            if directory not in loaded:
+                loaded.add(directory)
+                ignore.load(directory, work_tree)
+
+    load('')
+    try:
+        with open(os.path.join(git_dir, 'info', 'exclude'), 'r', encoding='utf-8', errors='replace') as f:
+            # Below every .gitignore in precedence
+            ignore.rules[''] = parse_rules(f.readlines()) + ignore.rules.get('', [])
+    except OSError:
+        pass
+
+    added = 0
+    pending = sorted(changed, reverse=True)  # type: List[str]
+    untracked = set()  # type: Set[str]
+    while pending:
+        directory = pending.pop()
+        relative = base + directory.replace(os.sep, '/')
+        load(relative.rstrip('/'))
+        if relative and not relative.endswith('/'):
+            relative += '/'
+        try:
+            with os.scandir(os.path.join(root, directory)) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        if directory in untracked and any(entry.name == '.git' for entry in entries):
+            continue  # a nested repository
+        known = tracked.get(directory, ())
+        for entry in entries:
+            name = entry.name
+            path = directory + os.sep + name if directory else name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if path in directories or name == '.git' or (skip_dir is not None and skip_dir(name)) \
+                            or ignore.ignored(relative + name, True):
+                        continue
+                    untracked.add(path)
+                    pending.append(path)
+                elif name not in known and entry.is_file() and not ignore.excludes(relative + name):
+                    files.add(path, entry.stat().st_size)
+                    added += 1
+            except OSError:
+                continue
+    return added
@@ -0,0 +1,178 @@
+"""
+Ignore files for DocMint CLI
+
+Compiles ``.gitignore`` and ``.docmintignore`` files into regexes, used to
+prune the directory walk of projects that are not git checkouts (in a
+checkout the git index already leaves ignored files out). Rules follow
+gitignore semantics:
+
+* blank lines and ``#`` comments are skipped, ``\\`` escapes a leading
+  ``#`` or ``!`` and trailing spaces
+* ``!pattern`` re-includes what an earlier pattern excluded
+* a trailing ``/`` only matches directories
+* a pattern with a ``/`` before its end is anchored to the directory of the
+  ignore file; otherwise it matches a name at any depth below it
+* ``*`` and ``?`` do not match ``/``; ``**`` matches across directories
+
+Rules in deeper directories take precedence over shallower ones, and
+``.docmintignore`` over ``.gitignore`` in the same directory; within a file
+the last matching rule wins.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Pattern, Sequence
+
+IGNORE_FILES = ('.gitignore', '.docmintignore')
+
+
+def translate(pattern: str) -> str:
+    """Translate a gitignore glob (without ``!`` or trailing ``/``) into a regex"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                at_start = i == 0 or pattern[i - 1] == '/'
+                if at_start and pattern.startswith('**/', i):
+                    out.append('(?:.*/)?')
+                    i += 3
+                    continue
+                if at_start and i + 2 == n:
+                    out.append('.*')
+                    i += 2
+                    continue
+            out.append('[^/]*')
+            while i < n and pattern[i] == '*':
+                i += 1
+            continue
+        if c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            first = i + 2 if pattern.startswith(('[!', '[^'), i) else i + 1
+            end = pattern.find(']', first + 1)  # a ']' right after the '[' is literal
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreRule:
+    """One compiled line of an ignore file"""
+
+    __slots__ = ('regex', 'negate', 'dir_only')
+
+    def __init__(self, regex: Pattern, negate: bool, dir_only: bool):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+
+
+def parse_rule(line: str) -> Optional[IgnoreRule]:
+    """Compile one line of an ignore file, or None for blanks and comments"""
+    line = line.rstrip('\n').rstrip('\r')
+    # Trailing spaces are dropped unless escaped
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        stripped += ' '
+    line = stripped
+    if not line or line.startswith('#'):
+        return None
+
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    anchored = '/' in line
+    body = translate(line.lstrip('/'))
+    if not anchored:
+        body = '(?:.*/)?' + body
+    return IgnoreRule(re.compile(body + r'\Z', re.DOTALL), negate, dir_only)
+
+
+def parse_rules(lines: Sequence[str]) -> List[IgnoreRule]:
+    return [rule for rule in map(parse_rule, lines) if rule is not None]
+
+
+class IgnoreMatcher:
+    """Rules from the ignore files found in a tree, by directory
+
+    Paths are relative to the tree root and use ``/``. Load each directory's
+    files with :meth:`load` before matching anything below it.
+    """
+
+    def __init__(self, names: Sequence[str] = IGNORE_FILES):
+        self.names = tuple(names)
+        self.rules = {}  # type: Dict[str, List[IgnoreRule]]
+
+    def load(self, directory: str, root: str) -> bool:
+        """Read the ignore files of ``directory`` (relative, '' for the root) under ``root``"""
+        rules = []
+        for name in self.names:
+            try:
+                with open(os.path.join(root, directory, name), 'r', encoding='utf-8', errors='replace') as f:
+                    rules.extend(parse_rules(f.readlines()))
+            except OSError:
+                continue
+        if rules:
+            self.rules[directory] = rules
+        return bool(rules)
+
+    def ignored(self, path: str, is_dir: bool = False) -> bool:
+        """Check a path relative to the root against the rules that apply to it"""
+        if not self.rules:
+            return False
+        # From the deepest directory up, the first rule matching from the bottom decides
+        bases = [''] + [path[:i] for i in range(len(path)) if path[i] == '/']
+        for base in reversed(bases):
+            rules = self.rules.get(base)
+            if not rules:
+                continue
+            relative = path[len(base) + 1:] if base else path
+            for rule in reversed(rules):
+                if rule.dir_only and not is_dir:
+                    continue
+                if rule.regex.match(relative):
+                    return not rule.negate
+        return False
+
+    def excludes(self, path: str) -> bool:
+        """Check a file path, and each directory above it, against the rules"""
+        if not self.rules:
+            return False
+        start = 0
+        while True:
+            slash = path.find('/', start)
+            if slash < 0:
+                return self.ignored(path)
+            if self.ignored(path[:slash], True):
+                return True
+            start = slash + 1
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+
+def load_ignore_files(root: str, directories: Sequence[str] = ('',),
+                      names: Sequence[str] = IGNORE_FILES) -> IgnoreMatcher:
+    """Build a matcher from the ignore files of the given directories"""
+    matcher = IgnoreMatcher(names)
+    for directory in directories:
+        matcher.load(directory, root)
+    return matcher
@@ -0,0 +1,123 @@
+"""
+Command line entry point for DocMint
+
+When a ``docmint daemon`` is listening on its Unix socket, a run is
+forwarded to it: the arguments, working directory and environment are sent
+over, and the daemon's output (and any question it asks) comes back. Otherwise, or with
+``--no-daemon`` or ``DOCMINT_NO_DAEMON=1``, the CLI runs in this process.
+
+Only the standard library is imported until that choice is made, so a
+forwarded run does not pay for importing the CLI. See ``daemon.py`` for the
+protocol.
+"""
+
+import json
+import os
+import socket
+import sys
+from typing import Any, Dict, List, Optional
+
+SOCKET_ENV = 'DOCMINT_SOCKET'
+NO_DAEMON_ENV = 'DOCMINT_NO_DAEMON'
+
+# Commands that always run in the calling process
+LOCAL_COMMANDS = ('batch', 'watch', 'daemon')
+
+
+def socket_path() -> str:
+    """The daemon's socket: $DOCMINT_SOCKET or ~/.docmint/daemon.sock"""
+    return os.environ.get(SOCKET_ENV) or os.path.join(os.path.expanduser('~'), '.docmint', 'daemon.sock')
+
+
+def connect(path: Optional[str] = None) -> Optional[socket.socket]:
+    """Connect to a running daemon, or return None"""
+    path = path or socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def send(stream, message: Dict[str, Any]):
+    stream.write(json.dumps(message).encode('utf-8') + b'\n')
+    stream.flush()
+
+
+def receive(stream) -> Optional[Dict[str, Any]]:
+    try:
+        line = stream.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def forward(argv: List[str], command: Optional[str] = None, path: Optional[str] = None) -> Optional[int]:
+    """Have the daemon run ``argv`` (or a daemon ``command``) and relay its output
+
+    Returns the exit status, or None when no daemon of this version is running.
+    """
+    from . import __version__
+    sock = connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile('rwb') as stream:
+        try:
+            send(stream, {'version': __version__, 'argv': argv, 'cwd': os.getcwd(), 'env': dict(os.environ),
+                          'command': command})
+        except OSError:
+            return None
+        hello = receive(stream)
+        if hello is None or hello.get('daemon') != __version__:
+            return None
+
+        while True:
+            message = receive(stream)
+            if message is None:
+                sys.stderr.write("docmint daemon stopped before the run finished\n")
+                return 1
+            if 'out' in message:
+                sys.stdout.write(message['out'])
+                sys.stdout.flush()
+            elif 'err' in message:
+                sys.stderr.write(message['err'])
+                sys.stderr.flush()
+            elif 'ask' in message:
+                try:
+                    answer = input(message['ask'])
+                except EOFError:
+                    answer = None
+                send(stream, {'answer': answer})
+            elif 'exit' in message:
+                return message['exit']
+
+
+def main():
+    """Entry point for the ``docmint`` command"""
+    argv = sys.argv[1:]
+    local = bool(argv) and argv[0] in LOCAL_COMMANDS
+    if local or '--no-daemon' in argv or os.environ.get(NO_DAEMON_ENV):
+        status = None
+    else:
+        try:
+            status = forward(argv)
+        except KeyboardInterrupt:
+            print("\nOperation cancelled by user.")
+            return 1
+    if status is not None:
+        return status
+    from .cli import main as run_cli
+    return run_cli(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,528 @@
+"""
+Structured project summaries for DocMint CLI
+
+Most of what a README says comes from a project's manifests and its public
+interface rather than from the bodies of its functions. :func:`summarize`
+reduces one file to a small dict:
+
+* for a manifest (``package.json``, ``pyproject.toml``, ``setup.py``,
+  ``setup.cfg``, ``requirements.txt``, ``Cargo.toml``, ``go.mod``,
+  ``composer.json``): name, version, description, dependencies, scripts and
+  entry points
+* for a source file: its docstring, top-level signatures with the first line
+  of their docs, exported names and command-line flags
+
+:func:`build_digest` gathers the summaries into one compact JSON document that
+is uploaded next to the files, or instead of them.
+
+Python is parsed with :mod:`ast`. JavaScript/TypeScript, Go and Rust are read
+with regular expressions over top-level declarations, which is enough for
+signatures and doc comments without a parser for each language. TOML
+manifests need :mod:`tomllib` (Python 3.11+) or ``tomli`` and are uploaded
+unsummarized without either. A file that does not parse gets no summary.
+"""
+
+import ast
+import configparser
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+DIGEST_NAME = 'docmint-digest.json'
+# Part of the response cache key: bump when summaries change
+DIGEST_VERSION = 1
+DIGEST_MODES = ('off', 'alongside', 'instead')
+
+MAX_ITEMS = 40  # entries kept in each list
+MAX_DOC_CHARS = 160
+MAX_SIGNATURE_CHARS = 160
+MAX_DEFAULT_CHARS = 40
+
+Summary = Dict[str, Any]
+
+
+def _clip(text: str, limit: int) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + '...'
+
+
+def _first_paragraph(doc: Optional[str]) -> str:
+    """First paragraph of a docstring or doc comment, on one line"""
+    if not doc:
+        return ''
+    lines = []
+    for line in doc.strip().splitlines():
+        line = line.strip()
+        if not line or line.startswith('@'):
+            if lines:
+                break
+            continue
+        lines.append(line)
+    return _clip(' '.join(lines), MAX_DOC_CHARS)
+
+
+def _described(signature: str, doc: Optional[str], comment: str = '#') -> str:
+    first = _first_paragraph(doc)
+    return f"{signature}  {comment} {first}" if first else signature
+
+
+def _limited(items: List[Any]) -> List[Any]:
+    if len(items) <= MAX_ITEMS:
+        return items
+    return items[:MAX_ITEMS] + [f"... {len(items) - MAX_ITEMS} more"]
+
+
+def _pick(source: Dict[str, Any], keys: Tuple[str, ...]) -> Summary:
+    return {key: source[key] for key in keys if source.get(key) not in (None, '', [], {})}
+
+
+def _pruned(summary: Summary) -> Summary:
+    """Drop empty values and shorten long lists"""
+    pruned = {}
+    for key, value in summary.items():
+        if value in (None, '', [], {}):
+            continue
+        if isinstance(value, list):
+            value = _limited(value)
+        elif isinstance(value, dict) and len(value) > MAX_ITEMS:
+            value = dict(list(value.items())[:MAX_ITEMS])
+        pruned[key] = value
+    return pruned
+
+
+def _dependency_names(dependencies: Any) -> List[str]:
+    if isinstance(dependencies, dict):
+        return list(dependencies)
+    if isinstance(dependencies, list):
+        return [str(item) for item in dependencies]
+    return []
+
+
+# Manifests
+
+def summarize_package_json(text: str) -> Summary:
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        return {}
+    summary = _pick(data, ('name', 'version', 'description', 'type', 'main', 'module', 'types',
+                           'bin', 'license', 'engines', 'workspaces', 'keywords'))
+    if isinstance(data.get('scripts'), dict):
+        summary['scripts'] = {name: _clip(str(command), 80) for name, command in data['scripts'].items()}
+    summary['dependencies'] = data.get('dependencies')
+    summary['peerDependencies'] = data.get('peerDependencies')
+    summary['devDependencies'] = _dependency_names(data.get('devDependencies'))
+    if isinstance(data.get('exports'), dict):
+        summary['exports'] = list(data['exports'])
+    repository = data.get('repository')
+    summary['repository'] = repository.get('url') if isinstance(repository, dict) else repository
+    return _pruned(summary)
+
+
+def summarize_composer_json(text: str) -> Summary:
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        return {}
+    summary = _pick(data, ('name', 'description', 'type', 'license', 'keywords', 'bin', 'require'))
+    summary['require-dev'] = _dependency_names(data.get('require-dev'))
+    if isinstance(data.get('scripts'), dict):
+        summary['scripts'] = list(data['scripts'])
+    autoload = data.get('autoload')
+    if isinstance(autoload, dict) and isinstance(autoload.get('psr-4'), dict):
+        summary['autoload'] = autoload['psr-4']
+    return _pruned(summary)
+
+
+def summarize_pyproject(text: str) -> Summary:
+    data = tomllib.loads(text)
+    project = data.get('project', {})
+    summary = _pick(project, ('name', 'version', 'description', 'requires-python', 'keywords',
+                              'dependencies', 'optional-dependencies', 'scripts', 'gui-scripts',
+                              'entry-points', 'dynamic'))
+    license_info = project.get('license')
+    summary['license'] = license_info.get('text') if isinstance(license_info, dict) else license_info
+    tools = data.get('tool', {})
+    poetry = tools.get('poetry', {})
+    if poetry:
+        summary['poetry'] = _pruned(dict(_pick(poetry, ('name', 'version', 'description', 'dependencies', 'scripts')),
+                                         dev=[name for group in poetry.get('group', {}).values()
+                                              for name in _dependency_names(group.get('dependencies'))]))
+    summary['build-backend'] = data.get('build-system', {}).get('build-backend')
+    summary['tools'] = sorted(tools)
+    return _pruned(summary)
+
+
+def summarize_cargo_toml(text: str) -> Summary:
+    data = tomllib.loads(text)
+    summary = _pick(data.get('package', {}), ('name', 'version', 'description', 'edition', 'license',
+                                              'rust-version', 'keywords'))
+    dependencies = {}
+    for name, spec in data.get('dependencies', {}).items():
+        if isinstance(spec, dict):
+            spec = spec.get('version') or ('path' if 'path' in spec else 'git' if 'git' in spec else '*')
+        dependencies[name] = spec
+    summary['dependencies'] = dependencies
+    summary['dev-dependencies'] = _dependency_names(data.get('dev-dependencies'))
+    summary['features'] = list(data.get('features', {}))
+    summary['bin'] = [target.get('name') or target.get('path') for target in data.get('bin', [])]
+    summary['lib'] = data.get('lib', {}).get('name')
+    summary['workspace'] = data.get('workspace', {}).get('members')
+    return _pruned(summary)
+
+
+SETUP_KEYWORDS = ('name', 'version', 'description', 'license', 'python_requires', 'install_requires',
+                  'extras_require', 'entry_points', 'scripts', 'packages', 'py_modules', 'keywords')
+
+
+def summarize_setup_py(text: str) -> Summary:
+    """The literal arguments of the ``setup()`` call"""
+    summary = {}
+    for node in ast.walk(ast.parse(text)):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        if (func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)) != 'setup':
+            continue
+        for keyword in node.keywords:
+            if keyword.arg in SETUP_KEYWORDS:
+                try:
+                    summary[keyword.arg] = ast.literal_eval(keyword.value)
+                except ValueError:
+                    pass  # computed at install time
+        break
+    return _pruned(summary)
+
+
+def _cfg_list(value: str) -> List[str]:
+    return [line.strip() for line in value.replace(';', '\n').splitlines() if line.strip()]
+
+
+def summarize_setup_cfg(text: str) -> Summary:
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read_string(text)
+    summary = {}
+    if parser.has_section('metadata'):
+        summary.update(_pick(dict(parser['metadata']), ('name', 'version', 'description', 'license')))
+    if parser.has_section('options'):
+        options = parser['options']
+        summary['python_requires'] = options.get('python_requires')
+        summary['install_requires'] = _cfg_list(options.get('install_requires', ''))
+        summary['packages'] = options.get('packages')
+    if parser.has_section('options.entry_points'):
+        summary['entry_points'] = {group: _cfg_list(value)
+                                   for group, value in parser['options.entry_points'].items()}
+    if parser.has_section('options.extras_require'):
+        summary['extras_require'] = {extra: _cfg_list(value)
+                                     for extra, value in parser['options.extras_require'].items()}
+    return _pruned(summary)
+
+
+def summarize_requirements(text: str) -> Summary:
+    requirements = []
+    for line in text.splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if line and not line.startswith(('#', '-')):
+            requirements.append(line)
+    return _pruned({'requirements': requirements})
+
+
+def summarize_go_mod(text: str) -> Summary:
+    summary = {}
+    require = []
+    indirect = 0
+    block = None
+    for line in text.splitlines():
+        line, _, comment = line.partition('//')
+        words = line.split()
+        if not words:
+            continue
+        if block is not None:
+            if words[0] == ')':
+                block = None
+                continue
+            words = [block] + words
+        elif words[-1] == '(':
+            block = words[0]
+            continue
+        if words[0] in ('module', 'go', 'toolchain') and len(words) > 1:
+            summary[words[0]] = words[1]
+        elif words[0] == 'require' and len(words) > 2:
+            if 'indirect' in comment:
+                indirect += 1
+            else:
+                require.append(f"{words[1]} {words[2]}")
+    summary['require'] = require
+    summary['indirect'] = indirect
+    return _pruned(summary)
+
+
+# Sources
+
+def _source(text: str, node: Optional[ast.AST], limit: int = MAX_DEFAULT_CHARS) -> str:
+    if node is None:
+        return ''
+    return _clip(ast.get_source_segment(text, node) or '...', limit)
+
+
+def _python_signature(node: ast.AST, text: str) -> str:
+    """``def name(args) -> returns``, written out from the AST (ast.unparse needs Python 3.9)"""
+    args = node.args
+
+    def parameter(arg: ast.arg, default: Optional[ast.AST] = None, prefix: str = '') -> str:
+        annotation = _source(text, arg.annotation)
+        value = prefix + arg.arg + (f": {annotation}" if annotation else '')
+        if default is not None:
+            value += (' = ' if annotation else '=') + _source(text, default)
+        return value
+
+    params = []
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    for index, (arg, default) in enumerate(zip(positional, defaults)):
+        params.append(parameter(arg, default))
+        if index == len(args.posonlyargs) - 1:
+            params.append('/')
+    if args.vararg is not None:
+        params.append(parameter(args.vararg, prefix='*'))
+    elif args.kwonlyargs:
+        params.append('*')
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        params.append(parameter(arg, default))
+    if args.kwarg is not None:
+        params.append(parameter(args.kwarg, prefix='**'))
+
+    returns = _source(text, node.returns)
+    prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+    signature = f"{prefix} {node.name}({', '.join(params)})" + (f" -> {returns}" if returns else '')
+    return _clip(signature, MAX_SIGNATURE_CHARS)
+
+
+def _public(name: str) -> bool:
+    return not name.startswith('_')
+
+
+def _python_flags(tree: ast.AST) -> Tuple[List[str], List[str]]:
+    """Options declared with argparse or click, and argparse subcommands"""
+    flags = []
+    commands = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        names = [arg.value for arg in node.args if isinstance(arg, ast.Constant) and isinstance(arg.value, str)]
+        if not names:
+            continue
+        help_text = next((keyword.value.value for keyword in node.keywords
+                          if keyword.arg == 'help' and isinstance(keyword.value, ast.Constant)), None)
+        if node.func.attr == 'add_parser':
+            commands.append(_described(names[0], help_text))
+        elif node.func.attr == 'add_argument' or (node.func.attr == 'option' and names[0].startswith('-')):
+            flags.append(_described(', '.join(names), help_text if isinstance(help_text, str) else None))
+    return flags, commands
+
+
+def summarize_python(text: str) -> Summary:
+    tree = ast.parse(text)
+    functions = []
+    classes = []
+    exports = []
+    script = False
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and _public(node.name):
+            functions.append(_described(_python_signature(node, text), ast.get_docstring(node)))
+        elif isinstance(node, ast.ClassDef) and _public(node.name):
+            bases = [_source(text, base) for base in node.bases]
+            methods = [_described(_python_signature(item, text), ast.get_docstring(item))
+                       for item in node.body
+                       if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                       and (_public(item.name) or item.name == '__init__')]
+            classes.append(_pruned({
+                'class': node.name + (f"({', '.join(bases)})" if bases else ''),
+                'doc': _first_paragraph(ast.get_docstring(node)),
+                'methods': methods,
+            }))
+        elif isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == '__all__'
+                                                  for target in node.targets):
+            try:
+                exports = list(ast.literal_eval(node.value))
+            except ValueError:
+                pass
+        elif isinstance(node, ast.If) and '__main__' in _source(text, node.test, MAX_SIGNATURE_CHARS):
+            script = True
+    flags, commands = _python_flags(tree)
+    summary = _pruned({
+        'doc': _first_paragraph(ast.get_docstring(tree)),
+        'exports': exports,
+        'functions': functions,
+        'classes': classes,
+        'commands': commands,
+        'flags': flags,
+    })
+    if summary and script:
+        summary['script'] = True
+    return summary
+
+
+def _comment_before(text: str, start: int, marker: str) -> str:
+    """The run of ``marker`` comment lines just above the line starting at ``start``"""
+    lines = []
+    end = start
+    while end > 0:
+        begin = text.rfind('\n', 0, end - 1) + 1
+        line = text[begin:end].strip()
+        if not line.startswith(marker) or line.startswith(marker + '!'):
+            break
+        lines.append(line[len(marker):].strip())
+        end = begin
+    return '\n'.join(reversed(lines))
+
+
+def _block_comment_before(text: str, start: int) -> str:
+    """The ``/** ... */`` comment just above ``start``"""
+    end = start
+    while end > 0 and text[end - 1].isspace():
+        end -= 1
+    if not text.endswith('*/', 0, end):
+        return ''
+    begin = text.rfind('/**', 0, end)
+    if begin < 0:
+        return ''
+    return '\n'.join(line.strip().lstrip('*') for line in text[begin + 3:end - 2].splitlines())
+
+
+def _collapse(*parts: Optional[str]) -> str:
+    return _clip(''.join(part or '' for part in parts), MAX_SIGNATURE_CHARS)
+
+
+JS_FUNCTION = re.compile(r'^export\s+(?:default\s+)?(async\s+)?function\s*\*?\s*(\w*)\s*(<[^>\n]*>)?\s*'
+                         r'(\([^)]*\))(\s*:\s*[^{;\n]+)?', re.M)
+JS_CLASS = re.compile(r'^export\s+(?:default\s+)?(?:abstract\s+)?class\s+(\w+)([^{\n]*)', re.M)
+JS_DECLARATION = re.compile(r'^export\s+(?:declare\s+)?(const|let|var|interface|type|enum)\s+(\w+)', re.M)
+JS_EXPORT_LIST = re.compile(r'^(?:export|module\.exports\s*=)\s*\{([^}]*)\}', re.M)
+JS_EXPORT_NAME = re.compile(r'^(?:module\.)?exports\.(\w+)\s*=', re.M)
+JS_OPTION = re.compile(r"""\.option\(\s*(['"`])(-[^'"`]+)\1(?:\s*,\s*(['"`])([^'"`]*)\3)?""")
+JS_COMMAND = re.compile(r"""\.command\(\s*(['"`])([^'"`]+)\1""")
+
+
+def summarize_javascript(text: str) -> Summary:
+    functions = [_described(_collapse(m.group(1), 'function ', m.group(2), m.group(3), m.group(4), m.group(5)),
+                            _block_comment_before(text, m.start()), '//')
+                 for m in JS_FUNCTION.finditer(text)]
+    classes = [_described(_collapse('class ', m.group(1), m.group(2)), _block_comment_before(text, m.start()), '//')
+               for m in JS_CLASS.finditer(text)]
+    exports = [f"{m.group(1)} {m.group(2)}" for m in JS_DECLARATION.finditer(text)]
+    for m in JS_EXPORT_LIST.finditer(text):
+        exports.extend(name.split(':')[0].strip() for name in m.group(1).split(',') if name.strip())
+    exports.extend(m.group(1) for m in JS_EXPORT_NAME.finditer(text))
+    return _pruned({
+        'functions': functions,
+        'classes': classes,
+        'exports': exports,
+        'commands': [m.group(2) for m in JS_COMMAND.finditer(text)],
+        'flags': [_described(m.group(2), m.group(4), '//') for m in JS_OPTION.finditer(text)],
+    })
+
+
+GO_PACKAGE = re.compile(r'^package\s+(\w+)', re.M)
+GO_FUNC = re.compile(r'^func\s+(\([^)]*\)\s*)?([A-Z]\w*)\s*(\[[^\]\n]*\])?\s*(\([^)]*\))\s*([^{\n]*)', re.M)
+GO_TYPE = re.compile(r'^type\s+([A-Z]\w*)\s*(\[[^\]\n]*\])?\s+(struct|interface|[^\s{]+)', re.M)
+GO_FLAG = re.compile(r'\bflag\.(?:Bool|Int|Int64|Uint|Uint64|String|Float64|Duration)(?:Var)?\(\s*'
+                     r'(?:&[\w.]+\s*,\s*)?"([^"]+)"\s*,[^,]*,\s*"([^"]*)"')
+
+
+def summarize_go(text: str) -> Summary:
+    package = GO_PACKAGE.search(text)
+    functions = [_described(_collapse('func ', m.group(1), m.group(2), m.group(3), m.group(4), ' ', m.group(5)).rstrip(),
+                            _comment_before(text, m.start(), '//'), '//')
+                 for m in GO_FUNC.finditer(text)]
+    types = [_described(f"type {m.group(1)} {m.group(3)}", _comment_before(text, m.start(), '//'), '//')
+             for m in GO_TYPE.finditer(text)]
+    summary = _pruned({
+        'doc': _first_paragraph(_comment_before(text, package.start(), '//')) if package else '',
+        'functions': functions,
+        'types': types,
+        'flags': [_described('-' + m.group(1), m.group(2), '//') for m in GO_FLAG.finditer(text)],
+    })
+    if summary and package:
+        summary['package'] = package.group(1)
+    return summary
+
+
+RUST_FN = re.compile(r'^[ \t]*pub\s+(?:const\s+)?(async\s+)?(?:unsafe\s+)?fn\s+(\w+)\s*(<[^>\n]*>)?\s*'
+                     r'(\([^)]*\))\s*(->\s*[^{;\n]+)?', re.M)
+RUST_ITEM = re.compile(r'^pub\s+(struct|enum|trait|type|mod)\s+(\w+)', re.M)
+RUST_MODULE_DOC = re.compile(r'^//!(.*)$', re.M)
+RUST_LONG_FLAG = re.compile(r'\.long\(\s*"([^"]+)"')
+
+
+def summarize_rust(text: str) -> Summary:
+    functions = [_described(_collapse(m.group(1), 'fn ', m.group(2), m.group(3), m.group(4), ' ', m.group(5)).rstrip(),
+                            _comment_before(text, m.start(), '///'), '//')
+                 for m in RUST_FN.finditer(text)]
+    items = [_described(f"{m.group(1)} {m.group(2)}", _comment_before(text, m.start(), '///'), '//')
+             for m in RUST_ITEM.finditer(text)]
+    return _pruned({
+        'doc': _first_paragraph('\n'.join(m.group(1) for m in RUST_MODULE_DOC.finditer(text))),
+        'functions': functions,
+        'items': items,
+        'flags': ['--' + m.group(1) for m in RUST_LONG_FLAG.finditer(text)],
+    })
+
+
+Summarizer = Callable[[str], Summary]
+
+MANIFEST_SUMMARIZERS = {
+    'package.json': summarize_package_json,
+    'composer.json': summarize_composer_json,
+    'setup.py': summarize_setup_py,
+    'setup.cfg': summarize_setup_cfg,
+    'requirements.txt': summarize_requirements,
+    'go.mod': summarize_go_mod,
+}  # type: Dict[str, Summarizer]
+if tomllib is not None:
+    MANIFEST_SUMMARIZERS.update({'pyproject.toml': summarize_pyproject, 'cargo.toml': summarize_cargo_toml})
+
+SOURCE_SUMMARIZERS = {
+    '.py': summarize_python,
+    '.js': summarize_javascript, '.jsx': summarize_javascript, '.mjs': summarize_javascript,
+    '.cjs': summarize_javascript, '.ts': summarize_javascript, '.tsx': summarize_javascript,
+    '.go': summarize_go,
+    '.rs': summarize_rust,
+}  # type: Dict[str, Summarizer]
+
+
+def manifest_summarizer(name: str) -> Optional[Summarizer]:
+    base = os.path.basename(name).lower()
+    if base.startswith('requirements') and base.endswith('.txt'):
+        return summarize_requirements
+    return MANIFEST_SUMMARIZERS.get(base)
+
+
+def summarize(name: str, text: str) -> Optional[Summary]:
+    """Summary of one file, or None if it is not a kind DocMint summarizes or does not parse"""
+    summarizer = manifest_summarizer(name) or SOURCE_SUMMARIZERS.get(os.path.splitext(name)[1].lower())
+    if summarizer is None:
+        return None
+    try:
+        summary = summarizer(text)
+    except Exception:
+        return None
+    return summary or None
+
+
+def build_digest(summaries: List[Tuple[str, Summary]]) -> bytes:
+    """One JSON document holding the summaries of manifests and of sources, by file name"""
+    manifests = {}
+    sources = {}
+    for name, summary in summaries:
+        (manifests if manifest_summarizer(name) else sources)[name.replace(os.sep, '/')] = summary
+    digest = {'digest_version': DIGEST_VERSION, 'manifests': manifests, 'sources': sources}
+    return json.dumps({key: value for key, value in digest.items() if value},
+                      ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
@@ -0,0 +1,194 @@
+"""
+Streaming multipart/form-data encoder for DocMint CLI
+
+Builds the body of ``/api/generate-from-files/`` lazily: form fields are
+encoded up front, but file contents are read from disk chunk by chunk while
+the request is being sent. Memory use stays at a few chunk buffers no matter
+how large the project is, and the total length is known in advance so the
+request still carries a ``Content-Length`` header.
+"""
+
+import binascii
+import hashlib
+import os
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .reader import CHUNK_SIZE, iter_sampled_chunks, iter_text_chunks
+
+# (bytes_sent, total_bytes, elapsed_seconds)
+ProgressCallback = Callable[[int, int, float], None]
+
+
+class UploadError(Exception):
+    """Raised when a file changes between being inspected and being uploaded"""
+
+
+def _quote_param(value: str) -> str:
+    """Escape a header parameter value as the HTML standard (and urllib3 2) does for form uploads"""
+    return value.replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+
+def iter_file_range(path: str, offset: int, length: int) -> Iterator[bytes]:
+    """Yield ``length`` raw bytes of a file from ``offset``, a chunk at a time"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+class FilePart:
+    """A file to stream as one part of the form
+
+    ``sample`` is ``(budget, windows)`` for a file that is sent as a sample
+    of its head, middle and tail rather than in full. ``content`` is sent
+    instead of the file when given (e.g. text already packed in memory).
+    With ``offset``, ``length`` bytes of ``path`` from that position are sent
+    as they are (packed text spooled to a temporary file).
+    """
+
+    def __init__(self, field: str, filename: str, path: str, length: int,
+                 content_type: str = 'text/plain', encoding: str = 'utf-8',
+                 sample: Optional[Tuple[int, int]] = None, content: Optional[bytes] = None,
+                 offset: Optional[int] = None):
+        self.field = field
+        self.filename = filename
+        self.path = path
+        self.length = length
+        self.content_type = content_type
+        self.encoding = encoding
+        self.sample = sample
+        self.content = content
+        self.offset = offset
+        self._digest = None
+
+    def content_digest(self) -> str:
+        """SHA-256 of the body this part uploads (read from disk once if not in memory)"""
+        if self._digest is None:
+            hasher = hashlib.sha256()
+            if self.content is not None:
+                hasher.update(self.content)
+            else:
+                for chunk in self.iter_chunks():
+                    hasher.update(chunk)
+            self._digest = hasher.hexdigest()
+        return self._digest
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Yield the part body, checking it still has the length announced"""
+        produced = 0
+        if self.content is not None:
+            chunks = (self.content[i:i + CHUNK_SIZE] for i in range(0, len(self.content), CHUNK_SIZE))
+        elif self.offset is not None:
+            chunks = iter_file_range(self.path, self.offset, self.length)
+        elif self.sample is not None:
+            chunks = iter_sampled_chunks(self.path, self.sample[0], self.sample[1], self.encoding)
+        else:
+            chunks = iter_text_chunks(self.path, encoding=self.encoding)
+        for chunk in chunks:
+            produced += len(chunk)
+            if produced > self.length:
+                break
+            yield chunk
+        if produced != self.length:
+            raise UploadError(f"{self.filename} changed while it was being uploaded")
+
+
+class MultipartEncoder:
+    """File-like multipart body that reads project files while uploading
+
+    Pass it as ``data=`` to ``requests``; ``len()`` gives the exact body size
+    and ``read()`` hands out the next piece of the body.
+    """
+
+    def __init__(self, fields: List[Tuple[str, str]], files: List[FilePart],
+                 boundary: Optional[str] = None,
+                 progress: Optional[ProgressCallback] = None):
+        self.fields = list(fields)
+        self.files = list(files)
+        self.boundary = boundary or binascii.hexlify(os.urandom(16)).decode('ascii')
+        self.progress = progress
+        self._length = self._compute_length()
+        self.rewind()
+
+    def rewind(self):
+        """Start the body over so the request can be sent again"""
+        self.bytes_sent = 0
+        self.started = None
+        self._chunks = self._iter_body()
+        self._buffer = b''
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def _field_header(self, name: str) -> bytes:
+        return (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{_quote_param(name)}"\r\n\r\n'
+        ).encode('utf-8')
+
+    def _file_header(self, part: FilePart) -> bytes:
+        return (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{_quote_param(part.field)}"; '
+            f'filename="{_quote_param(part.filename)}"\r\n'
+            f'Content-Type: {part.content_type}\r\n\r\n'
+        ).encode('utf-8')
+
+    def _closing(self) -> bytes:
+        return f'--{self.boundary}--\r\n'.encode('utf-8')
+
+    def _compute_length(self) -> int:
+        total = len(self._closing())
+        for name, value in self.fields:
+            total += len(self._field_header(name)) + len(value.encode('utf-8')) + 2
+        for part in self.files:
+            total += len(self._file_header(part)) + part.length + 2
+        return total
+
+    def _iter_body(self) -> Iterator[bytes]:
+        for name, value in self.fields:
+            yield self._field_header(name) + value.encode('utf-8') + b'\r\n'
+        for part in self.files:
+            yield self._file_header(part)
+            for chunk in part.iter_chunks():
+                yield chunk
+            yield b'\r\n'
+        yield self._closing()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        """Return up to ``size`` bytes of the body (everything left if negative)"""
+        if self.started is None:
+            self.started = time.monotonic()
+
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        if data:
+            self.bytes_sent += len(data)
+            if self.progress is not None:
+                self.progress(self.bytes_sent, self._length, time.monotonic() - self.started)
+        return data
@@ -0,0 +1,385 @@
+"""
+Payload packing for DocMint CLI
+
+Runs between file selection and upload and keeps the request inside a total
+byte budget (``payload_budget``):
+
+1. Each file is compacted with the rules of its language family: license
+   headers, comments (``strip_comments``) and trailing whitespace are removed
+   and runs of blank lines collapsed. A shebang line, strings, Python
+   docstrings and triple-quoted text blocks (Java, Kotlin, Swift) are kept.
+2. The budget is split across files by priority (the ranking score from
+   ``ranking.py``). Each file gets a share proportional to its weight, files
+   that need less than their share hand the rest back, and files still over
+   their share are cut to their head and tail.
+3. Files whose share would fall below ``MIN_SHARE`` are dropped instead,
+   lowest priority first.
+
+Splitting the budget needs every file's compacted text first. A
+:class:`TextSpool` holds those texts in memory up to ``pack_memory_limit``
+bytes and in a temporary file beyond, from which they are streamed to the
+upload, so packing does not hold whole projects in memory.
+"""
+
+import json
+import os
+import re
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .reader import OMISSION_MARKER
+
+# Files are dropped rather than cut to fewer bytes than this
+MIN_SHARE = 1024
+
+# Words that mark a leading comment as a license header
+LICENSE_MARKERS = ('license', 'licence', 'copyright', 'spdx-', 'permission is hereby granted')
+
+# Stands in for a removed comment until blank lines are collapsed
+_REMOVED = '\x00'
+
+# Where a line comment marker counts as one
+ANYWHERE = 'anywhere'
+SPACED = 'spaced'  # at the start of a line or after whitespace ("a#b" is not a comment)
+LINE_START = 'start'  # only before anything else on the line
+
+
+class Syntax:
+    """Comment and string delimiters of a language family
+
+    ``strings`` end at the end of the line if they are not closed;
+    ``multiline_strings`` may span lines.
+    """
+
+    def __init__(self, line: Iterable[str] = (), blocks: Iterable[Tuple[str, str]] = (),
+                 strings: Iterable[str] = ('"', "'"), multiline_strings: Iterable[str] = (),
+                 line_rule: str = ANYWHERE):
+        self.line = tuple(line)
+        self.blocks = dict(blocks)
+        self.strings = tuple(strings)
+        self.multiline_strings = tuple(multiline_strings)
+        self.line_rule = line_rule
+        tokens = set(self.line) | set(self.blocks) | set(self.strings) | set(self.multiline_strings)
+        self.pattern = re.compile('|'.join(re.escape(token) for token in sorted(tokens, key=len, reverse=True)))
+
+
+HASH = Syntax(line=('#',), line_rule=SPACED)
+PYTHON = Syntax(line=('#',), multiline_strings=('"""', "'''"), line_rule=SPACED)
+POWERSHELL = Syntax(line=('#',), blocks=(('<#', '#>'),), line_rule=SPACED)
+INI = Syntax(line=(';', '#'), strings=(), line_rule=LINE_START)
+C_LIKE = Syntax(line=('//',), blocks=(('/*', '*/'),), multiline_strings=('`',))
+TEXT_BLOCKS = Syntax(line=('//',), blocks=(('/*', '*/'),), multiline_strings=('"""',))
+TRIPLE_QUOTED = Syntax(line=('//',), blocks=(('/*', '*/'),), multiline_strings=('"""', "'''"))
+RUST = Syntax(line=('//',), blocks=(('/*', '*/'),), strings=('"',))  # ' also starts lifetimes
+PHP = Syntax(line=('//', '#'), blocks=(('/*', '*/'),))
+CSS = Syntax(blocks=(('/*', '*/'),))
+JSON = Syntax(line=('//',), blocks=(('/*', '*/'),), strings=('"',))  # tsconfig-style comments
+MARKUP = Syntax(blocks=(('<!--', '-->'),), strings=())
+SQL = Syntax(line=('--',), blocks=(('/*', '*/'),), strings=("'", '"'))
+LUA = Syntax(line=('--',), blocks=(('--[[', ']]'),))
+ELM = Syntax(line=('--',), blocks=(('{-', '-}'),), strings=('"',))
+LISP = Syntax(line=(';',), strings=('"',))
+
+SYNTAX_BY_EXTENSION = {
+    **dict.fromkeys(('.py', '.pyx'), PYTHON),
+    **dict.fromkeys(('.rb', '.sh', '.bash', '.zsh', '.pl', '.pm', '.t', '.r', '.yaml', '.yml',
+                     '.toml', '.cfg', '.conf', '.ex', '.exs', '.dockerfile', '.makefile'), HASH),
+    **dict.fromkeys(('.ps1', '.psm1'), POWERSHELL),
+    '.ini': INI,
+    **dict.fromkeys(('.js', '.ts', '.jsx', '.tsx', '.cpp', '.c', '.cs', '.go', '.h', '.hpp', '.cxx',
+                     '.m'), C_LIKE),
+    **dict.fromkeys(('.java', '.kt', '.kotlin', '.scala', '.sbt', '.swift'), TEXT_BLOCKS),
+    **dict.fromkeys(('.dart', '.groovy', '.gradle'), TRIPLE_QUOTED),
+    '.rs': RUST,
+    '.php': PHP,
+    **dict.fromkeys(('.css', '.scss', '.sass', '.less'), CSS),
+    '.json': JSON,
+    **dict.fromkeys(('.html', '.xml', '.vue', '.svelte', '.md', '.maven'), MARKUP),
+    '.sql': SQL,
+    '.lua': LUA,
+    '.elm': ELM,
+    **dict.fromkeys(('.clj', '.cljs'), LISP),
+}
+SYNTAX_BY_NAME = {'dockerfile': HASH, 'makefile': HASH, 'gemfile': HASH, 'rakefile': HASH}
+
+_string_patterns = {}
+
+
+def syntax_for(name: str) -> Optional[Syntax]:
+    """Comment syntax for a file name, or None for plain text"""
+    lower = os.path.basename(name).lower()
+    if lower in SYNTAX_BY_NAME:
+        return SYNTAX_BY_NAME[lower]
+    return SYNTAX_BY_EXTENSION.get(os.path.splitext(lower)[1])
+
+
+def _string_end(text: str, start: int, delimiter: str, multiline: bool) -> int:
+    """Index just past the string whose opening delimiter ends at ``start``"""
+    pattern = _string_patterns.get((delimiter, multiline))
+    if pattern is None:
+        quoted = re.escape(delimiter)
+        if multiline:
+            pattern = re.compile(r'(?:[^\\]|\\.)*?' + quoted, re.DOTALL)
+        else:
+            pattern = re.compile(r'(?:\\(?:.|\n)|[^\\\n])*?(?:' + quoted + r'|(?=\n)|\Z)')
+        _string_patterns[(delimiter, multiline)] = pattern
+    match = pattern.match(text, start)
+    return match.end() if match else len(text)
+
+
+def _is_line_comment(text: str, start: int, rule: str) -> bool:
+    if rule == ANYWHERE or start == 0:
+        return True
+    if rule == SPACED:
+        return text[start - 1] in ' \t\n'
+    line_start = text.rfind('\n', 0, start) + 1
+    return not text[line_start:start].strip()
+
+
+def strip_comments(text: str, syntax: Syntax) -> str:
+    """Remove comments, leaving a marker where each was for :func:`collapse_blank_lines`"""
+    if not syntax.pattern.pattern:
+        return text
+    out = []
+    pos = 0
+    if text.startswith('#!') and '#' in syntax.line:
+        # A shebang says how the file is run
+        pos = text.find('\n') + 1 or len(text)
+        out.append(text[:pos])
+    while True:
+        match = syntax.pattern.search(text, pos)
+        if match is None:
+            break
+        token, start, end = match.group(), match.start(), match.end()
+        if token in syntax.multiline_strings or token in syntax.strings:
+            end = _string_end(text, end, token, token in syntax.multiline_strings)
+            out.append(text[pos:end])
+        elif token in syntax.blocks:
+            close = text.find(syntax.blocks[token], end)
+            if close < 0:
+                break  # unterminated (e.g. cut off by sampling): keep the rest
+            out.append(text[pos:start] + _REMOVED)
+            end = close + len(syntax.blocks[token])
+        elif _is_line_comment(text, start, syntax.line_rule):
+            newline = text.find('\n', end)
+            end = newline if newline >= 0 else len(text)
+            out.append(text[pos:start] + _REMOVED)
+        else:
+            out.append(text[pos:end])
+        pos = end
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def strip_license_header(text: str, syntax: Syntax) -> str:
+    """Drop a leading comment (after any shebang line) that holds a license notice"""
+    start = 0
+    if text.startswith('#!'):
+        start = text.find('\n') + 1 or len(text)
+    body = text[start:]
+    stripped = body.lstrip()
+    offset = start + len(body) - len(stripped)
+
+    end = None
+    for opener, closer in syntax.blocks.items():
+        if stripped.startswith(opener):
+            close = stripped.find(closer, len(opener))
+            if close >= 0:
+                end = offset + close + len(closer)
+            break
+    else:
+        if syntax.line and stripped.startswith(syntax.line):
+            end = offset
+            for line in text[offset:].splitlines(True):
+                if not line.strip().startswith(syntax.line):
+                    break
+                end += len(line)
+
+    if end is None or not any(marker in text[offset:end].lower() for marker in LICENSE_MARKERS):
+        return text
+    return text[:offset] + text[end:]
+
+
+def collapse_blank_lines(text: str) -> str:
+    """Drop trailing whitespace and comment-only lines and squeeze blank runs to one line"""
+    lines = []
+    blank = False
+    for line in text.split('\n'):
+        removed = _REMOVED in line
+        if removed:
+            line = line.replace(_REMOVED, '')
+        line = line.rstrip()
+        if not line:
+            blank = blank or not removed
+            continue
+        if blank and lines:
+            lines.append('')
+        blank = False
+        lines.append(line)
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def compact_text(name: str, text: str, strip_code_comments: bool = True) -> str:
+    """Shrink a file's text without changing what it says"""
+    syntax = syntax_for(name)
+    if syntax is not None:
+        text = strip_license_header(text, syntax)
+        if strip_code_comments:
+            text = strip_comments(text, syntax)
+    text = collapse_blank_lines(text)
+    if syntax is JSON:
+        try:
+            return json.dumps(json.loads(text), ensure_ascii=False, separators=(',', ':')) + '\n'
+        except ValueError:
+            pass
+    return text
+
+
+def fit_bytes(data: bytes, limit: int) -> bytes:
+    """Cut ``data`` to at most ``limit`` bytes, keeping its head and tail at line boundaries"""
+    if len(data) <= limit:
+        return data
+    reserve = len(OMISSION_MARKER.format(omitted=len(data)).encode('utf-8'))
+    if limit <= reserve:
+        return data[:limit].decode('utf-8', 'ignore').encode('utf-8')
+
+    head_size = (limit - reserve) * 2 // 3
+    tail_size = limit - reserve - head_size
+    head = data[:head_size]
+    newline = head.rfind(b'\n')
+    if newline >= 0:
+        head = head[:newline + 1]
+    tail = data[len(data) - tail_size:] if tail_size else b''
+    newline = tail.find(b'\n')
+    if newline >= 0:
+        tail = tail[newline + 1:]
+    # A cut without a line boundary may split a character
+    head = head.decode('utf-8', 'ignore').encode('utf-8')
+    tail = tail.decode('utf-8', 'ignore').encode('utf-8')
+    marker = OMISSION_MARKER.format(omitted=len(data) - len(head) - len(tail)).encode('utf-8')
+    return head + marker + tail
+
+
+def allocate(sizes: List[int], weights: List[float], budget: int) -> List[int]:
+    """Split ``budget`` bytes in proportion to ``weights``, giving unused shares back
+
+    A file never gets more than its size; what small files do not need is
+    spread over the rest.
+    """
+    shares = [0] * len(sizes)
+    pending = set(range(len(sizes)))
+    remaining = budget
+    while pending:
+        total = sum(weights[i] for i in pending)
+        satisfied = [i for i in pending if sizes[i] <= remaining * weights[i] / total]
+        if not satisfied:
+            for i in pending:
+                shares[i] = int(remaining * weights[i] / total)
+            break
+        for i in satisfied:
+            shares[i] = sizes[i]
+            remaining -= sizes[i]
+            pending.discard(i)
+    return shares
+
+
+def fit_shares(sizes: List[int], priorities: List[float], budget: int = 0) -> Dict[int, int]:
+    """Split ``budget`` bytes (0 for no limit) across files of compacted ``sizes``
+
+    ``priorities`` are the files' ranking scores; each file weighs its score,
+    at least 1. Returns the share of each kept file by index, in order;
+    files left out are dropped.
+    """
+    kept = list(range(len(sizes)))
+    shares = {i: sizes[i] for i in kept}
+    if budget > 0 and sum(sizes) > budget:
+        weights = [max(1.0, priority) for priority in priorities]
+        while True:
+            fitted = allocate([sizes[i] for i in kept], [weights[i] for i in kept], budget)
+            shares = dict(zip(kept, fitted))
+            starved = [i for i in kept if shares[i] < sizes[i] and shares[i] < MIN_SHARE]
+            if not starved or len(kept) == 1:
+                break
+            # Drop the least important starved file (the later one on a tie)
+            kept.remove(min(reversed(starved), key=lambda i: weights[i]))
+    return shares
+
+
+class TextSpool:
+    """Compacted texts by file name, in memory up to ``max_memory`` bytes and in a temporary file beyond
+
+    Texts are added from one thread. A spilled text is read back with
+    :meth:`data` or streamed from ``path`` at its :meth:`location`; the file
+    is removed on :meth:`close`.
+    """
+
+    def __init__(self, max_memory: int):
+        self.max_memory = max(0, int(max_memory))
+        self.memory = 0
+        self.spilled = 0
+        self.path = None  # type: Optional[str]
+        self._file = None
+        # name -> (data, or None when spilled, offset, length, original size)
+        self._entries = {}  # type: Dict[str, Tuple[Optional[bytes], int, int, int]]
+
+    def put(self, name: str, data: bytes, original: int):
+        if self.memory + len(data) <= self.max_memory:
+            self.memory += len(data)
+            self._entries[name] = (data, 0, len(data), original)
+            return
+        if self._file is None:
+            fd, self.path = tempfile.mkstemp(prefix='docmint-pack-', suffix='.tmp')
+            self._file = os.fdopen(fd, 'w+b')
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self.spilled += len(data)
+        self._entries[name] = (None, offset, len(data), original)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def length(self, name: str) -> int:
+        return self._entries[name][2]
+
+    def original(self, name: str) -> int:
+        return self._entries[name][3]
+
+    def data(self, name: str) -> bytes:
+        data, offset, length, _ = self._entries[name]
+        if data is None:
+            self._file.flush()
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return data
+
+    def location(self, name: str) -> Optional[Tuple[int, int]]:
+        """``(offset, length)`` of a spilled text in the file at ``path``, or None if it is in memory"""
+        data, offset, length, _ = self._entries[name]
+        if data is not None:
+            return None
+        self._file.flush()
+        return offset, length
+
+    def close(self):
+        self._entries = {}
+        self.memory = 0
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def packing_key(config: Dict) -> str:
+    """Describe the packing settings, for cache keys"""
+    compact = config.get('pack_payload', True)
+    strip = compact and config.get('strip_comments', True)
+    return f"{int(compact)}/{int(strip)}/{config.get('payload_budget', 0)}"
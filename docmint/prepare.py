@@ -0,0 +1,176 @@
+"""
+Parallel file preparation for DocMint CLI
+
+Turns the selected file paths into :class:`PreparedFile` records (sniffed,
+hashed and, when packing is on, decoded and compacted) on a worker pool:
+
+* a thread pool does the I/O: stat, scan cache lookups, reading and hashing
+* summaries for the metadata digest (see :mod:`docmint.metadata`) are
+  extracted on the I/O threads, from the text as it was read
+* compacting large texts is CPU bound, so it goes to a process pool that is
+  only started once a text big enough to be worth shipping to it turns up;
+  smaller texts are compacted on the I/O threads
+
+At most ``max_in_flight`` files are queued at each stage, records come out in
+the order the paths went in whatever order the workers finish in, and an
+error preparing one file is stored on its record instead of stopping the run.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import BrokenExecutor, Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .cache import ScanCache
+from .reader import FileInfo
+
+DEFAULT_THREADS = 8
+DEFAULT_IN_FLIGHT = 32
+
+# Texts shorter than this are compacted on the I/O threads; shipping them to
+# another process would cost more than it saves
+PROCESS_MIN_CHARS = 64 * 1024
+
+# (file name, text) -> text
+Transform = Callable[[str, str], str]
+# (file name, text) -> summary, or None
+Extract = Callable[[str, str], Optional[Dict[str, Any]]]
+
+
+class PreparedFile:
+    """A file ready to be uploaded, or the error that stopped it"""
+
+    __slots__ = ('path', 'info', 'text', 'original', 'error', 'summary')
+
+    def __init__(self, path: str, info: Optional[FileInfo] = None, text: Optional[str] = None,
+                 original: int = 0, error: Optional[BaseException] = None,
+                 summary: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.info = info
+        self.text = text
+        self.original = original
+        self.error = error
+        self.summary = summary
+
+
+def _done(value: Any) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def ordered_map(submit: Callable[[Any], Future], items: Iterable[Any],
+                max_in_flight: int) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """Yield ``(item, result, error)`` for each item in input order
+
+    ``submit(item)`` starts the work and returns a future; no more than
+    ``max_in_flight`` futures are outstanding at once.
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= max(1, max_in_flight):
+            yield _outcome(*pending.popleft())
+        try:
+            future = submit(item)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        pending.append((item, future))
+    while pending:
+        yield _outcome(*pending.popleft())
+
+
+def _outcome(item: Any, future: Future) -> Tuple[Any, Any, Optional[BaseException]]:
+    try:
+        return item, future.result(), None
+    except Exception as e:
+        return item, None, e
+
+
+class FilePreparer:
+    """Prepares files on an I/O thread pool and, for heavy transforms, a process pool
+
+    ``load_text`` decodes text files (needed to pack them); ``transform`` is
+    applied to each decoded text and must be picklable to run in another
+    process. ``processes`` of 0 or 1 keeps every transform on the threads.
+    ``extract`` summarizes each decoded text before it is transformed.
+    """
+
+    def __init__(self, scan_cache: ScanCache, load_text: bool = False, transform: Optional[Transform] = None,
+                 threads: int = DEFAULT_THREADS, processes: int = 0, max_in_flight: int = DEFAULT_IN_FLIGHT,
+                 extract: Optional[Extract] = None):
+        self.scan_cache = scan_cache
+        self.load_text = load_text
+        self.transform = transform
+        self.extract = extract
+        self.threads = max(1, int(threads))
+        self.processes = max(0, int(processes))
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._process_pool = None  # type: Optional[Executor]
+
+    def read(self, path: str) -> PreparedFile:
+        """I/O stage: sniff and hash a file, and decode it if its text is wanted"""
+        info = self.scan_cache.inspect(path)
+        record = PreparedFile(path, info)
+        if self.load_text and info.is_text and not info.blank:
+            record.text = self.scan_cache.read(path)[1]
+            record.original = len(record.text.encode('utf-8'))
+            if self.extract is not None:
+                record.summary = self.extract(path, record.text)
+            if self.transform is not None and not self.offload(record.text):
+                record.text = self.transform(path, record.text)
+        return record
+
+    def offload(self, text: str) -> bool:
+        """Whether a text is worth transforming in another process"""
+        return self.processes > 1 and len(text) >= PROCESS_MIN_CHARS
+
+    def process_pool(self) -> Executor:
+        if self._process_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # Spawned rather than forked: the parent runs threads
+            self._process_pool = ProcessPoolExecutor(self.processes, multiprocessing.get_context('spawn'))
+        return self._process_pool
+
+    def submit_transform(self, record: PreparedFile) -> Future:
+        """CPU stage: transform a large text in the process pool"""
+        if record.error is not None or record.text is None or self.transform is None \
+                or not self.offload(record.text):
+            return _done(record.text)
+        return self.process_pool().submit(self.transform, record.path, record.text)
+
+    def prepare(self, paths: Iterable[Any]) -> Iterator[PreparedFile]:
+        """Yield a record for each path, in order"""
+        threads = ThreadPoolExecutor(self.threads, thread_name_prefix='docmint-prepare')
+
+        def submit_read(path):
+            return threads.submit(self.read, os.fspath(path))
+
+        def read_records():
+            for path, record, error in ordered_map(submit_read, paths, self.max_in_flight):
+                yield record if error is None else PreparedFile(os.fspath(path), error=error)
+
+        try:
+            for record, text, error in ordered_map(self.submit_transform, read_records(), self.max_in_flight):
+                if isinstance(error, BrokenExecutor):
+                    # A worker died; finish the remaining texts here
+                    self.processes = 0
+                    try:
+                        text, error = self.transform(record.path, record.text), None
+                    except Exception as e:
+                        error = e
+                if error is not None:
+                    record.error = error
+                else:
+                    record.text = text
+                yield record
+        finally:
+            threads.shutdown(wait=True)
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=True)
+                self._process_pool = None
+
+
+def default_processes() -> int:
+    return os.cpu_count() or 1
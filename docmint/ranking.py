@@ -0,0 +1,139 @@
+"""
+File ranking for DocMint CLI
+
+Scores project files by how much they tell the backend about a project and
+keeps only the best ``max_files`` of them while the walk is still running.
+Scores only ever go down with depth, so once the kept set is full and nothing
+deeper in the tree could outrank it, the walk can stop early.
+"""
+
+import heapq
+import os
+from typing import List, Tuple
+
+# Files that describe the project as a whole
+MANIFEST_NAMES = {
+    'package.json', 'pyproject.toml', 'setup.py', 'setup.cfg', 'requirements.txt',
+    'pipfile', 'go.mod', 'cargo.toml', 'pom.xml', 'build.gradle', 'build.gradle.kts',
+    'settings.gradle', 'composer.json', 'gemfile', 'build.sbt', 'pubspec.yaml',
+    'mix.exs', 'deno.json', 'tsconfig.json', 'environment.yml', 'dockerfile',
+    'docker-compose.yml', 'docker-compose.yaml', 'makefile', 'cmakelists.txt',
+}
+MANIFEST_SUFFIXES = ('.csproj', '.fsproj', '.sln', '.gemspec', '.cabal', '.nimble')
+
+# File stems that usually hold a program's entry point
+ENTRY_POINT_STEMS = {
+    'main', 'app', 'index', 'cli', 'server', '__main__', '__init__', 'manage',
+    'wsgi', 'asgi', 'run', 'program', 'lib', 'mod',
+}
+
+SOURCE_EXTENSIONS = {
+    '.py', '.pyx', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.cs', '.php',
+    '.rb', '.go', '.rs', '.swift', '.kt', '.scala', '.vue', '.svelte', '.dart',
+    '.lua', '.groovy', '.kotlin', '.h', '.hpp', '.cxx', '.m', '.clj', '.cljs', '.elm',
+    '.ex', '.exs', '.pl', '.pm', '.r', '.sh', '.bash', '.zsh', '.ps1', '.psm1',
+}
+CONFIG_EXTENSIONS = {'.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf', '.xml'}
+DOC_EXTENSIONS = {'.md', '.txt'}
+
+# Category weights; every other adjustment is a penalty, so the manifest weight
+# is the best score any file can reach
+MANIFEST_SCORE = 100.0
+README_SCORE = 80.0
+ENTRY_POINT_SCORE = 70.0
+SOURCE_SCORE = 50.0
+CONFIG_SCORE = 40.0
+DOC_SCORE = 30.0
+OTHER_SCORE = 20.0
+
+DEPTH_PENALTY = 8.0
+SIZE_PENALTY_STEP = 64 * 1024
+MAX_SIZE_PENALTY = 10.0
+SMALL_CONFIG_SIZE = 4 * 1024
+
+
+def category_score(name: str) -> float:
+    """Return the base score for a file name, before depth and size penalties"""
+    lower = name.lower()
+    if lower in MANIFEST_NAMES or lower.endswith(MANIFEST_SUFFIXES):
+        return MANIFEST_SCORE
+    stem, ext = os.path.splitext(lower)
+    if stem == 'readme':
+        return README_SCORE
+    if ext in SOURCE_EXTENSIONS:
+        return ENTRY_POINT_SCORE if stem in ENTRY_POINT_STEMS else SOURCE_SCORE
+    if ext in CONFIG_EXTENSIONS:
+        return CONFIG_SCORE
+    if ext in DOC_EXTENSIONS:
+        return DOC_SCORE
+    return OTHER_SCORE
+
+
+def score_file(name: str, size: int, depth: int) -> float:
+    """Score a file; higher is more informative"""
+    base = category_score(name)
+    score = base - DEPTH_PENALTY * depth
+    if base in (CONFIG_SCORE, DOC_SCORE) and size <= SMALL_CONFIG_SIZE:
+        # Small configs and docs are cheap to send and often say a lot
+        return score
+    return score - min(MAX_SIZE_PENALTY, size / SIZE_PENALTY_STEP)
+
+
+def best_possible_score(depth: int) -> float:
+    """Upper bound on the score of any file at ``depth`` or deeper"""
+    return MANIFEST_SCORE - DEPTH_PENALTY * depth
+
+
+class RankedSelector:
+    """Keep the ``limit`` highest-scoring files offered so far
+
+    Ties go to the file offered first, so a deterministic walk gives a
+    deterministic selection.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._heap = []  # (score, -sequence, path, size); the root is the weakest kept file
+        self._sequence = 0
+
+    def offer(self, path: str, size: int, depth: int) -> bool:
+        """Consider a file, returning True if it is currently kept"""
+        if self.limit <= 0:
+            return False
+        if len(self._heap) >= self.limit and best_possible_score(depth) <= self._heap[0][0]:
+            return False  # could not beat the weakest kept file
+        score = score_file(os.path.basename(path), size, depth)
+        item = (score, -self._sequence, path, size)
+        self._sequence += 1
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, item)
+            return True
+        if item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+            return True
+        return False
+
+    def is_full(self) -> bool:
+        return len(self._heap) >= self.limit
+
+    def can_keep(self, score: float) -> bool:
+        """Check whether a file with ``score`` would currently be kept"""
+        if self.limit <= 0:
+            return False
+        return not self.is_full() or score > self._heap[0][0]
+
+    def can_improve(self, depth: int) -> bool:
+        """Check whether a file at ``depth`` or deeper could still be kept"""
+        if self.limit <= 0:
+            return False
+        if not self.is_full():
+            return True
+        return best_possible_score(depth) > self._heap[0][0]
+
+    def selected(self) -> List[Tuple[str, int]]:
+        """Return the kept ``(path, size)`` pairs, best first"""
+        return [(path, size) for _, _, path, size in sorted(self._heap, reverse=True)]
+
+    def ranked(self) -> List[Tuple[str, int, float]]:
+        """Return the kept files as ``(path, size, score)``, best first"""
+        return [(path, size, score) for score, _, path, size in sorted(self._heap, reverse=True)]
@@ -0,0 +1,257 @@
+"""
+File reading helpers for DocMint CLI
+
+Project files are decoded with undecodable bytes dropped and with universal
+newline translation, exactly as ``open(..., errors='ignore')`` does. The
+encoding is UTF-8 unless sniffing the start of the file (see ``sniff.py``)
+found a byte order mark, UTF-16 or legacy 8-bit text. The helpers here work
+incrementally so a file never has to be held in memory as a whole.
+
+Files larger than the sampling budget are not read in full: the head, the
+tail and a few evenly spaced windows in between are read with seeks and
+joined with markers saying how much was left out, so a large SQL dump or log
+costs a fixed amount of I/O and upload.
+"""
+
+import codecs
+import hashlib
+import os
+from typing import Iterator, List, Optional, Tuple
+
+from .sniff import KIND_TEXT, classify
+
+# Bytes read from disk per step when streaming a file
+CHUNK_SIZE = 64 * 1024
+
+# Middle windows taken from a sampled file besides its head and tail
+SAMPLE_WINDOWS = 3
+
+OMISSION_MARKER = "\n[... {omitted:,} bytes omitted by DocMint ...]\n"
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the content hash used throughout DocMint"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def decode_text(data: bytes, encoding: str = 'utf-8') -> str:
+    """Decode file bytes the way DocMint has always read project files"""
+    # Same result as open(..., encoding=encoding, errors='ignore').read(),
+    # including universal newline translation
+    return data.decode(encoding, errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+
+
+class FileInfo:
+    """What inspecting a file found out about it
+
+    ``kind`` is one of the ``sniff.KIND_*`` values; only text files have a
+    meaningful ``length`` (bytes of normalized UTF-8 text) and ``blank``.
+    ``text`` holds the decoded content when it was kept, else None.
+    """
+
+    __slots__ = ('digest', 'length', 'blank', 'kind', 'encoding', 'text', 'sampled')
+
+    def __init__(self, digest: str, length: int, blank: bool, kind: str = KIND_TEXT,
+                 encoding: Optional[str] = 'utf-8', text: Optional[str] = None,
+                 sampled: bool = False):
+        self.digest = digest
+        self.length = length
+        self.blank = blank
+        self.kind = kind
+        self.encoding = encoding
+        self.text = text
+        self.sampled = sampled
+
+    @property
+    def is_text(self) -> bool:
+        return self.kind == KIND_TEXT
+
+
+class TextNormalizer:
+    """Incremental version of ``decode_text`` for data arriving in chunks"""
+
+    def __init__(self, encoding: str = 'utf-8'):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='ignore')
+        self._pending_cr = False
+
+    def _translate(self, text: str) -> str:
+        if self._pending_cr:
+            text = '\r' + text
+            self._pending_cr = False
+        if text.endswith('\r'):
+            # A '\r\n' pair may be split across chunks
+            self._pending_cr = True
+            text = text[:-1]
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def feed(self, data: bytes) -> str:
+        """Decode the next chunk of bytes"""
+        return self._translate(self._decoder.decode(data))
+
+    def finish(self) -> str:
+        """Flush whatever is left once the input is exhausted"""
+        text = self._decoder.decode(b'', final=True)
+        if self._pending_cr:
+            self._pending_cr = False
+            text = '\r' + text
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def iter_text_chunks(path: str, chunk_size: int = CHUNK_SIZE,
+                     encoding: str = 'utf-8') -> Iterator[bytes]:
+    """Yield a file's normalized text re-encoded as UTF-8, one chunk at a time"""
+    normalizer = TextNormalizer(encoding)
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            text = normalizer.feed(data)
+            if text:
+                yield text.encode('utf-8')
+    tail = normalizer.finish()
+    if tail:
+        yield tail.encode('utf-8')
+
+
+def sample_ranges(size: int, budget: int, windows: int = SAMPLE_WINDOWS) -> List[Tuple[int, int]]:
+    """Byte ranges ``(offset, length)`` to read from a file of ``size`` bytes
+
+    Half the budget goes to the head, a quarter to the tail and the rest is
+    split between ``windows`` evenly spaced windows in the middle.
+    """
+    if size <= budget:
+        return [(0, size)]
+    head = budget // 2
+    tail = budget // 4
+    middle = budget - head - tail
+    ranges = [(0, head)]
+    if windows > 0 and middle >= windows:
+        each = middle // windows
+        gap = (size - head - tail - each * windows) / (windows + 1)
+        for i in range(windows):
+            ranges.append((int(head + gap * (i + 1) + each * i), each))
+    else:
+        tail += middle
+    ranges.append((size - tail, tail))
+    return ranges
+
+
+def _window_encoding(encoding: str, head: bytes) -> Tuple[str, int]:
+    """Codec able to decode a window from the middle of a file, and its code unit size"""
+    if encoding == 'utf-16':
+        return ('utf-16-be' if head.startswith(codecs.BOM_UTF16_BE) else 'utf-16-le'), 2
+    if encoding == 'utf-32':
+        return ('utf-32-be' if head.startswith(codecs.BOM_UTF32_BE) else 'utf-32-le'), 4
+    if encoding.startswith('utf-16'):
+        return encoding, 2
+    if encoding.startswith('utf-32'):
+        return encoding, 4
+    return encoding, 1
+
+
+def sample_text(f, size: int, budget: int, windows: int = SAMPLE_WINDOWS,
+                encoding: str = 'utf-8') -> str:
+    """Read the sample of an open binary file, with omission markers between windows
+
+    Windows other than the head start after their first line break and
+    windows other than the tail end at their last one, so no line is cut.
+    """
+    f.seek(0)
+    codec, unit = _window_encoding(encoding, f.read(4))
+    ranges = sample_ranges(size, budget, windows)
+
+    parts = []
+    previous_end = 0
+    for index, (offset, length) in enumerate(ranges):
+        start = offset - offset % unit
+        end = offset + length
+        end -= (end - start) % unit
+        f.seek(start)
+        text = decode_text(f.read(end - start), codec)
+        if index == 0:
+            text = text.lstrip('\ufeff')
+        else:
+            newline = text.find('\n')
+            if newline >= 0:
+                text = text[newline + 1:]
+        if index < len(ranges) - 1:
+            newline = text.rfind('\n')
+            if newline >= 0:
+                text = text[:newline + 1]
+        if index:
+            parts.append(OMISSION_MARKER.format(omitted=max(0, start - previous_end)))
+        parts.append(text)
+        previous_end = end
+    return ''.join(parts)
+
+
+def iter_sampled_chunks(path: str, budget: int, windows: int = SAMPLE_WINDOWS,
+                        encoding: str = 'utf-8') -> Iterator[bytes]:
+    """Yield the sample of a file as UTF-8 (the sample is at most ``budget``-sized)"""
+    with open(path, 'rb') as f:
+        text = sample_text(f, os.fstat(f.fileno()).st_size, budget, windows, encoding)
+    if text:
+        yield text.encode('utf-8')
+
+
+def inspect_file(path: str, keep_text_below: int = 0, chunk_size: int = CHUNK_SIZE,
+                 sample_budget: int = 0, sample_windows: int = SAMPLE_WINDOWS) -> FileInfo:
+    """Sniff a file and, if it is text, stream it once to describe it
+
+    ``digest`` is the SHA-256 of the raw bytes, ``length`` the size of the
+    normalized text encoded as UTF-8 and ``blank`` whether that text is only
+    whitespace. ``text`` is kept only while it stays under ``keep_text_below``
+    bytes. Binary, minified and generated files are recognised from their
+    first chunk and not read any further; their digest covers that chunk only.
+
+    Text files over ``sample_budget`` bytes (when it is set) are sampled
+    instead; ``digest`` and ``length`` then describe the sample.
+    """
+    with open(path, 'rb') as f:
+        data = f.read(chunk_size)
+        kind, encoding = classify(data, os.path.basename(path), at_eof=len(data) < chunk_size)
+        if kind != KIND_TEXT:
+            return FileInfo(hash_bytes(data), 0, False, kind, encoding)
+
+        size = os.fstat(f.fileno()).st_size
+        if sample_budget > 0 and size > sample_budget:
+            text = sample_text(f, size, sample_budget, sample_windows, encoding)
+            encoded = text.encode('utf-8')
+            return FileInfo(hash_bytes(encoded), len(encoded), not text.strip(), KIND_TEXT, encoding,
+                            text if len(encoded) < keep_text_below else None, sampled=True)
+        return _inspect_text(f, data, encoding, keep_text_below, chunk_size)
+
+
+def _inspect_text(f, data: bytes, encoding: str, keep_text_below: int,
+                  chunk_size: int) -> FileInfo:
+    hasher = hashlib.sha256()
+    normalizer = TextNormalizer(encoding)
+    length = 0
+    blank = True
+    kept = []
+    keep = keep_text_below > 0
+
+    def consume(text: str):
+        nonlocal length, blank, keep
+        if not text:
+            return
+        encoded_length = len(text.encode('utf-8'))
+        length += encoded_length
+        if blank and text.strip():
+            blank = False
+        if keep:
+            if length < keep_text_below:
+                kept.append(text)
+            else:
+                keep = False
+                kept.clear()
+
+    while data:
+        hasher.update(data)
+        consume(normalizer.feed(data))
+        data = f.read(chunk_size)
+    consume(normalizer.finish())
+
+    return FileInfo(hasher.hexdigest(), length, blank, KIND_TEXT, encoding,
+                    ''.join(kept) if keep else None)
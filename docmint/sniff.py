@@ -0,0 +1,139 @@
+"""
+Content sniffing for DocMint CLI
+
+Classifies a file from its first few KB, before the rest is read:
+
+* ``binary``: NUL bytes (other than UTF-16/32 text) or a high share of
+  control characters
+* ``minified``: bundled or generated code made of very long lines, or named
+  like ``*.min.js``
+* ``generated``: files whose first lines hold a comment starting with
+  ``@generated`` or Go's ``Code generated ... DO NOT EDIT.``
+* ``text``: everything else, together with the encoding to decode it with
+
+Only ``text`` files are worth uploading; the others are skipped without being
+read any further.
+"""
+
+import codecs
+import os
+import re
+from typing import Optional, Tuple
+
+from .ranking import CONFIG_EXTENSIONS, MANIFEST_NAMES
+
+# Bytes looked at to classify a file
+SNIFF_SIZE = 8 * 1024
+
+KIND_TEXT = 'text'
+KIND_BINARY = 'binary'
+KIND_MINIFIED = 'minified'
+KIND_GENERATED = 'generated'
+
+# Checked longest first: the UTF-32 LE mark starts with the UTF-16 LE one
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Control characters that do not appear in text (tab, newlines, form feed,
+# backspace and escape do)
+_CONTROL_BYTES = bytes(set(range(32)) - {8, 9, 10, 12, 13, 27}) + b'\x7f'
+_CONTROL_TABLE = bytes.maketrans(_CONTROL_BYTES, b'\x00' * len(_CONTROL_BYTES))
+
+MINIFIED_SUFFIXES = ('.min.js', '.min.css', '.min.mjs', '.bundle.js', '-min.js')
+# Markers are matched case-sensitively at the start of a comment, so prose
+# like "Do not edit the keys below" is not mistaken for one
+GENERATED_MARKER = re.compile(r'^[ \t]*(?:#+|//+|/\*+|\*|--|;+|<!--)[ \t]*'
+                              r'(?:@generated\b|Code generated .* DO NOT EDIT\.)', re.M)
+
+# Line length statistics that mark minified or generated code
+LONG_LINE = 500
+MAX_LINE = 1000
+LONG_LINE_SHARE = 0.5
+
+# Prose files legitimately have one long line per paragraph, and manifests and
+# config files (a package.json written on one line) are wanted whatever their
+# layout, so none of these are checked for minification
+PROSE_EXTENSIONS = frozenset({'.md', '.txt', '.rst'})
+LONG_LINE_EXTENSIONS = PROSE_EXTENSIONS | CONFIG_EXTENSIONS
+
+
+def detect_encoding(head: bytes, at_eof: bool = True) -> Optional[str]:
+    """Return the encoding of a file starting with ``head``, or None if it looks binary"""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    if b'\x00' in head:
+        # ASCII-range UTF-16 without a byte order mark has every other byte zero
+        pairs = len(head) // 2
+        if pairs >= 2:
+            even_zeros = head[0::2].count(0)
+            odd_zeros = head[1::2].count(0)
+            if odd_zeros >= pairs * 0.4 and even_zeros <= pairs * 0.05:
+                return 'utf-16-le'
+            if even_zeros >= pairs * 0.4 and odd_zeros <= pairs * 0.05:
+                return 'utf-16-be'
+        return None
+
+    if head and head.translate(_CONTROL_TABLE).count(0) > len(head) * 0.05:
+        return None
+
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # The sample may end in the middle of a multi-byte character
+        if not at_eof and e.start >= len(head) - 3 and e.reason == 'unexpected end of data':
+            return 'utf-8'
+    # Legacy 8-bit text (Latin-1 / Windows-1252)
+    return 'cp1252'
+
+
+def looks_minified(text: str, complete: bool) -> bool:
+    """Check line length statistics for signs of minified or generated code"""
+    lines = text.split('\n')
+    if not complete and len(lines) > 1:
+        lines.pop()  # cut off mid-line
+    total = sum(len(line) for line in lines)
+    if not total:
+        return False
+    longest = max(len(line) for line in lines)
+    long_chars = sum(len(line) for line in lines if len(line) >= LONG_LINE)
+    return longest >= MAX_LINE and long_chars >= total * LONG_LINE_SHARE
+
+
+def is_generated(text: str) -> bool:
+    """Check the first lines for a generated-code marker"""
+    top = '\n'.join(text.split('\n', 5)[:5])
+    return GENERATED_MARKER.search(top) is not None
+
+
+def classify(head: bytes, name: str = '', at_eof: bool = False) -> Tuple[str, Optional[str]]:
+    """Return ``(kind, encoding)`` for a file from its first bytes
+
+    ``at_eof`` says whether ``head`` is the whole file. ``encoding`` is None
+    for binary files.
+    """
+    head = head[:SNIFF_SIZE] if len(head) > SNIFF_SIZE else head
+    complete = at_eof and len(head) < SNIFF_SIZE
+    encoding = detect_encoding(head, complete)
+    if encoding is None:
+        return KIND_BINARY, None
+
+    lower = name.lower()
+    if lower.endswith(MINIFIED_SUFFIXES):
+        return KIND_MINIFIED, encoding
+
+    text = codecs.getincrementaldecoder(encoding)(errors='ignore').decode(head)
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    if is_generated(text):
+        return KIND_GENERATED, encoding
+    if os.path.basename(lower) not in MANIFEST_NAMES and os.path.splitext(lower)[1] not in LONG_LINE_EXTENSIONS \
+            and looks_minified(text, complete):
+        return KIND_MINIFIED, encoding
+    return KIND_TEXT, encoding
@@ -0,0 +1,173 @@
+"""
+Streaming generation responses for DocMint CLI
+
+The generate endpoints may answer with ``text/event-stream`` (server-sent
+events) or a chunked ``text/markdown`` body instead of a single JSON
+document. The CLI asks for these with its ``Accept`` header and falls back to
+JSON when the backend does not offer them.
+
+Recognised server-sent events:
+
+* ``data: {"delta": "..."}`` (or ``content``/``text``) appends Markdown
+* ``data: {"answer": "..."}`` (or ``{"result": {"answer": ...}}``) is the
+  whole answer at once
+* any other ``data:`` payload is appended as plain text
+* ``event: error`` aborts with the event data as the message
+* ``event: done`` or ``data: [DONE]`` ends the stream; an event stream that
+  closes without either was cut off (by a proxy timeout or a crashed
+  backend, say) and raises :class:`StreamError`
+
+Streamed Markdown is written to a temporary file next to the output and only
+renamed over it once the stream completed, so an interrupted generation never
+replaces a good README.
+"""
+
+import json
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional, Tuple
+
+STREAM_ACCEPT = 'text/event-stream, text/markdown;q=0.9, application/json;q=0.8'
+STREAMING_TYPES = ('text/event-stream', 'text/markdown')
+
+
+class StreamError(Exception):
+    """Raised when the backend reports an error in the middle of a stream, or the stream breaks off"""
+
+
+def is_streaming_response(response) -> bool:
+    """Check whether a response carries a streamed answer rather than JSON"""
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in STREAMING_TYPES
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Parse server-sent event lines into ``(event, data)`` pairs"""
+    event = 'message'
+    data = []
+    for line in lines:
+        if line.endswith('\r'):
+            line = line[:-1]
+        if not line:
+            # A named event counts even without data (a bare ``event: done``)
+            if data or event != 'message':
+                yield event, '\n'.join(data)
+            event = 'message'
+            data = []
+            continue
+        if line.startswith(':'):
+            continue
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'event':
+            event = value or 'message'
+        elif field == 'data':
+            data.append(value)
+    if data or event != 'message':
+        yield event, '\n'.join(data)
+
+
+def _event_text(data: str) -> Tuple[Optional[str], bool]:
+    """Return ``(text, replaces)`` for one message event"""
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return data, False
+    if isinstance(payload, dict):
+        for key in ('delta', 'content', 'text'):
+            if isinstance(payload.get(key), str):
+                return payload[key], False
+        if isinstance(payload.get('answer'), str):
+            return payload['answer'], True
+        result = payload.get('result')
+        if isinstance(result, dict) and isinstance(result.get('answer'), str):
+            return result['answer'], True
+        if 'error' in payload:
+            raise StreamError(str(payload['error']))
+        return None, False
+    if isinstance(payload, str):
+        return payload, False
+    return data, False
+
+
+def iter_answer_chunks(response) -> Iterator[Tuple[str, bool]]:
+    """Yield ``(markdown, replaces)`` pieces from a streamed generate response
+
+    ``replaces`` is True when the piece is a complete answer that supersedes
+    everything streamed before it.
+    """
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type != 'text/event-stream':
+        if response.encoding is None:
+            response.encoding = 'utf-8'
+        for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+            if chunk:
+                yield chunk, False
+        return
+
+    lines = response.iter_lines(decode_unicode=True)
+    for event, data in iter_sse_events(line if isinstance(line, str) else line.decode('utf-8')
+                                       for line in lines):
+        if event == 'error':
+            raise StreamError(data or 'Generation failed')
+        if event == 'done' or data.strip() == '[DONE]':
+            return
+        text, replaces = _event_text(data)
+        if text is not None:
+            yield text, replaces
+    raise StreamError("The stream ended before the README was complete")
+
+
+class AtomicWriter:
+    """Write a file through a temporary sibling and rename it into place"""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        directory, name = os.path.split(self.path)
+        fd, self.temp_path = tempfile.mkstemp(prefix=f'.{name}.', suffix='.tmp', dir=directory or None)
+        self._file = os.fdopen(fd, 'w', encoding='utf-8')
+
+    def write(self, text: str):
+        self._file.write(text)
+        self._file.flush()
+
+    def reset(self):
+        """Discard everything written so far"""
+        self._file.seek(0)
+        self._file.truncate()
+
+    def commit(self):
+        """Make the written content visible under the final name"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if os.path.exists(self.path):
+            try:
+                os.chmod(self.temp_path, os.stat(self.path).st_mode & 0o7777)
+            except OSError:
+                pass
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(self.temp_path, 0o666 & ~umask)
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        """Throw the temporary file away, leaving any existing file untouched"""
+        try:
+            self._file.close()
+        finally:
+            try:
+                os.unlink(self.temp_path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
@@ -0,0 +1,167 @@
+"""
+Timing spans for DocMint CLI
+
+Each phase of a run (config load, health check, walk, read, payload build,
+upload, server wait, save) is recorded as a :class:`Span` with its duration
+and counts such as files seen or bytes sent. ``--timings`` prints a summary
+table and ``--trace out.json`` writes the spans in Chrome trace-event format,
+which ``chrome://tracing`` and https://ui.perfetto.dev can open.
+
+Wrappers can forward spans to their own metrics system with a hook, either on
+one CLI (``cli.tracer.add_hook(fn)``) or for every run in the process::
+
+    from docmint import tracing
+
+    def send(span):
+        statsd.timing(f"docmint.{span.name}", span.duration * 1000)
+
+    tracing.add_hook(send)
+
+Hooks are called with each span as it ends; exceptions they raise are ignored.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SpanHook = Callable[['Span'], None]
+
+# Hooks applied to every tracer in the process
+_global_hooks = []
+
+
+def add_hook(hook: SpanHook):
+    """Call ``hook(span)`` for every span that ends, in any run"""
+    if hook not in _global_hooks:
+        _global_hooks.append(hook)
+
+
+def remove_hook(hook: SpanHook):
+    if hook in _global_hooks:
+        _global_hooks.remove(hook)
+
+
+class Span:
+    """One timed phase of a run"""
+
+    __slots__ = ('name', 'start', 'end', 'counts', 'thread_id', 'thread_name')
+
+    def __init__(self, name: str, start: float, counts: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.counts = dict(counts or {})
+        thread = threading.current_thread()
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+
+    @property
+    def duration(self) -> float:
+        """Seconds the span took (so far, if it is still open)"""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def count(self, **counts: Any):
+        """Add to (numbers) or set (anything else) the span's counts"""
+        for key, value in counts.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                    and isinstance(self.counts.get(key), (int, float)):
+                self.counts[key] += value
+            else:
+                self.counts[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'duration': self.duration, 'counts': dict(self.counts)}
+
+
+class Tracer:
+    """Collects the spans of one run"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: SpanHook):
+        """Call ``hook(span)`` for every span of this tracer that ends"""
+        self.hooks.append(hook)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+        for hook in self.hooks + _global_hooks:
+            try:
+                hook(span)
+            except Exception:
+                pass
+
+    @contextmanager
+    def span(self, name: str, **counts: Any) -> Iterator[Span]:
+        """Time the ``with`` block as a span; counts can be added while it runs"""
+        span = Span(name, time.perf_counter(), counts)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            self._finish(span)
+
+    def record(self, name: str, start: float, end: float, **counts: Any) -> Span:
+        """Add a span measured elsewhere (``time.perf_counter`` values)"""
+        span = Span(name, start, counts)
+        span.end = max(start, end)
+        self._finish(span)
+        return span
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Spans merged by name in order of first appearance, with summed counts"""
+        phases = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        for span in spans:
+            phase = phases.get(span.name)
+            if phase is None:
+                phase = phases[span.name] = {'name': span.name, 'duration': 0.0, 'calls': 0, 'counts': {}}
+            phase['duration'] += span.duration
+            phase['calls'] += 1
+            for key, value in span.counts.items():
+                previous = phase['counts'].get(key)
+                if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                        and isinstance(previous, (int, float)):
+                    phase['counts'][key] = previous + value
+                else:
+                    phase['counts'][key] = value
+        return list(phases.values())
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Spans as a Chrome trace-event document"""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        for span in spans:
+            threads.setdefault(span.thread_id, span.thread_name)
+            events.append({
+                'name': span.name,
+                'cat': 'docmint',
+                'ph': 'X',
+                'ts': round((span.start - self.origin) * 1e6, 3),
+                'dur': round(span.duration * 1e6, 3),
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': dict(span.counts),
+            })
+        for tid, name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, indent=1, default=str)
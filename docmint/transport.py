@@ -0,0 +1,142 @@
+"""
+HTTP transport for DocMint CLI
+
+All requests to the backend go through one ``requests.Session`` so that the
+health check and the generate call share pooled keep-alive connections instead
+of paying for a new TCP/TLS handshake each. Transient failures are retried
+with exponential backoff and full jitter:
+
+* idempotent requests (the health check) are retried after any connection
+  failure, a read timeout, or a 429 or 5xx response
+* other requests (the generate calls) are only retried when they cannot have
+  reached the backend: the connection was refused or timed out, or the answer
+  is a 429 or 503 with ``Retry-After``. A generate call that failed after the
+  upload may still be running, so repeating it could start the work twice
+* ``Retry-After`` is honoured whenever it is given
+"""
+
+import random
+import time
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from . import __version__
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Statuses that mean a non-idempotent request was turned away unprocessed,
+# retried only when the response says when to come back
+RETRY_LATER_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# (attempt, delay_seconds, reason)
+RetryCallback = Callable[[int, float, str], None]
+
+
+def connect_failed(error: requests.exceptions.ConnectionError) -> bool:
+    """Whether a request failed before a connection was made, so nothing was sent"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    # requests wraps urllib3's MaxRetryError, which holds the actual error
+    return isinstance(getattr(reason, 'reason', reason), NewConnectionError)
+
+
+class BackendSession:
+    """Pooled, retrying HTTP client for the DocMint backend"""
+
+    def __init__(self, retries: int = 3, backoff: float = 0.5, backoff_max: float = 30.0,
+                 connect_timeout: float = 10.0, read_timeout: float = 60.0,
+                 pool_size: int = 4, retry_statuses: Iterable[int] = RETRY_STATUSES,
+                 on_retry: Optional[RetryCallback] = None):
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retry_statuses = frozenset(retry_statuses)
+        self.on_retry = on_retry
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = f'docmint/{__version__}'
+
+    def timeout(self, read_timeout: Optional[float] = None) -> Tuple[float, float]:
+        """Return a (connect, read) timeout pair"""
+        return (self.connect_timeout, read_timeout if read_timeout is not None else self.read_timeout)
+
+    def backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before retry number ``attempt + 1``"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '').strip()
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+    def _retry(self, attempt: int, delay: float, reason: str):
+        if self.on_retry is not None:
+            self.on_retry(attempt + 1, delay, reason)
+        time.sleep(delay)
+
+    def request(self, method: str, url: str, read_timeout: Optional[float] = None,
+                retry: bool = True, **kwargs: Any) -> requests.Response:
+        """Send a request, retrying transient failures
+
+        A ``data`` body that was partly consumed is rewound with its
+        ``rewind()`` method before a retry; bodies without one are only sent
+        once. Non-idempotent methods are only retried when nothing reached
+        the backend (see the module docstring). The last response is returned once retries run out, so callers
+        handle HTTP errors as before.
+        """
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        body = kwargs.get('data')
+        rewindable = body is None or isinstance(body, (bytes, str, dict, list, tuple)) or hasattr(body, 'rewind')
+        retries = self.retries if retry and rewindable else 0
+        timeout = self.timeout(read_timeout)
+
+        attempt = 0
+        while True:
+            if attempt and hasattr(body, 'rewind'):
+                body.rewind()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                if attempt >= retries or not (idempotent or connect_failed(e)):
+                    raise
+                self._retry(attempt, self.backoff_delay(attempt), f"connection failed ({type(e).__name__})")
+                attempt += 1
+                continue
+            except requests.exceptions.Timeout:
+                if not idempotent or attempt >= retries:
+                    raise
+                self._retry(attempt, self.backoff_delay(attempt), "timed out")
+                attempt += 1
+                continue
+
+            if idempotent:
+                retryable = response.status_code in self.retry_statuses
+            else:
+                retryable = response.status_code in RETRY_LATER_STATUSES and 'Retry-After' in response.headers
+            if not retryable or attempt >= retries:
+                return response
+            delay = self.backoff_delay(attempt, response)
+            response.close()
+            self._retry(attempt, delay, f"HTTP {response.status_code}")
+            attempt += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('HEAD', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.session.close()
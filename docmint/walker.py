@@ -0,0 +1,150 @@
+"""
+Directory walker for DocMint CLI
+
+Walks a project tree with ``os.scandir`` so the entry type and stat data come
+from the directory read itself, and spreads directory reads across a bounded
+thread pool. Directories are read one depth level at a time, which keeps the
+output deterministic regardless of how the reads are scheduled.
+
+Used for projects that are not git checkouts (see ``gitindex.py``); any
+``.gitignore`` and ``.docmintignore`` files found on the way prune the walk.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .exclude import ExclusionMatcher
+from .ignore import IgnoreMatcher
+
+DEFAULT_WORKERS = 8
+
+
+def _child_path(parent: str, name: str) -> str:
+    """Join a directory entry onto its parent the way pathlib renders it"""
+    return name if parent == '.' else os.path.join(parent, name)
+
+
+class ProjectWalker:
+    """Parallel, pruning walk over a project directory
+
+    Produces ``(path, size)`` pairs for regular files whose suffix is in
+    ``extensions`` or whose lower-case name is in ``names``, and whose size is
+    below ``max_size``. Excluded and ignored directories are never read.
+    """
+
+    def __init__(self, root: str, matcher: ExclusionMatcher, extensions: Iterable[str],
+                 max_size: int, workers: int = DEFAULT_WORKERS, ignore: Optional[IgnoreMatcher] = None,
+                 names: Iterable[str] = ()):
+        self.root = root
+        self.matcher = matcher
+        self.ignore = ignore
+        self.extensions = frozenset(extensions)
+        self.names = frozenset(names)
+        self.max_size = max_size
+        self.workers = max(1, int(workers))
+        self.excluded_count = 0
+        self.dirs_scanned = 0
+        self.directories = []  # every directory read, in walk order
+        self.files_seen = 0
+
+    def scan_directory(self, dirpath: str) -> Tuple[List[Tuple[str, int]], List[str], int]:
+        """Read one directory, returning its files, subdirectories and exclusion count"""
+        files = []
+        subdirs = []
+        excluded = 0
+        matcher = self.matcher
+
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            return files, subdirs, excluded
+
+        # Ignore files apply to the directory they are in and everything below it
+        ignore = self.ignore
+        if ignore is not None:
+            prefix = self.relative(dirpath)
+            if any(entry.name in ignore.names for entry in entries):
+                ignore.load(prefix, self.root)
+            if not ignore:
+                ignore = None
+            elif prefix:
+                prefix += '/'
+
+        for entry in entries:
+            name = entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if matcher.excludes_part(name) or (ignore is not None and ignore.ignored(prefix + name, True)):
+                        excluded += 1
+                    else:
+                        subdirs.append(_child_path(dirpath, name))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+
+            path = _child_path(dirpath, name)
+            if matcher.excludes_part(name) or matcher.excludes_file(name, path) \
+                    or (ignore is not None and ignore.ignored(prefix + name)):
+                excluded += 1
+                continue
+
+            if os.path.splitext(name)[1].lower() not in self.extensions and name.lower() not in self.names:
+                continue
+
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            if size < self.max_size:
+                files.append((path, size))
+
+        return files, subdirs, excluded
+
+    def relative(self, path: str) -> str:
+        """A walked path relative to the root, '/' separated ('' for the root)"""
+        if path == self.root:
+            return ''
+        if self.root != '.':
+            path = path[len(self.root.rstrip(os.sep)) + 1:]
+        return path if os.sep == '/' else path.replace(os.sep, '/')
+
+    def iter_levels(self) -> Iterator[Tuple[int, List[Tuple[str, int]]]]:
+        """Yield ``(depth, files)`` for each depth level of the tree, shallowest first"""
+        level = [self.root]
+        depth = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while level:
+                if len(level) == 1:
+                    results = [self.scan_directory(level[0])]
+                else:
+                    results = list(pool.map(self.scan_directory, level))
+
+                next_level = []
+                level_files = []
+                for files, subdirs, excluded in results:
+                    level_files.extend(files)
+                    next_level.extend(subdirs)
+                    self.excluded_count += excluded
+                self.dirs_scanned += len(level)
+                self.directories.extend(level)
+                self.files_seen += len(level_files)
+
+                level_files.sort()
+                yield depth, level_files
+
+                next_level.sort()
+                level = next_level
+                depth += 1
+
+    def walk(self) -> List[Tuple[str, int]]:
+        """Return every matching file, sorted by path"""
+        files = []
+        for _, level_files in self.iter_levels():
+            files.extend(level_files)
+        files.sort()
+        return files
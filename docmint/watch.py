@@ -0,0 +1,506 @@
+"""
+Watch mode for DocMint CLI
+
+``docmint watch`` selects a project's files once, generates its README, and
+then waits for changes:
+
+* on Linux, inotify reports changes in every directory that is not
+  excluded, so an idle watch uses no CPU; elsewhere, or when the inotify
+  watch limit is reached, directories and the selected files are polled
+  with ``stat`` every ``watch_poll_interval`` seconds
+* events for excluded and ignored paths, unsupported file types and the
+  README being written are dropped
+* a burst of changes is folded into one update once no event has arrived
+  for ``watch_debounce`` seconds, and never later than ``watch_max_delay``
+  seconds after its first event
+* files are only selected again when files were added, removed or renamed;
+  the README is only regenerated when the selected files or their content
+  hashes differ from the last generated README
+"""
+
+import argparse
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .cli import Colors, DocMintCLI
+from .filetable import FileRecord
+from .gitindex import find_git_dir
+from .ignore import IGNORE_FILES, IgnoreMatcher
+from .walker import DEFAULT_WORKERS, ProjectWalker
+
+# What an event means for the README
+CONTENT = 'content'  # a file's content changed
+LISTING = 'listing'  # files were added, removed or renamed
+RESCAN = 'rescan'  # events were lost; everything may have changed
+
+# (path, kind, is_dir); path is None for RESCAN
+Event = Tuple[Optional[str], str, bool]
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK)
+
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Change events for a set of directories from Linux inotify (through ctypes)"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._ctypes = ctypes
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}  # type: Dict[str, int]
+        self.paths = {}  # type: Dict[int, str]
+
+    def watch(self, directories: Sequence[str]) -> bool:
+        """Watch exactly these directories; False if the kernel's watch limit was reached"""
+        wanted = set(directories)
+        for directory in [d for d in self.watches if d not in wanted]:
+            self._rm_watch(self.fd, self.watches.pop(directory))
+        for directory in wanted:
+            if directory in self.watches:
+                continue
+            wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                if self._ctypes.get_errno() == errno.ENOSPC:
+                    return False
+                continue  # removed in the meantime, or unreadable
+            self.watches[directory] = wd
+            self.paths[wd] = directory
+        return True
+
+    def track(self, files: Sequence[str]):
+        """Files need no watches of their own: their directories report them"""
+
+    def read(self, timeout: Optional[float]) -> List[Event]:
+        """Wait up to ``timeout`` seconds (None: forever) for events"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos + _INOTIFY_EVENT.size <= len(data):
+                wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, pos)
+                pos += _INOTIFY_EVENT.size
+                name = data[pos:pos + length].rstrip(b'\0')
+                pos += length
+                if mask & IN_Q_OVERFLOW:
+                    events.append((None, RESCAN, False))
+                    continue
+                directory = self.paths.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self.paths[wd]
+                    if self.watches.get(directory) == wd:
+                        del self.watches[directory]
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    events.append((directory, LISTING, True))
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                kind = CONTENT if mask & IN_CLOSE_WRITE else LISTING
+                events.append((path, kind, bool(mask & IN_ISDIR)))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int, int, int]]:
+    # The change time catches writes that put the modification time back
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino
+
+
+def _listing(path: str) -> Set[str]:
+    try:
+        return set(os.listdir(path))
+    except OSError:
+        return set()
+
+
+class PollingWatcher:
+    """Change events from stat-ing directories and files every ``interval`` seconds
+
+    A directory's modification time changes when entries are added, removed
+    or renamed, and only then is it listed again to find which; edits are
+    only seen for the tracked files.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = max(0.05, float(interval))
+        self.directories = {}  # type: Dict[str, Tuple[Optional[Tuple[int, int, int, int]], Set[str]]]
+        self.files = {}  # type: Dict[str, Optional[Tuple[int, int, int, int]]]
+
+    def watch(self, directories: Sequence[str]) -> bool:
+        self.directories = {d: self.directories[d] if d in self.directories else (_stat_key(d), _listing(d))
+                            for d in directories}
+        return True
+
+    def track(self, files: Sequence[str]):
+        self.files = {f: self.files[f] if f in self.files else _stat_key(f) for f in files}
+
+    def poll(self) -> List[Event]:
+        events = []
+        for directory, (key, names) in self.directories.items():
+            current = _stat_key(directory)
+            if current == key:
+                continue
+            if current is None:
+                self.directories[directory] = (None, set())
+                events.append((directory, LISTING, True))
+                continue
+            listed = _listing(directory)
+            self.directories[directory] = (current, listed)
+            for name in sorted(listed ^ names):
+                path = os.path.join(directory, name)
+                events.append((path, LISTING, path in self.directories or os.path.isdir(path)))
+        for path, key in self.files.items():
+            current = _stat_key(path)
+            if current != key:
+                self.files[path] = current
+                events.append((path, CONTENT if current is not None and key is not None else LISTING, False))
+        return events
+
+    def read(self, timeout: Optional[float]) -> List[Event]:
+        """Poll until something changed or ``timeout`` seconds (None: forever) passed"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            events = self.poll()
+            if events:
+                return events
+            wait = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if wait <= 0:
+                return []
+            time.sleep(wait)
+
+    def close(self):
+        pass
+
+
+def open_watcher(poll_interval: float, force_polling: bool = False):
+    """Use inotify where the platform has it, stat polling otherwise"""
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(poll_interval)
+
+
+class WatchSession:
+    """Regenerate one project's README as its files change
+
+    With ``skip_output`` the README being written is left out of the analyzed
+    files and its changes are ignored; the daemon turns it off to select
+    exactly what a plain run would.
+    """
+
+    def __init__(self, cli: DocMintCLI, directory: Path, project_type: Optional[str] = None,
+                 include_contributing: bool = True, exclude_dirs: Optional[Set[str]] = None,
+                 exclude_files: Optional[Set[str]] = None, workers: Optional[int] = None,
+                 debounce: float = 0.5, max_delay: float = 5.0, poll_interval: float = 1.0,
+                 force_polling: bool = False, skip_output: bool = True):
+        self.cli = cli
+        self.directory = directory
+        self.root = str(directory)
+        self.project_type = project_type
+        self.include_contributing = include_contributing
+        self.exclude_dirs = exclude_dirs if exclude_dirs is not None else set(cli.config.get('excluded_dirs', []))
+        self.exclude_files = exclude_files if exclude_files is not None else set()
+        self.workers = workers if workers is not None else cli.config.get('scan_workers', DEFAULT_WORKERS)
+        self.debounce = max(0.0, float(debounce))
+        self.max_delay = max(self.debounce, float(max_delay))
+        self.poll_interval = poll_interval
+        self.skip_output = skip_output
+        self.matcher = cli.build_exclusion_matcher(self.exclude_dirs, self.exclude_files)
+        self.ignore = None  # type: Optional[IgnoreMatcher]
+        self.watcher = open_watcher(poll_interval, force_polling)
+
+        # Changes to the tracked file list arrive as changes to the git index
+        found = find_git_dir(self.root) if cli.config.get('use_git_index', True) else None
+        self.git_dir = found[0] if found is not None else None
+        self.git_index = os.path.join(self.git_dir, 'index') if self.git_dir is not None else None
+
+        self.files = []  # type: List[FileRecord]
+        self.selected = set()  # type: Set[str]
+        self.signature = None  # type: Optional[List[Tuple[str, str]]]
+        self.generations = 0
+
+    @property
+    def polling(self) -> bool:
+        return isinstance(self.watcher, PollingWatcher)
+
+    def output_path(self) -> str:
+        return os.path.abspath(self.cli.output_path)
+
+    def watch_tree(self):
+        """Register every directory that is not excluded or ignored"""
+        ignore = IgnoreMatcher() if self.cli.config.get('use_ignore_files', True) else None
+        walker = ProjectWalker(self.root, self.matcher, (), 0, self.workers, ignore)
+        walker.walk()
+        self.ignore = ignore
+        directories = list(walker.directories)
+        if self.git_dir is not None:
+            directories.append(self.git_dir)
+        if not self.watcher.watch(directories):
+            self.cli.print_warning("Reached the inotify watch limit, polling for changes instead")
+            self.watcher.close()
+            self.watcher = PollingWatcher(self.poll_interval)
+            self.watcher.watch(directories)
+        self.track_files()
+
+    def track_files(self):
+        files = list(self.selected)
+        if self.git_index is not None:
+            files.append(self.git_index)
+        if self.ignore is not None:
+            files.extend(os.path.join(self.root, directory, name)
+                         for directory in self.ignore.rules for name in self.ignore.names)
+        self.watcher.track(files)
+
+    def classify(self, event: Event) -> Optional[str]:
+        """What an event means for the README, or None if it does not matter"""
+        path, kind, is_dir = event
+        if path is None:
+            return kind
+        if self.git_dir is not None and (path == self.git_dir or path.startswith(self.git_dir + os.sep)):
+            return LISTING if path in (self.git_index, self.git_dir) else None
+
+        output = self.output_path()
+        directory, name = os.path.split(path)
+        if directory == os.path.dirname(output) and name.endswith('.tmp') \
+                and name.startswith(f".{os.path.basename(output)}."):
+            return None
+        if path == output and self.skip_output:
+            return None
+
+        relative = os.path.relpath(path, self.root)
+        if relative == os.curdir:
+            return LISTING
+        if relative.startswith(os.pardir + os.sep) or relative == os.pardir:
+            return None
+        parts = relative.split(os.sep)
+        if self.matcher.excludes_any_part(parts[:-1] if not is_dir else parts):
+            return None
+        if self.ignore:
+            relative = relative.replace(os.sep, '/')
+            if self.ignore.excludes(relative) or (is_dir and self.ignore.ignored(relative, True)):
+                return None
+        if is_dir:
+            return LISTING
+        if name in IGNORE_FILES:
+            return LISTING
+        if self.matcher.excludes_part(name) or self.matcher.excludes_file(name, path):
+            return None
+        if not self.cli.is_supported(name):
+            return None
+        # Any other supported file may change the ranking of the selection
+        if path not in self.selected:
+            return LISTING
+        # A selected file replaced by a rename (as editors save) only changed content
+        return CONTENT if kind == LISTING and os.path.isfile(path) else kind
+
+    def select(self):
+        """Choose the files to document, leaving out the README this session writes"""
+        output = self.output_path() if self.skip_output else None
+        self.files = [path for path in self.cli.get_project_files(self.root, self.exclude_dirs,
+                                                                  self.exclude_files, self.workers)
+                      if os.path.abspath(path) != output]
+        self.selected = {os.path.abspath(path) for path in self.files}
+        self.track_files()
+
+    def current_signature(self) -> List[Tuple[str, str]]:
+        """The selected files with their content hashes (unchanged files come from the scan cache)"""
+        signature = []
+        with self.cli.open_scan_cache() as scan_cache:
+            for path in self.files:
+                try:
+                    signature.append((path.path, scan_cache.inspect(path.path).digest))
+                except OSError:
+                    signature.append((path.path, ''))
+        return signature
+
+    def update(self, kinds: Set[str], first_event: Optional[float] = None) -> bool:
+        """Reselect and regenerate as needed after changes; returns whether the README was regenerated"""
+        if LISTING in kinds or RESCAN in kinds:
+            self.watch_tree()
+            self.select()
+        signature = self.current_signature()
+        if signature == self.signature:
+            self.cli.print_info("No changes to the documented files")
+            return False
+        if not self.files:
+            self.cli.print_warning("No supported code files found in the directory.")
+            self.signature = signature
+            return False
+        if self.regenerate():
+            self.signature = signature
+            if first_event is not None:
+                self.cli.print_info(f"Updated {time.monotonic() - first_event:.1f}s after the first change")
+            return True
+        return False
+
+    def regenerate(self) -> bool:
+        """Generate and save the README for the current selection"""
+        cli = self.cli
+        if cli.backend_available is False:
+            # Try the backend again: it may have come back since
+            cli.reset_health_check()
+            cli.start_health_check()
+
+        project_type = self.project_type or cli.detect_project_type(self.files)
+        cli.print_info(f"Detected project type: {Colors.BOLD}{project_type}{Colors.END}")
+        cli.streamed_output = None
+        content = cli.generate_readme_from_files(self.files, project_type, self.include_contributing,
+                                                 root=self.directory)
+        if not content:
+            return False
+        if cli.streamed_output != cli.output_path and not cli.save_readme(content, cli.output_path):
+            return False
+        self.generations += 1
+        cli.print_success(f"README generated successfully: {Colors.BOLD}{cli.output_path}{Colors.END}")
+        return True
+
+    def run(self, max_updates: Optional[int] = None):
+        """Generate once, then watch until interrupted (or ``max_updates`` updates)"""
+        self.watch_tree()
+        self.select()
+        self.update({CONTENT})
+        mode = f"polling every {self.poll_interval:g}s" if self.polling else "inotify"
+        self.cli.print_info(f"Watching {self.root} for changes ({mode}, Ctrl+C to stop)")
+
+        updates = 0
+        pending = set()  # type: Set[str]
+        first = last = 0.0
+        while max_updates is None or updates < max_updates:
+            timeout = None
+            if pending:
+                timeout = max(0.0, min(last + self.debounce, first + self.max_delay) - time.monotonic())
+            events = self.watcher.read(timeout)
+            now = time.monotonic()
+            for event in events:
+                kind = self.classify(event)
+                if kind is None:
+                    continue
+                if not pending:
+                    first = now
+                pending.add(kind)
+                last = now
+            if pending and now >= min(last + self.debounce, first + self.max_delay):
+                kinds, pending = pending, set()
+                self.update(kinds, first)
+                updates += 1
+
+    def close(self):
+        self.watcher.close()
+
+
+def run_watch(cli: DocMintCLI, argv: List[str]) -> int:
+    """Entry point for ``docmint watch``"""
+    parser = argparse.ArgumentParser(
+        prog="docmint watch",
+        description="Regenerate the README whenever the project's files change",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  {Colors.GREEN}docmint watch{Colors.END}                        # Watch the current directory
+  {Colors.GREEN}docmint watch -d ~/src/api --debounce 2{Colors.END}  # Wait for 2s of quiet before updating
+  {Colors.GREEN}docmint watch --poll 5{Colors.END}               # Check for changes every 5s instead of inotify
+        """
+    )
+
+    parser.add_argument('-d', '--directory', default='.',
+                        help='Directory to watch (default: current directory)')
+    cli.add_run_arguments(parser)
+    parser.add_argument('--debounce', type=float, metavar='SECONDS',
+                        help='Quiet time after the last change before updating (default: from config)')
+    parser.add_argument('--max-delay', type=float, metavar='SECONDS',
+                        help='Longest wait after the first change before updating (default: from config)')
+    parser.add_argument('--poll', nargs='?', type=float, const=-1.0, metavar='SECONDS',
+                        help='Poll for changes instead of using inotify (default interval: from config)')
+
+    args = parser.parse_args(argv)
+
+    directory = Path(args.directory).resolve()
+    if not directory.is_dir():
+        cli.print_error(f"Directory not found: {directory}")
+        return 1
+
+    cli.apply_run_arguments(args)
+
+    if not args.no_banner:
+        cli.print_banner()
+
+    exclude_dirs = set(cli.config.get('excluded_dirs', []))
+    exclude_files = set(cli.config.get('excluded_files', []))
+    if args.exclude_dir:
+        exclude_dirs.update(cli.parse_exclude_patterns(args.exclude_dir))
+    if args.exclude_file:
+        exclude_files.update(cli.parse_exclude_patterns(args.exclude_file))
+
+    poll_interval = cli.config.get('watch_poll_interval', 1.0)
+    if args.poll is not None and args.poll > 0:
+        poll_interval = args.poll
+
+    cli.start_health_check()
+    session = WatchSession(
+        cli, directory,
+        project_type=args.type,
+        include_contributing=not args.no_contributing,
+        exclude_dirs=exclude_dirs,
+        exclude_files=exclude_files,
+        workers=args.workers,
+        debounce=args.debounce if args.debounce is not None else cli.config.get('watch_debounce', 0.5),
+        max_delay=args.max_delay if args.max_delay is not None else cli.config.get('watch_max_delay', 5.0),
+        poll_interval=poll_interval,
+        force_polling=args.poll is not None
+    )
+    try:
+        session.run()
+    except KeyboardInterrupt:
+        print()
+        cli.print_info(f"Stopped watching ({session.generations} README"
+                       f"{'s' if session.generations != 1 else ''} generated)")
+    finally:
+        session.close()
+        cli.report_timings()
+    return 0
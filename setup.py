@@ -66,7 +66,7 @@ setup(
     install_requires=read_requirements(),
     entry_points={
         "console_scripts": [
-            "docmint=docmint.cli:main",  # This creates the CLI command
+            "docmint=docmint.launcher:main",  # This creates the CLI command
         ],
     },
     include_package_data=True,
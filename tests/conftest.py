@@ -0,0 +1,13 @@
+import pytest
+
+from docmint.cli import DocMintCLI
+from docmint.config import DEFAULT_CONFIG
+
+
+@pytest.fixture
+def cli():
+    """A DocMintCLI with default settings and no persistent caches"""
+    cli = DocMintCLI()
+    cli.config = dict(DEFAULT_CONFIG, scan_cache=False, response_cache=False)
+    yield cli
+    cli.close()
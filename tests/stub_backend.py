@@ -0,0 +1,313 @@
+"""
+Local stand-in for the DocMint backend
+
+Implements ``/api/health/``, ``/api/generate/`` and
+``/api/generate-from-files/`` well enough to exercise the CLI end to end
+without network access: request bodies are decompressed, checked against
+their ``Repr-Digest`` and parsed, and the answer is a small README listing
+what was received, sent as JSON or (with ``--stream``) as server-sent
+events. With ``--delta`` it also keeps uploaded file bodies by SHA-256 and
+implements the manifest-first upload from ``docmint.delta``. Every request
+is recorded on the server for inspection, and ``fail()`` queues error
+responses for testing retries.
+
+It lives with the tests so it is not shipped in the package. Run it with
+``python tests/stub_backend.py --port 8000`` and point the CLI at it with
+``docmint --url http://localhost:8000``.
+"""
+
+import argparse
+import base64
+import email.parser
+import email.policy
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from docmint.compression import available_encodings, decompress
+from docmint.delta import DELTA_FEATURE, MANIFEST_FIELD
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Request handler for :class:`StubBackend`"""
+
+    server_version = "DocMintStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args):
+        if self.server.verbose:
+            sys.stderr.write("%s - %s\n" % (self.address_string(), format % args))
+
+    def send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def wants_stream(self) -> bool:
+        return self.server.stream and 'text/event-stream' in self.headers.get('Accept', '')
+
+    def send_event_stream(self, answer: str):
+        """Send an answer as server-sent events, one line per event, chunked"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def send_chunk(data: bytes):
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            self.wfile.flush()
+
+        for line in answer.splitlines(keepends=True):
+            send_chunk(f"data: {json.dumps({'delta': line})}\n\n".encode('utf-8'))
+            if self.server.stream_delay > 0:
+                time.sleep(self.server.stream_delay)
+        send_chunk(b'event: done\ndata: \n\n')
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+    def send_answer(self, answer: str, wrap_result: bool):
+        if self.wants_stream():
+            self.send_event_stream(answer)
+        elif wrap_result:
+            self.send_json(200, {'result': {'answer': answer}})
+        else:
+            self.send_json(200, {'answer': answer})
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_failure(self) -> bool:
+        """Answer with the next queued failure, if there is one"""
+        failure = self.server.next_failure()
+        if failure is None:
+            return False
+        status, headers = failure
+        self.send_json(status, {'error': 'Injected failure'}, headers)
+        return True
+
+    def do_GET(self):
+        if self.path.rstrip('/') != '/api/health':
+            self.send_json(404, {'error': 'Not found'})
+            return
+        self.server.simulate_latency()
+        self.server.record({'path': '/api/health', 'method': 'GET'})
+        if self.send_failure():
+            return
+        encodings = list(self.server.accept_encodings)
+        payload = {'status': 'ok', 'accept_encoding': encodings}
+        if self.server.delta:
+            payload['features'] = [DELTA_FEATURE]
+        self.send_json(200, payload, {'Accept-Encoding': ', '.join(encodings)} if encodings else None)
+
+    def do_POST(self):
+        path = self.path.rstrip('/')
+        raw = self.read_body()
+        self.server.simulate_latency()
+
+        encoding = self.headers.get('Content-Encoding')
+        if encoding and encoding not in self.server.accept_encodings:
+            self.send_json(415, {'error': f'Unsupported Content-Encoding: {encoding}'})
+            return
+        try:
+            body = decompress(raw, encoding)
+        except Exception as e:
+            self.send_json(400, {'error': f'Could not decode body: {e}'})
+            return
+
+        expected = self.headers.get('Repr-Digest')
+        if expected:
+            actual = 'sha-256=:' + base64.b64encode(hashlib.sha256(body).digest()).decode('ascii') + ':'
+            if actual != expected:
+                self.send_json(400, {'error': 'Repr-Digest does not match the decoded body'})
+                return
+
+        record = {
+            'path': path,
+            'method': 'POST',
+            'content_encoding': encoding,
+            'wire_bytes': len(raw),
+            'repr_digest': expected,
+            'body': body,
+        }
+        self.server.record(record)
+        if self.send_failure():
+            return
+
+        if path == '/api/generate':
+            message = json.loads(body.decode('utf-8') or '{}').get('message', '')
+            record['message'] = message
+            self.send_answer(f"# Project\n\n{message}\n", wrap_result=False)
+        elif path == '/api/files/missing' and self.server.delta:
+            digests = json.loads(body.decode('utf-8') or '{}').get('digests', [])
+            missing = self.server.missing(digests)
+            record['digests'] = digests
+            record['missing'] = missing
+            self.send_json(200, {'missing': missing})
+        elif path == '/api/generate-from-files':
+            fields, files = self.parse_form(body)
+            record['fields'] = fields
+            record['uploaded'] = len(files)
+            if self.server.delta and MANIFEST_FIELD in fields:
+                files, missing = self.server.resolve_manifest(json.loads(fields[MANIFEST_FIELD]), files)
+                if missing:
+                    record['missing'] = missing
+                    self.send_json(409, {'error': 'Missing file bodies', 'missing': missing})
+                    return
+            record['files'] = files
+            self.send_answer(self.server.render_answer(fields, files), wrap_result=True)
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def parse_form(self, body: bytes):
+        """Split a multipart/form-data body into fields and uploaded files"""
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            b'Content-Type: ' + self.headers.get('Content-Type', '').encode('latin-1') + b'\r\n\r\n' + body
+        )
+        fields = {}
+        files = []
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            filename = part.get_filename()
+            payload = part.get_payload(decode=True) or b''
+            if filename is None:
+                fields[name] = payload.decode('utf-8')
+            else:
+                files.append({'field': name, 'filename': filename, 'content': payload})
+        return fields, files
+
+
+class StubBackend(ThreadingHTTPServer):
+    """Threaded stand-in backend that records every request it answers"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 accept_encodings: Optional[List[str]] = None, stream: bool = False,
+                 stream_delay: float = 0.0, delta: bool = False, verbose: bool = False):
+        super().__init__((host, port), StubRequestHandler)
+        self.latency = latency
+        self.accept_encodings = list(available_encodings() if accept_encodings is None else accept_encodings)
+        self.stream = stream
+        self.stream_delay = stream_delay
+        self.delta = delta
+        self.verbose = verbose
+        self.requests = []
+        self.failures = []
+        self.blobs = {}  # SHA-256 hex digest -> file body, kept across requests
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def simulate_latency(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def record(self, request: Dict[str, Any]):
+        with self._lock:
+            self.requests.append(request)
+
+    def fail(self, status: int, times: int = 1, headers: Optional[Dict[str, str]] = None):
+        """Answer the next ``times`` requests with ``status`` instead of handling them"""
+        with self._lock:
+            self.failures.extend([(status, headers)] * times)
+
+    def next_failure(self):
+        with self._lock:
+            return self.failures.pop(0) if self.failures else None
+
+    def missing(self, digests: List[str]) -> List[str]:
+        """Digests of the bodies not stored yet"""
+        with self._lock:
+            return [digest for digest in digests if digest not in self.blobs]
+
+    def resolve_manifest(self, manifest: List[Dict[str, Any]], uploaded: List[Dict[str, Any]]):
+        """Store uploaded bodies and rebuild the full file list from a manifest
+
+        Returns the files and the digests that are neither uploaded nor stored.
+        """
+        with self._lock:
+            for item in uploaded:
+                self.blobs[hashlib.sha256(item['content']).hexdigest()] = item['content']
+            files = []
+            missing = []
+            for entry in manifest:
+                content = self.blobs.get(entry['digest'])
+                if content is None:
+                    missing.append(entry['digest'])
+                else:
+                    files.append({'field': 'files', 'filename': entry['name'], 'content': content})
+        return files, sorted(set(missing))
+
+    def render_answer(self, fields: Dict[str, str], files: List[Dict[str, Any]]) -> str:
+        lines = [f"# {fields.get('projectType', 'Project')} project", ""]
+        for item in files:
+            lines.append(f"- `{item['filename']}` ({len(item['content']):,} bytes)")
+        if fields.get('contribution') == 'true':
+            lines.extend(["", "## Contributing", "", "Pull requests are welcome."])
+        return '\n'.join(lines) + '\n'
+
+    def start(self) -> str:
+        """Serve on a background thread and return the base URL"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the DocMint backend")
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds of artificial delay added to every request')
+    parser.add_argument('--accept-encoding', default=','.join(available_encodings()),
+                        help='Comma-separated request encodings to accept (empty for none)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Answer clients that accept it with server-sent events')
+    parser.add_argument('--stream-delay', type=float, default=0.0,
+                        help='Seconds to wait between streamed events')
+    parser.add_argument('--delta', action='store_true',
+                        help='Keep uploaded files and accept manifest-first delta uploads')
+    args = parser.parse_args()
+
+    encodings = [e.strip() for e in args.accept_encoding.split(',') if e.strip()]
+    server = StubBackend(args.host, args.port, args.latency, encodings,
+                         stream=args.stream, stream_delay=args.stream_delay, delta=args.delta, verbose=True)
+    print(f"DocMint stand-in backend listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
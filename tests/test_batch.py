@@ -0,0 +1,48 @@
+import json
+import re
+
+import pytest
+
+from docmint.batch import run_batch
+from stub_backend import StubBackend
+
+
+def options(run, cli, capsys):
+    with pytest.raises(SystemExit):
+        run(cli, ['-h'])
+    return set(re.findall(r'(?<![\w-])--[a-z][a-z-]*', capsys.readouterr().out))
+
+
+def test_batch_takes_the_single_run_options(cli, capsys):
+    single = options(lambda cli, argv: cli.run(argv), cli, capsys)
+    batch = options(run_batch, cli, capsys)
+
+    assert {'--concurrency', '--rate', '--scan-jobs', '--report'} <= batch
+    assert {'--budget', '--no-pack', '--digest', '--no-git', '--timings', '--trace'} <= batch
+    assert single - {'--directory', '--prompt', '--show-config', '--no-daemon'} <= batch
+
+
+def test_batch_applies_run_options_to_every_repository(cli, tmp_path):
+    repositories = []
+    for name in ('api', 'web'):
+        repository = tmp_path / name
+        repository.mkdir()
+        (repository / 'main.py').write_text("# Entry point\n\ndef main():\n    return 'hello'\n")
+        repositories.append(str(repository))
+    trace = tmp_path / 'trace.json'
+
+    server = StubBackend()
+    server.start()
+    try:
+        status = run_batch(cli, repositories + ['--url', server.url, '--no-banner', '--no-pack',
+                                                '--no-git', '--trace', str(trace), '--rate', '0'])
+    finally:
+        server.stop()
+
+    assert status == 0
+    assert cli.config['pack_payload'] is False and cli.config['use_git_index'] is False
+    uploads = [r for r in server.requests if r['path'] == '/api/generate-from-files']
+    assert [item['content'] for r in uploads for item in r['files']] == [
+        b"# Entry point\n\ndef main():\n    return 'hello'\n"] * 2
+    spans = [event['name'] for event in json.loads(trace.read_text())['traceEvents']]
+    assert spans.count('upload') == 2
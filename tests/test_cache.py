@@ -0,0 +1,125 @@
+import os
+import types
+
+import pytest
+
+from docmint import cache as cache_module
+from docmint import config as config_module
+from docmint.cache import ROW_OVERHEAD, ResponseCache, ScanCache, payload_digest
+from stub_backend import StubBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable replacement for time.time() in the cache module"""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache_module, 'time', types.SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_scan_cache_reuses_unchanged_files(tmp_path):
+    path = write(tmp_path / 'main.py', "print('hello')\n")
+    with ScanCache(tmp_path / 'scan.db', 1024 * 1024) as cache:
+        first = cache.inspect(path)
+        second = cache.inspect(path)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert second.digest == first.digest and second.text == "print('hello')\n"
+
+
+@pytest.mark.parametrize('change', ['size', 'mtime', 'inode'])
+def test_scan_cache_invalidates_changed_files(tmp_path, change):
+    path = write(tmp_path / 'main.py', "print('hello')\n")
+    with ScanCache(tmp_path / 'scan.db', 1024 * 1024) as cache:
+        cache.inspect(path)
+        st = os.stat(path)
+        if change == 'size':
+            text = "print('hello, world')\n"
+            write(tmp_path / 'main.py', text)
+        elif change == 'mtime':
+            # Same size, written a second later
+            text = "print('HELLO')\n"
+            write(tmp_path / 'main.py', text)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        else:
+            # Replaced by another file with the same size and mtime
+            text = "print('HELLO')\n"
+            replacement = write(tmp_path / 'new.py', text)
+            os.utime(replacement, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(replacement, path)
+        info = cache.inspect(path)
+        assert cache.misses == 2
+        assert info.text == text
+        assert cache.read(path)[1] == text
+
+
+def test_scan_cache_evicts_least_recently_used_files(tmp_path, clock):
+    paths = [write(tmp_path / f'{name}.py', f'{name} = 1\n' * 200) for name in 'abc']
+    row_bytes = ROW_OVERHEAD + len(paths[0]) + 1200
+    db = tmp_path / 'scan.db'
+
+    with ScanCache(db, 2 * row_bytes) as cache:
+        for path in paths:
+            clock.now += 1
+            cache.inspect(path)
+        clock.now += 1
+        cache.inspect(paths[0])  # a becomes the most recently used
+
+    with ScanCache(db, 2 * row_bytes) as cache:
+        st = {path: os.stat(path) for path in paths}
+        kept = [cache.lookup(path, st[path]) is not None for path in paths]
+    assert kept == [True, False, True]
+
+
+def test_response_cache_expires_answers(tmp_path, clock):
+    with ResponseCache(tmp_path / 'responses.db', 1024 * 1024, ttl=60) as cache:
+        cache.put('old', '# Old')
+        clock.now += 30
+        assert cache.get('old') == '# Old'
+        clock.now += 31
+        assert cache.get('old') is None
+        cache.put('new', '# New')
+        assert cache.get('new') == '# New'
+        assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_payload_digest_ignores_key_order_only():
+    payload = {'endpoint': '/api/generate-from-files/', 'files': [['main.py', 'abc']], 'projectType': 'Python'}
+    assert payload_digest(payload) == payload_digest(dict(reversed(list(payload.items()))))
+    assert payload_digest(payload) != payload_digest(dict(payload, files=[['main.py', 'abd']]))
+    assert payload_digest(payload) != payload_digest(dict(payload, projectType='Go'))
+
+
+@pytest.fixture
+def backend():
+    server = StubBackend()
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_response_cache_key_follows_files_and_settings(cli, backend, tmp_path, monkeypatch):
+    monkeypatch.setattr(config_module, 'RESPONSE_CACHE_FILE', tmp_path / 'responses.db')
+    project = tmp_path / 'project'
+    project.mkdir()
+    (project / 'main.py').write_text("def main():\n    return 'hello'\n")
+    cli.use_response_cache = True
+    cli.base_url = backend.url
+
+    def uploads_after_generating():
+        files = cli.get_project_files(str(project), set(), set())
+        cli.request_readme_from_files(files, 'Python', root=project)
+        return sum(1 for request in backend.requests if request['path'] == '/api/generate-from-files')
+
+    assert uploads_after_generating() == 1
+    assert uploads_after_generating() == 1  # answered from the cache
+    (project / 'main.py').write_text("def main():\n    return 'goodbye'\n")
+    assert uploads_after_generating() == 2
+    cli.config['pack_payload'] = False
+    assert uploads_after_generating() == 3
+    cli.refresh_response_cache = True
+    assert uploads_after_generating() == 4
@@ -0,0 +1,36 @@
+import pytest
+
+from docmint.client import DocMintClient
+from stub_backend import StubBackend
+
+
+@pytest.fixture(params=[False, True], ids=['json', 'stream'])
+def backend(request):
+    server = StubBackend(stream=request.param, delta=True)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'main.py').write_text("# Entry point\n\ndef main():\n    return 'hello'\n")
+    (tmp_path / 'setup.py').write_text("from setuptools import setup\n\nsetup(name='demo')\n")
+    (tmp_path / 'pyproject.toml').write_text("[project]\nname = \"demo\"\n")
+    return tmp_path
+
+
+def test_generate_writes_nothing_to_stdout_or_stderr(backend, project, capfd):
+    events = []
+    config = {'scan_cache': False, 'response_cache': False, 'metadata_digest': 'alongside',
+              'http_retries': 0}
+    with DocMintClient(backend.url, config=config, on_event=events.append) as client:
+        readme = client.generate(str(project))
+        client.generate(str(project))
+        client.generate(prompt="A demo project")
+
+    out, err = capfd.readouterr()
+    assert (out, err) == ('', '')
+    assert '`main.py`' in readme
+    assert {'files', 'info'} <= {event.kind for event in events}
+    assert not (project / 'README.md').exists()
@@ -0,0 +1,58 @@
+import base64
+import functools
+import hashlib
+
+import pytest
+
+from docmint import cli as cli_module
+from docmint.compression import available_encodings
+from stub_backend import StubBackend
+
+BOUNDARY = 'docmint-test-boundary'
+
+
+@pytest.fixture
+def project(tmp_path):
+    source = tmp_path / 'project'
+    source.mkdir()
+    (source / 'main.py').write_text("def main():\n    return 'hello'\n" * 200)
+    (source / 'pyproject.toml').write_text("[project]\nname = \"demo\"\n")
+    return source
+
+
+@pytest.fixture
+def backend():
+    server = StubBackend()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def fixed_boundary(monkeypatch):
+    # The same files encode to the same bytes, whatever the compression
+    monkeypatch.setattr(cli_module, 'MultipartEncoder',
+                        functools.partial(cli_module.MultipartEncoder, boundary=BOUNDARY))
+
+
+def upload(cli, backend, project, compress):
+    cli.run(['-d', str(project), '-o', str(project.parent / f'{compress}.md'), '--url', backend.url,
+             '--compress', compress, '--no-banner'])
+    return [r for r in backend.requests if r['path'] == '/api/generate-from-files'][-1]
+
+
+@pytest.mark.parametrize('encoding', [
+    'gzip',
+    pytest.param('zstd', marks=pytest.mark.skipif('zstd' not in available_encodings(),
+                                                  reason='zstandard is not installed')),
+])
+def test_compressed_upload_decodes_to_the_plain_body(cli, backend, project, encoding):
+    plain = upload(cli, backend, project, 'none')
+    compressed = upload(cli, backend, project, encoding)
+
+    assert plain['content_encoding'] is None and plain['repr_digest'] is None
+    assert compressed['content_encoding'] == encoding
+    assert compressed['body'] == plain['body']
+    assert compressed['wire_bytes'] < len(plain['body'])
+    digest = base64.b64encode(hashlib.sha256(plain['body']).digest()).decode('ascii')
+    assert compressed['repr_digest'] == f'sha-256=:{digest}:'
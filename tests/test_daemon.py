@@ -0,0 +1,93 @@
+import os
+import socket
+
+import pytest
+
+from docmint import __version__, daemon as daemon_module
+from docmint.daemon import Channel, ClientDisconnected, DocMintDaemon
+
+
+@pytest.fixture
+def hung_up():
+    """A channel whose client has already hung up"""
+    daemon_end, client_end = socket.socketpair()
+    client_end.close()
+    channel = Channel(daemon_end)
+    yield channel
+    channel.close()
+    daemon_end.close()
+
+
+def test_send_to_a_client_that_hung_up_cancels(hung_up):
+    with pytest.raises(ClientDisconnected):
+        hung_up.send(out="text\n")
+    assert hung_up.closed
+    with pytest.raises(KeyboardInterrupt):
+        hung_up.send(exit=0)
+
+
+def test_run_for_a_client_that_hung_up_writes_nothing(cli, hung_up, tmp_path, capsys):
+    (tmp_path / 'main.py').write_text("print('hello')\n")
+    daemon = DocMintDaemon(cli, path=str(tmp_path / 'daemon.sock'))
+    daemon.run(hung_up, ['--skip-health-check', '--url', 'http://127.0.0.1:9'], str(tmp_path))
+
+    assert not (tmp_path / 'README.md').exists()
+    assert daemon.runs == 1
+    assert 'cancelled by the client' in capsys.readouterr().out
+
+
+@pytest.fixture
+def connection():
+    """The daemon's end of a connection and a channel for the client's"""
+    daemon_end, client_end = socket.socketpair()
+    client = Channel(client_end)
+    yield daemon_end, client
+    client.close()
+    daemon_end.close()
+
+
+def test_run_uses_the_client_environment(cli, connection, tmp_path, monkeypatch):
+    seen = {}
+
+    def run_cli(argv, cli):
+        seen['value'] = os.environ.get('DOCMINT_TEST_VALUE')
+        seen['cwd'] = os.getcwd()
+        return 0
+    monkeypatch.setattr(daemon_module, 'run_cli', run_cli)
+    monkeypatch.delenv('DOCMINT_TEST_VALUE', raising=False)
+    daemon_end, client = connection
+    daemon = DocMintDaemon(cli, path=str(tmp_path / 'daemon.sock'))
+    daemon.run(Channel(daemon_end), [], str(tmp_path), dict(os.environ, DOCMINT_TEST_VALUE='client'))
+
+    assert seen == {'value': 'client', 'cwd': str(tmp_path)}
+    assert 'DOCMINT_TEST_VALUE' not in os.environ
+    assert client.receive() == {'exit': 0}
+
+
+def test_client_with_another_home_runs_itself(cli, connection, tmp_path):
+    daemon_end, client = connection
+    daemon = DocMintDaemon(cli, path=str(tmp_path / 'daemon.sock'))
+    client.send(version=__version__, argv=[], cwd=str(tmp_path), command=None,
+                env=dict(os.environ, HOME=str(tmp_path)))
+    daemon.handle(daemon_end)
+
+    assert client.receive() == {'daemon': None}
+    assert daemon.runs == 0
+
+
+def test_selection_is_made_again_when_a_selected_file_changes_size(cli, tmp_path, capsys):
+    main = tmp_path / 'main.py'
+    main.write_text("print('hello')\n")
+    daemon = DocMintDaemon(cli, path=str(tmp_path / 'daemon.sock'))
+    try:
+        first, = daemon.project_files(cli, str(tmp_path), set(), set(), 1)
+        reused, = daemon.project_files(cli, str(tmp_path), set(), set(), 1)
+        assert 'Reusing the 1 files' in capsys.readouterr().out
+        main.write_text("print('hello, world')\n")
+        changed, = daemon.project_files(cli, str(tmp_path), set(), set(), 1)
+    finally:
+        daemon.close()
+
+    assert first.size == reused.size == len("print('hello')\n")
+    assert changed.size == len("print('hello, world')\n")
+    assert 'Reusing' not in capsys.readouterr().out
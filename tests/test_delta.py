@@ -0,0 +1,106 @@
+import pytest
+
+from docmint.delta import DELTA_FEATURE, MANIFEST_FIELD, server_features
+from stub_backend import StubBackend
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'main.py').write_text("def main():\n    return 'hello'\n")
+    (tmp_path / 'one.py').write_text("VALUE = 1\n")
+    (tmp_path / 'copy.py').write_text("VALUE = 1\n")
+    return tmp_path
+
+
+def start(cli, server):
+    cli.base_url = server.start()
+    cli.health_check = True
+    cli.start_health_check()
+
+
+def generate(cli, project):
+    files = cli.get_project_files(str(project), set(), set())
+    return cli.request_readme_from_files(files, cli.detect_project_type(files), root=project)
+
+
+def uploads(server):
+    return [r for r in server.requests if r['path'] == '/api/generate-from-files']
+
+
+def uploaded_names(request):
+    return sorted(item['filename'] for item in request['files'])
+
+
+@pytest.fixture
+def backend():
+    servers = []
+
+    def make(**options):
+        server = StubBackend(**options)
+        servers.append(server)
+        return server
+    yield make
+    for server in servers:
+        server.stop()
+
+
+def test_server_features():
+    assert server_features({'features': [DELTA_FEATURE, 'other']}) == {DELTA_FEATURE, 'other'}
+    assert server_features({'features': f' {DELTA_FEATURE}, other '}) == {DELTA_FEATURE, 'other'}
+    assert server_features({'status': 'ok'}) == set()
+    assert server_features(None) == set()
+
+
+def test_plain_backend_gets_every_file(cli, project, backend):
+    server = backend()
+    start(cli, server)
+    answer = generate(cli, project)
+
+    assert DELTA_FEATURE not in cli.backend_features
+    request, = uploads(server)
+    assert MANIFEST_FIELD not in request['fields']
+    assert uploaded_names(request) == ['copy.py', 'main.py', 'one.py']
+    assert '`copy.py`' in answer and '`one.py`' in answer
+
+
+def test_delta_backend_gets_identical_files_once(cli, project, backend):
+    server = backend(delta=True)
+    start(cli, server)
+    answer = generate(cli, project)
+
+    assert DELTA_FEATURE in cli.backend_features
+    request, = uploads(server)
+    assert MANIFEST_FIELD in request['fields']
+    assert request['uploaded'] == 2
+    assert uploaded_names(request) == ['copy.py', 'main.py', 'one.py']
+    assert '`copy.py`' in answer and '`one.py`' in answer
+
+
+def test_delta_backend_gets_only_new_bodies_on_repeat(cli, project, backend):
+    server = backend(delta=True)
+    start(cli, server)
+    generate(cli, project)
+    (project / 'main.py').write_text("def main():\n    return 'goodbye'\n")
+    generate(cli, project)
+
+    first, second = uploads(server)
+    assert first['uploaded'] == 2
+    assert second['uploaded'] == 1
+    assert uploaded_names(second) == ['copy.py', 'main.py', 'one.py']
+    assert any(r['path'] == '/api/files/missing' for r in server.requests)
+
+
+def test_delta_backend_that_lost_bodies_gets_them_again(cli, project, backend):
+    server = backend(delta=True)
+    start(cli, server)
+    generate(cli, project)
+    # The backend claims to hold every body, then turns out not to
+    server.missing = lambda digests: []
+    server.blobs.clear()
+    answer = generate(cli, project)
+
+    refused, retried = uploads(server)[1:]
+    assert refused['uploaded'] == 0 and len(refused['missing']) == 2
+    assert retried['uploaded'] == 2
+    assert uploaded_names(retried) == ['copy.py', 'main.py', 'one.py']
+    assert '`main.py`' in answer
@@ -0,0 +1,113 @@
+import fnmatch
+from pathlib import Path
+
+import pytest
+
+from docmint.config import DEFAULT_CONFIG
+from docmint.exclude import ExclusionMatcher, compile_matcher
+
+
+def fnmatch_excludes(file_path, exclude_dirs, exclude_files):
+    """The pattern loop ExclusionMatcher replaced, kept as the reference"""
+    path_str = str(file_path)
+    path_parts = file_path.parts
+    for exclude_dir in exclude_dirs:
+        if exclude_dir in path_parts:
+            return True
+        if '*' in exclude_dir:
+            if any(fnmatch.fnmatch(part, exclude_dir) for part in path_parts):
+                return True
+    for exclude_file in exclude_files:
+        if file_path.name == exclude_file:
+            return True
+        if '*' in exclude_file:
+            if fnmatch.fnmatch(file_path.name, exclude_file):
+                return True
+        if '/' in exclude_file or '\\' in exclude_file:
+            if fnmatch.fnmatch(path_str, exclude_file):
+                return True
+    return False
+
+
+DEFAULT_DIRS = set(DEFAULT_CONFIG['excluded_dirs'])
+DEFAULT_FILES = set(DEFAULT_CONFIG['excluded_files'])
+
+RULES = {
+    'defaults': (DEFAULT_DIRS, DEFAULT_FILES),
+    'user globs': (DEFAULT_DIRS | {'temp*', '.*', 'gen[0-9]*', 'cache'},
+                   DEFAULT_FILES | {'*.min.js', 'test_[ab]*.py', 'secret.txt', 'tests/*', 'docs/*.md',
+                                    '*.lo[gt]', 'file[0-9].txt', '[!a-m]*.cfg'}),
+    'none': (set(), set()),
+}
+
+PATHS = [
+    'main.py',
+    'src/app/main.py',
+    'src/app/deep/nested/module/util.py',
+    'node_modules/left-pad/index.js',
+    'packages/web/node_modules/react/index.js',
+    'src/__pycache__/main.cpython-311.pyc',
+    'build/lib/main.py',
+    'rebuild/main.py',
+    '.vscode/settings.json',
+    '.github/workflows/ci.yml',
+    '.env',
+    'config/.env/values.yml',
+    '.eslintrc.json',
+    'src/.hidden/module.py',
+    'static/app.min.js',
+    'static/app.js',
+    'static/app.min.js.map',
+    'tests/test_a_thing.py',
+    'tests/test_c_thing.py',
+    'src/test_b.py',
+    'docs/index.md',
+    'docs/guide/intro.md',
+    'README.md',
+    'server.log',
+    'server.lot',
+    'server.lox',
+    'file1.txt',
+    'file[0-9].txt',
+    'fileA.txt',
+    'temp_data/rows.csv',
+    'src/tempfile.py',
+    'gen1/out.py',
+    'gen/out.py',
+    'setup.cfg',
+    'app.cfg',
+    'cache/entries.json',
+    'src/cache.py',
+    'Pods/Alamofire/Source.swift',
+    'backup.py~',
+    'secret.txt',
+    'config/secret.txt',
+]
+
+
+@pytest.mark.parametrize('rules', sorted(RULES))
+@pytest.mark.parametrize('path', PATHS)
+def test_matcher_agrees_with_fnmatch(rules, path):
+    exclude_dirs, exclude_files = RULES[rules]
+    expected = fnmatch_excludes(Path(path), exclude_dirs, exclude_files)
+    assert ExclusionMatcher(exclude_dirs, exclude_files).matches(Path(path)) == expected
+    assert compile_matcher(exclude_dirs, exclude_files).matches(Path(path)) == expected
+
+
+def test_user_globs():
+    matcher = ExclusionMatcher(*RULES['user globs'])
+    excluded = {path for path in PATHS if matcher.matches(Path(path))}
+
+    assert {'static/app.min.js', 'src/.hidden/module.py', 'tests/test_c_thing.py', 'src/test_b.py',
+            'docs/index.md', 'server.lot', 'gen1/out.py', 'setup.cfg'} <= excluded
+    # Without a '*' a pattern only matches its exact name
+    assert {'file[0-9].txt'} <= excluded and 'file1.txt' not in excluded
+    assert not {'static/app.js', 'src/app/main.py', 'server.lox', 'gen/out.py', 'app.cfg',
+                'rebuild/main.py', 'src/cache.py'} & excluded
+
+
+def test_should_exclude_path_uses_the_matcher(cli):
+    exclude_dirs, exclude_files = RULES['user globs']
+    for path in PATHS:
+        assert cli.should_exclude_path(Path(path), exclude_dirs, exclude_files) == \
+            fnmatch_excludes(Path(path), exclude_dirs, exclude_files)
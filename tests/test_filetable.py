@@ -0,0 +1,13 @@
+import os
+
+from docmint.filetable import FileRecord
+
+
+def test_record_keeps_the_path_name_size_constructor(tmp_path):
+    path = str(tmp_path / 'src' / 'app.py')
+    record = FileRecord(path, os.path.join('src', 'app.py'), 12)
+
+    assert (record.path, record.name, record.size, record.priority) == (path, os.path.join('src', 'app.py'), 12, 0.0)
+    assert os.fspath(record) == str(record) == path
+    assert FileRecord.from_path(str(tmp_path), path, 12, 3.5) == record
+    assert FileRecord.from_path(str(tmp_path), path, 12, 3.5).name == record.name
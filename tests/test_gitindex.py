@@ -0,0 +1,68 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from docmint.gitindex import tracked_files
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+
+
+def git(checkout, *args):
+    subprocess.run(['git', *args], cwd=str(checkout), check=True, capture_output=True)
+
+
+@pytest.fixture
+def checkout(tmp_path):
+    (tmp_path / 'setup.py').write_text("from setuptools import setup\n")
+    (tmp_path / 'app').mkdir()
+    (tmp_path / 'app' / 'main.py').write_text("print('hello')\n")
+    (tmp_path / '.gitignore').write_text("*.log\nbuild/\n")
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'add', '.')
+    return tmp_path
+
+
+def selected_names(cli, project):
+    return sorted(record.name for record in cli.get_project_files(str(project), set(), set()))
+
+
+def test_untracked_project_inside_a_checkout_is_walked(cli, checkout):
+    project = checkout / 'proj'
+    project.mkdir()
+    (project / 'main.py').write_text("print('hello')\n")
+    (project / 'package.json').write_text('{"name": "proj"}\n')
+
+    assert tracked_files(str(project)) is None
+    assert selected_names(cli, project) == ['main.py', 'package.json']
+
+
+def test_files_added_since_the_index_are_listed_unless_ignored(cli, checkout):
+    (checkout / 'app' / 'cli.py').write_text("import argparse\n")
+    (checkout / 'app' / 'debug.log').write_text("noise\n")
+    (checkout / 'lib' / 'util').mkdir(parents=True)
+    (checkout / 'lib' / 'util' / 'text.py').write_text("def wrap(s):\n    return s\n")
+    (checkout / 'build').mkdir()
+    (checkout / 'build' / 'out.py').write_text("generated = True\n")
+    (checkout / 'node_modules' / 'dep').mkdir(parents=True)
+    (checkout / 'node_modules' / 'dep' / 'index.js').write_text("module.exports = 1\n")
+
+    listed = sorted(path for path, _ in tracked_files(str(checkout), lambda name: name == 'node_modules'))
+    assert listed == ['.gitignore', os.path.join('app', 'cli.py'), os.path.join('app', 'main.py'),
+                      os.path.join('lib', 'util', 'text.py'), 'setup.py']
+
+
+def test_deleted_files_do_not_take_slots_and_sizes_are_current(cli, checkout):
+    for name in ('a.py', 'b.py', 'c.py'):
+        (checkout / 'app' / name).write_text("x = 1\n")
+    git(checkout, 'add', '.')
+    (checkout / 'setup.py').unlink()
+    (checkout / 'app' / 'main.py').write_text("print('hello, world')\n" * 10)
+    cli.config['max_files'] = 3
+
+    records = cli.get_project_files(str(checkout), set(), set())
+    assert len(records) == 3
+    assert 'setup.py' not in [record.name for record in records]
+    sizes = {record.name: record.size for record in records}
+    assert sizes[os.path.join('app', 'main.py')] == len("print('hello, world')\n" * 10)
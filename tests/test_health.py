@@ -0,0 +1,43 @@
+import socket
+import time
+
+import pytest
+
+from docmint.errors import BackendUnavailableError
+from stub_backend import StubBackend
+
+
+@pytest.fixture
+def slow_backend():
+    server = StubBackend(latency=0.3)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_health_check_runs_while_the_project_is_scanned(cli, slow_backend, tmp_path):
+    (tmp_path / 'main.py').write_text("print('hello')\n")
+    cli.base_url = slow_backend.url
+
+    started = time.perf_counter()
+    cli.start_health_check()
+    assert time.perf_counter() - started < 0.2
+    cli.get_project_files(str(tmp_path), set(), set())
+    assert cli.wait_for_backend()
+
+    spans = {span.name: span for span in cli.tracer.spans}
+    assert spans['walk'].start < spans['health_check'].end
+    assert spans['health_check'].counts['available'] is True
+
+
+def test_unreachable_backend_is_reported_when_needed(cli):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    cli.base_url = f"http://127.0.0.1:{port}"
+    cli.config['http_retries'] = 0
+
+    cli.start_health_check()
+    assert not cli.wait_for_backend()
+    with pytest.raises(BackendUnavailableError):
+        cli.require_backend()
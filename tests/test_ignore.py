@@ -0,0 +1,101 @@
+import shutil
+import subprocess
+
+import pytest
+
+from docmint.ignore import IgnoreMatcher, load_ignore_files
+
+IGNORE_FILES = {
+    '.gitignore': [
+        '# build output',
+        '*.log',
+        '!important.log',
+        '/build',
+        '!/build/keep.js',
+        'docs/*.html',
+        '!docs/keep.html',
+        'node_modules/',
+        '**/tmp/**',
+        '\\#notes',
+        'cache?',
+        '[Dd]ist/',
+        'trailing.txt   ',
+    ],
+    'sub/.gitignore': [
+        '!debug.log',
+        '/local.txt',
+    ],
+}
+
+# Path -> whether it is ignored
+EXPECTED = {
+    'app.log': True,
+    'sub/app.log': True,
+    'important.log': False,
+    'sub/deeper/important.log': False,
+    'debug.log': True,
+    'sub/debug.log': False,
+    'sub/deeper/debug.log': False,
+    'build/out.js': True,
+    'build/keep.js': True,  # a file in an ignored directory cannot be re-included
+    'src/build/out.js': False,
+    'docs/index.html': True,
+    'docs/api/index.html': False,
+    'docs/keep.html': False,
+    'node_modules/left-pad/index.js': True,
+    'src/node_modules/react/index.js': True,
+    'other/node_modules': False,  # a file, and the rule only matches directories
+    'tmp/scratch.py': True,
+    'a/tmp/b/c.py': True,
+    'a/tmpx/c.py': False,
+    '#notes': True,
+    'notes': False,
+    'cache1': True,
+    'cache12': False,
+    'dist/app.js': True,
+    'Dist/app.js': True,
+    'distant/app.js': False,
+    'trailing.txt': True,
+    'sub/local.txt': True,
+    'sub/deeper/local.txt': False,
+    'local.txt': False,
+    'src/main.py': False,
+}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name, lines in IGNORE_FILES.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text('\n'.join(lines) + '\n')
+    for path in EXPECTED:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text('x\n')
+    return tmp_path
+
+
+@pytest.mark.parametrize('path', sorted(EXPECTED))
+def test_gitignore_rules(tree, path):
+    matcher = load_ignore_files(str(tree), ('', 'sub'), ('.gitignore',))
+    assert matcher.excludes(path) == EXPECTED[path]
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+def test_rules_agree_with_git(tree):
+    subprocess.run(['git', 'init', '-q'], cwd=str(tree), check=True)
+    listed = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard'], cwd=str(tree),
+                            capture_output=True, text=True, check=True).stdout
+    included = {line.strip('"') for line in listed.splitlines()} - set(IGNORE_FILES)
+    assert included == {path for path, ignored in EXPECTED.items() if not ignored}
+
+
+def test_docmintignore_takes_precedence_over_gitignore(tmp_path):
+    (tmp_path / '.gitignore').write_text('*.log\n')
+    (tmp_path / '.docmintignore').write_text('!keep.log\nsecret.py\n')
+    matcher = IgnoreMatcher()
+    matcher.load('', str(tmp_path))
+
+    assert matcher.excludes('app.log')
+    assert not matcher.excludes('keep.log')
+    assert matcher.excludes('src/secret.py')
+    assert not IgnoreMatcher()
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# What the console script imports before it knows whether to forward the run
+ENTRY_POINT = 'from docmint.launcher import main'
+
+# Milliseconds allowed for the entry point import (best of RUNS)
+BUDGET_MS = 30.0
+RUNS = 3
+
+# Loaded only once the CLI runs in this process or contacts the backend
+HEAVY_MODULES = {'requests', 'urllib3', 'charset_normalizer', 'idna', 'certifi', 'ssl', 'http',
+                 'sqlite3', 'concurrent', 'docmint.cli'}
+
+
+def import_times(code):
+    """Cumulative import time in microseconds of every module ``code`` loads"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=str(ROOT), capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line[len('import time:'):].split('|')
+        if line.startswith('import time:') and len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def test_entry_point_does_not_load_the_cli_or_the_http_stack():
+    startup = set(import_times('import sys'))
+    loaded = set(import_times(ENTRY_POINT)) - startup
+    heavy = {name for name in loaded
+             if any(name == module or name.startswith(module + '.') for module in HEAVY_MODULES)}
+    assert not heavy
+
+
+def test_entry_point_imports_within_budget():
+    elapsed = min(import_times(ENTRY_POINT)['docmint.launcher'] for _ in range(RUNS)) / 1000
+    assert elapsed <= BUDGET_MS, f"docmint.launcher took {elapsed:.2f} ms to import"
@@ -0,0 +1,184 @@
+import json
+
+import pytest
+
+from docmint.metadata import (DIGEST_VERSION, build_digest, summarize, summarize_cargo_toml, summarize_go_mod,
+                              summarize_package_json, summarize_python, tomllib)
+
+needs_toml = pytest.mark.skipif(tomllib is None, reason='tomllib or tomli is needed for TOML manifests')
+
+
+def test_summarize_python():
+    summary = summarize_python('''"""Command line tool for widgets
+
+More detail that is left out.
+"""
+import argparse
+
+__all__ = ['run', 'Widget']
+
+
+def run(path: str, *, verbose: bool = False, retries=3) -> int:
+    """Run the tool
+
+    Longer explanation.
+    """
+
+
+async def fetch(url, /, timeout: float = 1.0, *args, **kwargs):
+    pass
+
+
+def _helper():
+    pass
+
+
+class Widget(Base):
+    """A widget"""
+
+    def __init__(self, name):
+        pass
+
+    def render(self) -> str:
+        """Render it"""
+
+    def _private(self):
+        pass
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-v', '--verbose', action='store_true', help='Say more')
+parser.add_argument('path')
+commands = parser.add_subparsers()
+commands.add_parser('build', help='Build widgets')
+
+if __name__ == '__main__':
+    run('.')
+''')
+
+    assert summary['doc'] == 'Command line tool for widgets'
+    assert summary['exports'] == ['run', 'Widget']
+    assert summary['functions'] == [
+        'def run(path: str, *, verbose: bool = False, retries=3) -> int  # Run the tool',
+        'async def fetch(url, /, timeout: float = 1.0, *args, **kwargs)',
+    ]
+    assert summary['classes'] == [{
+        'class': 'Widget(Base)',
+        'doc': 'A widget',
+        'methods': ['def __init__(self, name)', 'def render(self) -> str  # Render it'],
+    }]
+    assert summary['flags'] == ['-v, --verbose  # Say more', 'path']
+    assert summary['commands'] == ['build  # Build widgets']
+    assert summary['script'] is True
+
+
+def test_summarize_go_mod():
+    summary = summarize_go_mod('''module example.com/widgets
+
+go 1.22
+
+require github.com/spf13/cobra v1.8.0
+
+require (
+\tgolang.org/x/sync v0.7.0
+\tgithub.com/inconshreveable/mousetrap v1.1.0 // indirect
+\tgithub.com/spf13/pflag v1.0.5 // indirect
+)
+''')
+
+    assert summary == {
+        'module': 'example.com/widgets',
+        'go': '1.22',
+        'require': ['github.com/spf13/cobra v1.8.0', 'golang.org/x/sync v0.7.0'],
+        'indirect': 2,
+    }
+
+
+def test_summarize_package_json():
+    summary = summarize_package_json(json.dumps({
+        'name': 'widgets',
+        'version': '1.0.0',
+        'description': '',
+        'bin': {'widgets': 'cli.js'},
+        'scripts': {'build': 'tsc -p .', 'test': 'jest'},
+        'dependencies': {'react': '^18.0.0'},
+        'devDependencies': {'jest': '^29.0.0', 'typescript': '^5.0.0'},
+        'exports': {'.': './index.js', './cli': './cli.js'},
+        'repository': {'type': 'git', 'url': 'https://example.com/widgets.git'},
+    }))
+
+    assert summary == {
+        'name': 'widgets',
+        'version': '1.0.0',
+        'bin': {'widgets': 'cli.js'},
+        'scripts': {'build': 'tsc -p .', 'test': 'jest'},
+        'dependencies': {'react': '^18.0.0'},
+        'devDependencies': ['jest', 'typescript'],
+        'exports': ['.', './cli'],
+        'repository': 'https://example.com/widgets.git',
+    }
+
+
+@needs_toml
+def test_summarize_cargo_toml():
+    summary = summarize_cargo_toml('''
+[package]
+name = "widgets"
+version = "0.3.0"
+edition = "2021"
+
+[dependencies]
+serde = { version = "1", features = ["derive"] }
+clap = "4"
+local = { path = "../local" }
+
+[dev-dependencies]
+proptest = "1"
+
+[features]
+default = []
+fast = []
+
+[[bin]]
+name = "widgets-cli"
+''')
+
+    assert summary == {
+        'name': 'widgets',
+        'version': '0.3.0',
+        'edition': '2021',
+        'dependencies': {'serde': '1', 'clap': '4', 'local': 'path'},
+        'dev-dependencies': ['proptest'],
+        'features': ['default', 'fast'],
+        'bin': ['widgets-cli'],
+    }
+
+
+@pytest.mark.parametrize('name, text', [
+    ('main.py', 'def broken(:\n'),
+    ('package.json', '{"name": '),
+    ('setup.py', 'setup(name=\n'),
+    ('notes.txt', 'not a kind DocMint summarizes'),
+    ('empty.py', 'x = 1\n'),
+])
+def test_summarize_returns_none_without_a_summary(name, text):
+    assert summarize(name, text) is None
+
+
+def test_build_digest():
+    summaries = [
+        ('package.json', summarize('package.json', '{"name": "widgets"}')),
+        ('src/app.py', summarize('src/app.py', 'def main():\n    """Start"""\n')),
+        ('requirements-dev.txt', summarize('requirements-dev.txt', 'pytest>=8  # tests\n-e .\n')),
+    ]
+    digest = json.loads(build_digest(summaries).decode('utf-8'))
+
+    assert digest == {
+        'digest_version': DIGEST_VERSION,
+        'manifests': {
+            'package.json': {'name': 'widgets'},
+            'requirements-dev.txt': {'requirements': ['pytest>=8']},
+        },
+        'sources': {'src/app.py': {'functions': ['def main()  # Start']}},
+    }
+    assert json.loads(build_digest([]).decode('utf-8')) == {'digest_version': DIGEST_VERSION}
@@ -0,0 +1,84 @@
+import pytest
+import requests
+import urllib3
+import urllib3.filepost
+
+from docmint.multipart import FilePart, MultipartEncoder, UploadError
+
+BOUNDARY = '0123456789abcdef0123456789abcdef'
+URLLIB3_2 = int(urllib3.__version__.split('.')[0]) >= 2
+
+
+def requests_body(fields, files, monkeypatch):
+    """The body requests itself would send for the same form"""
+    monkeypatch.setattr(urllib3.filepost, 'choose_boundary', lambda: BOUNDARY)
+    prepared = requests.Request('POST', 'http://localhost/', data=fields, files=[
+        (field, (filename, content, content_type)) for field, filename, content, content_type in files
+    ]).prepare()
+    return prepared.body, prepared.headers['Content-Type']
+
+
+def encode(fields, files, tmp_path, read_size=-1):
+    parts = []
+    for index, (field, filename, content, content_type) in enumerate(files):
+        path = tmp_path / f'part{index}'
+        path.write_bytes(content)
+        parts.append(FilePart(field, filename, str(path), len(content), content_type))
+    encoder = MultipartEncoder(fields, parts, boundary=BOUNDARY)
+    chunks = []
+    while True:
+        chunk = encoder.read(read_size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    body = b''.join(chunks)
+    assert len(body) == len(encoder)
+    return body, encoder.content_type
+
+
+FORMS = {
+    'files': ([('projectType', 'Python')], [
+        ('files', 'main.py', b"def main():\n    return 'hello'\n", 'text/plain'),
+        ('files', 'src/app/util.py', b'X = 1\n', 'text/plain'),
+        ('files', 'empty.txt', b'', 'text/plain'),
+    ]),
+    'unicode': ([('projectType', 'Café ☕')], [
+        ('files', 'docs/ünïcode.md', 'Grüße — ☕\n'.encode('utf-8'), 'text/markdown'),
+    ]),
+    'quoted names': ([('note', 'line one\r\nline two')], [
+        ('files', 'say "hi".py', b'print("hi")\n', 'text/plain'),
+        ('files', 'odd\nname.py', b'pass\n', 'text/plain'),
+    ]),
+    'large file': ([], [('files', 'big.py', b'x = 1\n' * 50000, 'text/plain')]),
+}
+
+
+@pytest.mark.parametrize('form', sorted(FORMS))
+@pytest.mark.parametrize('read_size', [-1, 1000, 8192])
+def test_body_matches_requests(form, read_size, tmp_path, monkeypatch):
+    fields, files = FORMS[form]
+    assert encode(fields, files, tmp_path, read_size) == requests_body(fields, files, monkeypatch)
+
+
+@pytest.mark.skipif(not URLLIB3_2, reason='urllib3 1.x also escapes backslashes in file names')
+def test_backslash_in_a_file_name_matches_requests(tmp_path, monkeypatch):
+    files = [('files', 'src\\main.py', b'pass\n', 'text/plain')]
+    assert encode([], files, tmp_path) == requests_body([], files, monkeypatch)
+
+
+def test_rewind_sends_the_same_body_again(tmp_path):
+    path = tmp_path / 'main.py'
+    path.write_bytes(b'print(1)\n' * 1000)
+    encoder = MultipartEncoder([('projectType', 'Python')], [FilePart('files', 'main.py', str(path), 9000)])
+    first = encoder.read()
+    encoder.rewind()
+    assert encoder.read() == first
+    assert encoder.bytes_sent == len(encoder) == len(first)
+
+
+def test_file_that_changed_since_it_was_inspected(tmp_path):
+    path = tmp_path / 'main.py'
+    path.write_bytes(b'print(1)\n')
+    encoder = MultipartEncoder([], [FilePart('files', 'main.py', str(path), 100)])
+    with pytest.raises(UploadError):
+        encoder.read()
@@ -0,0 +1,69 @@
+import os
+
+from docmint.cache import ScanCache
+from docmint.multipart import FilePart
+from docmint.packing import MIN_SHARE, TextSpool, compact_text, fit_shares
+
+
+def test_spool_spills_past_memory_limit():
+    with TextSpool(10) as spool:
+        spool.put('small.py', b'x = 1\n', 6)
+        spool.put('big.py', b'y = 2\n' * 10, 100)
+        assert spool.location('small.py') is None
+        offset, length = spool.location('big.py')
+        assert spool.data('big.py') == b'y = 2\n' * 10
+        assert spool.original('big.py') == 100
+        part = FilePart('files', 'big.py', spool.path, length, offset=offset)
+        assert b''.join(part.iter_chunks()) == b'y = 2\n' * 10
+        path = spool.path
+    assert not os.path.exists(path)
+
+
+def test_fit_shares_keeps_everything_within_budget():
+    assert fit_shares([100, 200], [50.0, 10.0], 0) == {0: 100, 1: 200}
+    assert fit_shares([100, 200], [50.0, 10.0], 300) == {0: 100, 1: 200}
+
+
+def test_fit_shares_splits_by_priority_and_hands_back_unused_bytes():
+    shares = fit_shares([500, 8000, 8000], [100.0, 60.0, 20.0], 6500)
+    assert shares[0] == 500
+    assert shares[1] + shares[2] <= 6000
+    assert shares[1] == 3 * shares[2]
+
+
+def test_fit_shares_drops_starved_low_priority_files():
+    shares = fit_shares([3000, 3000], [100.0, 30.0], 4000)
+    assert shares == {0: 3000}
+    # Scores below 1 still weigh 1, and a tie drops the later file
+    assert fit_shares([3000, 3000], [-5.0, 0.0], 2 * MIN_SHARE - 2) == {0: 2 * MIN_SHARE - 2}
+
+
+def test_pack_file_parts_follows_the_priorities_it_is_given(cli, tmp_path):
+    parts = []
+    for name in ('setup.py', 'notes.txt'):
+        (tmp_path / name).write_text(f"{name} = '{name[0] * 3000}'\n")
+        parts.append(FilePart('files', name, str(tmp_path / name), os.path.getsize(str(tmp_path / name))))
+    cli.config['payload_budget'] = 4000
+
+    def pack(priorities):
+        with ScanCache(None, 0) as scan_cache, TextSpool(1 << 20) as spool:
+            return [part.filename for part in cli.pack_file_parts(parts, scan_cache, spool, priorities)]
+    assert pack({'setup.py': 100.0, 'notes.txt': 30.0}) == ['setup.py']
+    assert pack({'setup.py': 30.0, 'notes.txt': 100.0}) == ['notes.txt']
+
+
+def test_shebang_is_kept():
+    text = "#!/usr/bin/env python3\n# A comment\nprint('hi')  # trailing\n"
+    assert compact_text('tool.py', text) == "#!/usr/bin/env python3\nprint('hi')\n"
+    assert compact_text('run.sh', "#!/bin/sh\n# setup\necho hi\n") == "#!/bin/sh\necho hi\n"
+
+
+def test_text_blocks_are_kept_verbatim():
+    java = 'class Q {\n    String SQL = """\n        SELECT 1 -- /* not a comment */\n        // still text\n        """;\n}\n'
+    assert compact_text('Q.java', java) == java
+    kotlin = 'val s = """\n  // kept\n"""  // dropped\n'
+    assert compact_text('s.kt', kotlin) == 'val s = """\n  // kept\n"""\n'
+    swift = 'let s = """\n  /* kept */\n  """\n'
+    assert compact_text('s.swift', swift) == swift
+    python = 'def f():\n    """Docstring # not a comment"""\n    return 1  # dropped\n'
+    assert compact_text('f.py', python) == 'def f():\n    """Docstring # not a comment"""\n    return 1\n'
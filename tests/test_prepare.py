@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from docmint.cache import ScanCache
+from docmint.packing import compact_text
+from docmint.prepare import PROCESS_MIN_CHARS, FilePreparer, ordered_map
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(8) as pool:
+        yield pool
+
+
+def test_ordered_map_keeps_input_order(pool):
+    # Later items finish first
+    def work(item):
+        time.sleep((10 - item) * 0.005)
+        return item * item
+
+    results = list(ordered_map(lambda item: pool.submit(work, item), range(10), 4))
+    assert results == [(item, item * item, None) for item in range(10)]
+
+
+def test_ordered_map_bounds_the_work_in_flight(pool):
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def work(item):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.005)
+        with lock:
+            state['running'] -= 1
+        return item
+
+    submitted = []
+
+    def submit(item):
+        submitted.append(item)
+        return pool.submit(work, item)
+
+    for item, result, error in ordered_map(submit, range(20), 3):
+        # Never more than 3 items ahead of the consumer
+        assert len(submitted) - item <= 3
+    assert state['peak'] <= 3
+
+
+def test_ordered_map_reports_errors_per_item(pool):
+    def work(item):
+        if item == 2:
+            raise ValueError("bad item")
+        return item
+
+    def submit(item):
+        if item == 4:
+            raise OSError("could not start")
+        return pool.submit(work, item)
+
+    outcomes = list(ordered_map(submit, range(6), 2))
+    assert [item for item, _, _ in outcomes] == list(range(6))
+    assert [result for _, result, error in outcomes if error is None] == [0, 1, 3, 5]
+    assert isinstance(outcomes[2][2], ValueError) and isinstance(outcomes[4][2], OSError)
+
+
+@pytest.mark.parametrize('processes', [0, 2])
+def test_prepare_yields_records_in_order(tmp_path, processes):
+    paths = []
+    for index in range(12):
+        path = tmp_path / f'module{index}.py'
+        # Every third file is large enough to be compacted in another process
+        body = 'value = 1\n' * (PROCESS_MIN_CHARS // 10 + 1 if index % 3 == 0 else 10)
+        path.write_text(f'# Module {index}\n' + body)
+        paths.append(str(path))
+    paths.insert(5, str(tmp_path / 'missing.py'))
+
+    with ScanCache(None, 0) as cache:
+        preparer = FilePreparer(cache, load_text=True, transform=compact_text, threads=4,
+                                processes=processes, max_in_flight=3)
+        records = list(preparer.prepare(paths))
+
+    assert [record.path for record in records] == paths
+    assert isinstance(records[5].error, OSError)
+    for record in records[:5] + records[6:]:
+        assert record.error is None
+        assert record.text == compact_text(record.path, open(record.path).read())
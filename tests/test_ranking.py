@@ -0,0 +1,64 @@
+import os
+
+from docmint.ranking import (DEPTH_PENALTY, ENTRY_POINT_SCORE, MANIFEST_SCORE, SOURCE_SCORE, RankedSelector,
+                             best_possible_score, score_file)
+
+
+def test_scores_favour_manifests_entry_points_and_shallow_files():
+    assert score_file('package.json', 0, 0) == MANIFEST_SCORE
+    assert score_file('main.py', 0, 0) == ENTRY_POINT_SCORE
+    assert score_file('util.py', 0, 0) == SOURCE_SCORE
+    assert score_file('util.py', 0, 2) == SOURCE_SCORE - 2 * DEPTH_PENALTY
+    assert score_file('util.py', 1024 * 1024, 0) < score_file('util.py', 1024, 0)
+    assert best_possible_score(3) >= max(score_file(name, 0, 3) for name in ('setup.py', 'main.py', 'README.md'))
+
+
+def test_keeps_the_best_files_in_order():
+    selector = RankedSelector(3)
+    for path, depth in [('src/util.py', 1), ('setup.py', 0), ('notes.txt', 0), ('main.py', 0),
+                        ('src/deep/helper.py', 2), ('README.md', 0)]:
+        selector.offer(path, 100, depth)
+
+    assert selector.selected() == [('setup.py', 100), ('README.md', 100), ('main.py', 100)]
+    assert [score for _, _, score in selector.ranked()] == sorted(
+        (score for _, _, score in selector.ranked()), reverse=True)
+
+
+def test_ties_go_to_the_file_offered_first():
+    selector = RankedSelector(2)
+    for name in ('a.py', 'b.py', 'c.py'):
+        selector.offer(name, 0, 0)
+    assert selector.selected() == [('a.py', 0), ('b.py', 0)]
+
+
+def test_stops_accepting_files_that_cannot_make_the_cut():
+    selector = RankedSelector(2)
+    assert selector.can_improve(10)
+    selector.offer('setup.py', 0, 0)
+    selector.offer('main.py', 0, 0)
+
+    assert selector.is_full()
+    assert selector.can_improve(3)
+    assert not selector.can_improve(4)
+    assert not selector.offer('deep/setup.py', 0, 4)
+    assert not selector.can_keep(score_file('util.py', 0, 0))
+    assert selector.can_keep(score_file('package.json', 0, 0))
+    assert not RankedSelector(0).offer('setup.py', 0, 0)
+
+
+def test_walk_stops_once_deeper_files_cannot_be_kept(cli, tmp_path):
+    (tmp_path / 'setup.py').write_text("from setuptools import setup\n")
+    (tmp_path / 'main.py').write_text("print('hello')\n")
+    deep = tmp_path
+    for name in 'abcdefgh':
+        deep = deep / name
+        deep.mkdir()
+        (deep / 'setup.py').write_text("from setuptools import setup\n")
+    cli.config.update(max_files=2, use_git_index=False)
+
+    files = cli.get_project_files(str(tmp_path), set(), set())
+
+    # Below a/ nothing can beat the two setup.py files already kept
+    assert [os.path.relpath(record.path, str(tmp_path)) for record in files] == ['setup.py', 'a/setup.py']
+    walk, = [phase for phase in cli.tracer.summary() if phase['name'] == 'walk']
+    assert walk['counts']['dirs_scanned'] <= 3
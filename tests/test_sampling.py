@@ -0,0 +1,63 @@
+import io
+import re
+
+import pytest
+
+from docmint.multipart import FilePart
+from docmint.reader import inspect_file, iter_sampled_chunks, sample_ranges, sample_text
+
+
+def numbered_lines(count):
+    return ''.join(f"line {index:05d} of the file\n" for index in range(count))
+
+
+@pytest.mark.parametrize('size, budget, windows', [
+    (100_000, 4096, 3), (100_000, 4096, 0), (10_000, 100, 7), (5000, 5000, 3),
+])
+def test_sample_ranges_fit_the_budget(size, budget, windows):
+    ranges = sample_ranges(size, budget, windows)
+
+    # Up to one byte per window is lost to rounding
+    assert min(size, budget) - windows <= sum(length for _, length in ranges) <= min(size, budget)
+    assert ranges[0][0] == 0 and ranges[-1][0] + ranges[-1][1] == size
+    for (offset, length), (next_offset, _) in zip(ranges, ranges[1:]):
+        assert offset + length <= next_offset
+
+
+def test_sample_keeps_head_middle_and_tail_in_whole_lines():
+    text = numbered_lines(5000)
+    sample = sample_text(io.BytesIO(text.encode('utf-8')), len(text), 8192, 3)
+
+    assert sample.startswith("line 00000 of the file\n")
+    assert sample.endswith("line 04999 of the file\n")
+    assert sample.count('bytes omitted by DocMint') == 4
+    kept = [line for line in sample.splitlines() if line.startswith('line ')]
+    assert all(re.fullmatch(r'line \d{5} of the file', line) for line in kept)
+    assert any(2000 < int(line[5:10]) < 3000 for line in kept)
+    assert len(sample.encode('utf-8')) < 8192 + 400
+
+
+def test_small_files_are_read_whole(tmp_path):
+    path = tmp_path / 'small.py'
+    path.write_text(numbered_lines(10))
+    info = inspect_file(str(path), keep_text_below=1 << 20, sample_budget=4096)
+    assert not info.sampled and info.text == numbered_lines(10)
+
+
+def test_large_files_are_uploaded_as_the_sample_they_were_described_by(tmp_path):
+    path = tmp_path / 'large.py'
+    path.write_text(numbered_lines(5000))
+    info = inspect_file(str(path), keep_text_below=1 << 20, sample_budget=4096)
+
+    assert info.sampled and info.length == len(info.text.encode('utf-8'))
+    assert b''.join(iter_sampled_chunks(str(path), 4096)) == info.text.encode('utf-8')
+    part = FilePart('files', 'large.py', str(path), info.length, sample=(4096, 3))
+    assert b''.join(part.iter_chunks()) == info.text.encode('utf-8')
+
+
+def test_utf16_windows_decode_cleanly():
+    text = numbered_lines(2000).replace('file', 'fïlé')
+    data = text.encode('utf-16')
+    sample = sample_text(io.BytesIO(data), len(data), 4096, 3, 'utf-16')
+    kept = [line for line in sample.splitlines() if line.startswith('line ')]
+    assert kept and all(re.fullmatch(r'line \d{5} of the fïlé', line) for line in kept)
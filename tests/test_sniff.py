@@ -0,0 +1,28 @@
+import json
+
+from docmint.sniff import KIND_GENERATED, KIND_MINIFIED, KIND_TEXT, classify
+
+
+def kind(text, name):
+    return classify(text.encode('utf-8'), name, at_eof=True)[0]
+
+
+def test_generated_markers():
+    assert kind('// Code generated by protoc-gen-go. DO NOT EDIT.\npackage pb\n', 'x.pb.go') == KIND_GENERATED
+    assert kind('/**\n * @generated SignedSource<<abc>>\n */\n', 'schema.js') == KIND_GENERATED
+    assert kind('# @generated by pip-compile\nrequests==2.31\n', 'reqs.py') == KIND_GENERATED
+
+
+def test_prose_mentioning_markers_is_text():
+    assert kind('# Settings file. Do not edit the keys below without a migration.\nDEBUG = False\n',
+                'settings.py') == KIND_TEXT
+    assert kind('"""Docs for the @generated marker"""\n', 'notes.py') == KIND_TEXT
+
+
+def test_one_line_manifests_are_not_minified():
+    manifest = json.dumps({'name': 'app', 'version': '1.0.0', 'description': 'x' * 600,
+                           'dependencies': {f'dep-{i}': '^1.0.0' for i in range(30)}})
+    assert len(manifest) > 1000
+    assert kind(manifest, 'package.json') == KIND_TEXT
+    assert kind(manifest, 'data/settings.json') == KIND_TEXT
+    assert kind('var a=1;' * 200, 'app.js') == KIND_MINIFIED
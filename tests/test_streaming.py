@@ -0,0 +1,60 @@
+import pytest
+
+from docmint.errors import GenerationError
+from docmint.streaming import StreamError, is_streaming_response, iter_answer_chunks
+
+
+class FakeResponse:
+    def __init__(self, content_type, lines=(), status_code=200):
+        self.headers = {'Content-Type': content_type}
+        self.lines = list(lines)
+        self.status_code = status_code
+        self.encoding = 'utf-8'
+        self.closed = False
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def iter_content(self, chunk_size=None, decode_unicode=False):
+        return iter(self.lines)
+
+    def close(self):
+        self.closed = True
+
+
+def events(*lines):
+    return [part for line in lines for part in (line, '')]
+
+
+def test_event_stream_ends_with_done():
+    response = FakeResponse('text/event-stream', events('data: {"delta": "# Title"}', 'data: {"delta": "\\nBody"}',
+                                                        'event: done'))
+    assert [text for text, _ in iter_answer_chunks(response)] == ['# Title', '\nBody']
+
+
+def test_event_stream_without_done_is_cut_off():
+    response = FakeResponse('text/event-stream', events('data: {"delta": "# Partial"}'))
+    with pytest.raises(StreamError):
+        list(iter_answer_chunks(response))
+
+
+def test_plain_text_is_not_a_stream():
+    assert not is_streaming_response(FakeResponse('text/plain'))
+    assert is_streaming_response(FakeResponse('text/markdown; charset=utf-8'))
+
+
+def test_cut_off_stream_keeps_readme_and_cache(cli, tmp_path, monkeypatch):
+    readme = tmp_path / 'README.md'
+    readme.write_text('# Good README\n', encoding='utf-8')
+    cli.output_path = str(readme)
+    cached = []
+    monkeypatch.setattr(cli, 'cache_answer', lambda key, answer: cached.append(answer))
+
+    response = FakeResponse('text/event-stream', events('data: {"delta": "# Half a READ"}'))
+    with pytest.raises(GenerationError):
+        cli.read_answer(response, 'key')
+
+    assert readme.read_text(encoding='utf-8') == '# Good README\n'
+    assert [p.name for p in tmp_path.iterdir()] == ['README.md']
+    assert cached == []
+    assert response.closed
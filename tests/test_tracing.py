@@ -0,0 +1,70 @@
+import json
+import threading
+
+from docmint import tracing
+from docmint.tracing import Tracer
+
+
+def test_summary_merges_spans_by_name():
+    tracer = Tracer()
+    with tracer.span('read', files=2) as span:
+        span.count(bytes=100, source='disk')
+    with tracer.span('upload'):
+        pass
+    with tracer.span('read', files=3) as span:
+        span.count(bytes=50, source='cache')
+
+    read, upload = tracer.summary()
+    assert (read['name'], read['calls'], upload['name']) == ('read', 2, 'upload')
+    assert read['counts'] == {'files': 5, 'bytes': 150, 'source': 'cache'}
+    assert read['duration'] >= 0 and tracer.elapsed >= read['duration']
+
+
+def test_record_adds_spans_measured_elsewhere():
+    tracer = Tracer()
+    span = tracer.record('server_wait', tracer.origin + 1.0, tracer.origin + 0.5, status=200)
+    assert span.duration == 0.0
+    assert tracer.summary() == [{'name': 'server_wait', 'duration': 0.0, 'calls': 1, 'counts': {'status': 200}}]
+
+
+def test_chrome_trace_names_threads(tmp_path):
+    tracer = Tracer()
+    with tracer.span('walk'):
+        pass
+
+    def worker():
+        with tracer.span('health_check', available=True):
+            pass
+    thread = threading.Thread(target=worker, name='docmint-health-check')
+    thread.start()
+    thread.join()
+    tracer.write_chrome_trace(str(tmp_path / 'trace.json'))
+
+    events = json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
+    spans = [event for event in events if event['ph'] == 'X']
+    threads = {event['tid']: event['args']['name'] for event in events if event['ph'] == 'M'}
+    assert [span['name'] for span in spans] == ['walk', 'health_check']
+    assert spans[1]['args'] == {'available': True}
+    assert threads[spans[1]['tid']] == 'docmint-health-check'
+
+
+def test_hooks_see_every_span_and_cannot_break_the_run():
+    seen = []
+
+    def failing(span):
+        raise RuntimeError("metrics backend is down")
+
+    def everywhere(span):
+        seen.append(('global', span.name))
+
+    tracer = Tracer()
+    tracer.add_hook(failing)
+    tracer.add_hook(lambda span: seen.append(('local', span.name)))
+    tracing.add_hook(everywhere)
+    try:
+        with tracer.span('save'):
+            pass
+    finally:
+        tracing.remove_hook(everywhere)
+
+    assert seen == [('local', 'save'), ('global', 'save')]
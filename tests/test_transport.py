@@ -0,0 +1,68 @@
+import socket
+
+import pytest
+import requests
+
+from docmint.transport import BackendSession
+from stub_backend import StubBackend
+
+
+@pytest.fixture
+def backend():
+    server = StubBackend()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def session():
+    retries = []
+    session = BackendSession(retries=2, backoff=0, on_retry=lambda *args: retries.append(args))
+    session.retries_made = retries
+    yield session
+    session.close()
+
+
+def sent(backend, method):
+    return sum(1 for request in backend.requests if request['method'] == method)
+
+
+def test_post_is_not_repeated_after_a_server_error(backend, session):
+    backend.fail(500)
+    response = session.post(f"{backend.url}/api/generate/", json={'message': 'demo'})
+
+    assert response.status_code == 500
+    assert sent(backend, 'POST') == 1
+    assert session.retries_made == []
+
+
+def test_post_is_repeated_when_asked_to_retry_later(backend, session):
+    backend.fail(503, headers={'Retry-After': '0'})
+    backend.fail(429, headers={'Retry-After': '0'})
+    response = session.post(f"{backend.url}/api/generate/", json={'message': 'demo'})
+
+    assert response.status_code == 200
+    assert sent(backend, 'POST') == 3
+
+
+def test_post_without_retry_after_is_not_repeated(backend, session):
+    backend.fail(503)
+    assert session.post(f"{backend.url}/api/generate/", json={'message': 'demo'}).status_code == 503
+    assert sent(backend, 'POST') == 1
+
+
+def test_get_is_repeated_after_a_server_error(backend, session):
+    backend.fail(500)
+    backend.fail(502)
+    assert session.get(f"{backend.url}/api/health/").status_code == 200
+    assert sent(backend, 'GET') == 3
+
+
+def test_post_is_repeated_when_the_connection_is_refused(session):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.post(f"http://127.0.0.1:{port}/api/generate/", json={'message': 'demo'})
+    assert len(session.retries_made) == 2
@@ -0,0 +1,77 @@
+import fnmatch
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from docmint.exclude import ExclusionMatcher
+from docmint.walker import ProjectWalker
+
+
+@pytest.fixture
+def go_project(tmp_path):
+    (tmp_path / 'go.mod').write_text("module example.com/demo\n\ngo 1.21\n")
+    (tmp_path / 'main.go').write_text("package main\n\nfunc main() {}\n")
+    (tmp_path / 'vendor.mod').write_text("not a manifest\n")
+    (tmp_path / 'Go.Mod.bak').write_text("not a manifest either\n")
+    return tmp_path
+
+
+def selected_names(cli, project):
+    return sorted(record.name for record in cli.get_project_files(str(project), set(), set()))
+
+
+def test_walk_selects_manifests_by_name(cli, go_project):
+    cli.config['use_git_index'] = False
+    assert selected_names(cli, go_project) == ['go.mod', 'main.go']
+    assert '.mod' not in cli.supported_extensions
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+def test_git_index_selects_manifests_by_name(cli, go_project):
+    subprocess.run(['git', 'init', '-q'], cwd=str(go_project), check=True)
+    subprocess.run(['git', 'add', '.'], cwd=str(go_project), check=True)
+    assert selected_names(cli, go_project) == ['go.mod', 'main.go']
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for index in range(40):
+        package = tmp_path / f'pkg{index % 5}' / f'sub{index % 3}'
+        package.mkdir(parents=True, exist_ok=True)
+        (package / f'module{index}.py').write_text(f"VALUE = {index}\n")
+        (package / f'notes{index}.bin').write_text("not supported\n")
+    for excluded in ('node_modules/left-pad', 'pkg1/build'):
+        (tmp_path / excluded).mkdir(parents=True)
+        (tmp_path / excluded / 'index.js').write_text("module.exports = 1\n")
+    (tmp_path / 'app.log').write_text("log\n")
+    (tmp_path / 'main.py').write_text("print('hello')\n")
+    return tmp_path
+
+
+def reference_walk(root, exclude_dirs, exclude_files, extensions):
+    """Files os.walk finds under the same rules"""
+    found = set()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name not in exclude_dirs]
+        for name in filenames:
+            if os.path.splitext(name)[1] in extensions and not any(
+                    fnmatch.fnmatch(name, pattern) for pattern in exclude_files):
+                found.add(os.path.join(dirpath, name))
+    return found
+
+
+@pytest.mark.parametrize('workers', [1, 8])
+def test_parallel_walk_finds_what_os_walk_finds(tree, workers):
+    exclude_dirs, exclude_files = {'node_modules', 'build'}, {'*.log'}
+    walker = ProjectWalker(str(tree), ExclusionMatcher(exclude_dirs, exclude_files), {'.py', '.js', '.log'},
+                           max_size=1024 * 1024, workers=workers)
+    levels = list(walker.iter_levels())
+
+    assert [depth for depth, _ in levels] == list(range(len(levels)))
+    found = {path for _, files in levels for path, _ in files}
+    assert found == reference_walk(str(tree), exclude_dirs, exclude_files, {'.py', '.js', '.log'})
+    # Excluded directories are never read
+    assert not any('node_modules' in path or 'build' in path for path in walker.directories)
+    assert walker.excluded_count == 3
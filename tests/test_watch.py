@@ -0,0 +1,17 @@
+import re
+
+import pytest
+
+from docmint.watch import run_watch
+
+
+def test_watch_takes_the_single_run_options(cli, capsys):
+    with pytest.raises(SystemExit):
+        cli.run(['-h'])
+    single = set(re.findall(r'(?<![\w-])--[a-z][a-z-]*', capsys.readouterr().out))
+    with pytest.raises(SystemExit):
+        run_watch(cli, ['-h'])
+    watch = set(re.findall(r'(?<![\w-])--[a-z][a-z-]*', capsys.readouterr().out))
+
+    assert {'--budget', '--no-pack', '--digest', '--timings', '--trace', '--refresh'} <= watch
+    assert single - {'--prompt', '--show-config', '--no-daemon'} <= watch